@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Batch Module
+Runs the transfer for many accounts from a manifest, several accounts at a time
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional
+
+from dotenv import dotenv_values
+
+MAIN_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+BATCH_DIR = "batch"                 # Parent of the per-account working directories
+DEFAULT_ARGS = ["--likes"]          # main.py arguments for accounts that do not set "args"
+DEFAULT_PARALLEL = 4                # Accounts transferred at the same time
+LOG_FILE = "transfer.log"           # Output of each account's run, in its working directory
+TRACK_LOG_FILE = "transfer.jsonl"   # Per-track records of each account's run (see --jsonl)
+STATUSES = ('added', 'present', 'not_found', 'failed')
+
+
+def load_manifest(path: str) -> List[Dict]:
+    """
+    Read and validate an accounts manifest
+
+    The manifest is a JSON object with an "accounts" list. Each account needs
+    a unique "name"; everything else is optional:
+
+        workdir         Working directory for the account's state files (default: batch/<name>)
+        env_file        .env style file with the account's SPOTIFY_* credentials
+        env             Extra environment variables (override env_file)
+        spotify_cache   Spotify OAuth token cache (default: <workdir>/.cache)
+        tidal_session   Saved Tidal session (default: <workdir>/tidal_session.json)
+        args            main.py arguments (default: ["--likes"])
+
+    Relative paths are resolved against the manifest's directory.
+
+    Args:
+        path: Location of the manifest file
+
+    Returns:
+        List of account dictionaries with every field filled in
+
+    Raises:
+        ValueError: If the manifest is malformed
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    entries = manifest.get('accounts') if isinstance(manifest, dict) else None
+    if not isinstance(entries, list) or not entries:
+        raise ValueError(f"{path} must contain a non-empty \"accounts\" list")
+
+    base = os.path.dirname(os.path.abspath(path))
+
+    def resolve(value):
+        return os.path.normpath(os.path.join(base, os.path.expanduser(value)))
+
+    accounts = []
+    names = set()
+    for i, entry in enumerate(entries, 1):
+        name = entry.get('name') if isinstance(entry, dict) else None
+        if not name or not isinstance(name, str) or os.sep in name or name.startswith('.'):
+            raise ValueError(f"Account {i} in {path} needs a \"name\" usable as a directory name")
+        if name in names:
+            raise ValueError(f"Account name {name!r} appears more than once in {path}")
+        names.add(name)
+
+        workdir = resolve(entry.get('workdir', os.path.join(BATCH_DIR, name)))
+        env = {}
+        if entry.get('env_file'):
+            env_file = resolve(entry['env_file'])
+            if not os.path.exists(env_file):
+                raise ValueError(f"env_file {env_file} of account {name!r} not found")
+            env.update({k: v for k, v in dotenv_values(env_file).items() if v is not None})
+        env.update({k: str(v) for k, v in entry.get('env', {}).items()})
+
+        args = entry.get('args', DEFAULT_ARGS)
+        if not isinstance(args, list) or not all(isinstance(arg, str) for arg in args):
+            raise ValueError(f"\"args\" of account {name!r} must be a list of strings")
+
+        accounts.append({
+            'name': name,
+            'workdir': workdir,
+            'env': env,
+            'spotify_cache': resolve(entry.get('spotify_cache', os.path.join(workdir, ".cache"))),
+            'tidal_session': resolve(entry.get('tidal_session', os.path.join(workdir, "tidal_session.json"))),
+            'args': args
+        })
+
+    return accounts
+
+
+def account_environment(account: Dict, shared_cache: Optional[str] = None) -> Dict[str, str]:
+    """
+    Build the environment an account's transfer runs with
+
+    Each account gets its own token files; variables from the manifest
+    override the batch runner's own environment.
+
+    Args:
+        account: Account from load_manifest
+        shared_cache: Optional match cache file shared by every account
+
+    Returns:
+        Dict of environment variables
+    """
+    env = dict(os.environ)
+    env.update(account['env'])
+    env['SPOTIFY_CACHE_PATH'] = account['spotify_cache']
+    env['TIDAL_SESSION_FILE'] = account['tidal_session']
+    env['PYTHONUNBUFFERED'] = "1"  # Keep the account's log current while it runs
+    if shared_cache:
+        env['MATCH_CACHE_FILE'] = shared_cache
+    return env
+
+
+def missing_tokens(account: Dict) -> List[str]:
+    """Return the token files an account still needs an interactive login for"""
+    return [path for path in (account['spotify_cache'], account['tidal_session']) if not os.path.exists(path)]
+
+
+def _count_tracks(path: str) -> Counter:
+    """Count the per-track records of a run by status"""
+    counts = Counter()
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    counts[json.loads(line)['status']] += 1
+                except (ValueError, KeyError):
+                    continue  # Truncated line from a killed run
+    except FileNotFoundError:
+        pass
+    return counts
+
+
+def run_account(account: Dict, extra_args: List[str], shared_cache: Optional[str] = None) -> Dict:
+    """
+    Run one account's transfer in its own process and working directory
+
+    The transfer runs unattended (--yes --quiet) with its output written to
+    LOG_FILE and one record per track to TRACK_LOG_FILE in the working directory.
+
+    Args:
+        account: Account from load_manifest
+        extra_args: main.py arguments added for every account
+        shared_cache: Optional match cache file shared by every account
+
+    Returns:
+        Dict with the account name, exit code, duration, track counts and log path
+    """
+    workdir = account['workdir']
+    os.makedirs(workdir, exist_ok=True)
+    log_path = os.path.join(workdir, LOG_FILE)
+    track_log = os.path.join(workdir, TRACK_LOG_FILE)
+    if os.path.exists(track_log):
+        os.remove(track_log)  # Counts in the summary cover this run only
+
+    command = ([sys.executable, MAIN_SCRIPT] + account['args'] + extra_args
+               + ['--yes', '--quiet', '--jsonl', TRACK_LOG_FILE])
+
+    start = time.monotonic()
+    with open(log_path, 'w', encoding='utf-8') as log:
+        process = subprocess.run(command, cwd=workdir, env=account_environment(account, shared_cache),
+                                 stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT)
+
+    counts = _count_tracks(track_log)
+    result = {
+        'name': account['name'],
+        'exit_code': process.returncode,
+        'seconds': round(time.monotonic() - start, 1),
+        'log': log_path
+    }
+    result.update({status: counts[status] for status in STATUSES})
+    return result
+
+
+def login_accounts(accounts: List[Dict]) -> int:
+    """
+    Log in, one at a time and interactively, every account that has no saved tokens
+
+    Returns:
+        int: Number of accounts whose login failed
+    """
+    failures = 0
+    for account in accounts:
+        if not missing_tokens(account):
+            continue
+        print(f"\n{'=' * 60}\nLogging in account {account['name']}\n{'=' * 60}")
+        os.makedirs(account['workdir'], exist_ok=True)
+        process = subprocess.run([sys.executable, MAIN_SCRIPT, '--test'], cwd=account['workdir'],
+                                 env=account_environment(account))
+        if process.returncode != 0 or missing_tokens(account):
+            print(f"✗ Login of {account['name']} failed")
+            failures += 1
+        else:
+            print(f"✓ {account['name']} logged in")
+    return failures
+
+
+def print_summary(results: List[Dict]) -> None:
+    """Print the consolidated per-account summary table"""
+    print("\n" + "=" * 78)
+    print("Batch Summary")
+    print("=" * 78)
+    print(f"{'account':<20} {'status':<14} {'time':>8} {'added':>8} {'present':>8} "
+          f"{'not found':>9} {'failed':>7}")
+    print("-" * 78)
+    for result in results:
+        if result.get('skipped'):
+            status = "✗ no tokens"
+        elif result['exit_code'] == 0:
+            status = "✓ ok"
+        else:
+            status = f"✗ exit {result['exit_code']}"
+        print(f"{result['name']:<20} {status:<14} {result['seconds']:>7.1f}s {result['added']:>8} "
+              f"{result['present']:>8} {result['not_found']:>9} {result['failed']:>7}")
+    print("-" * 78)
+    totals = {status: sum(result[status] for result in results) for status in STATUSES}
+    succeeded = sum(1 for result in results if result['exit_code'] == 0)
+    print(f"{succeeded}/{len(results)} account(s) succeeded; {totals['added']} tracks added, "
+          f"{totals['not_found']} not found, {totals['failed']} failed")
+
+    failed = [result for result in results if result['exit_code'] != 0 and not result.get('skipped')]
+    if failed:
+        print("\nLogs of failed accounts:")
+        for result in failed:
+            print(f"  - {result['name']}: {result['log']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Transfer many accounts from Spotify to Tidal, several at a time',
+        usage='%(prog)s [-h] [--parallel N] [--login] [--shared-cache FILE] [--summary-out FILE] '
+              'manifest [-- MAIN_OPTIONS ...]',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Log in every account that has no saved tokens yet (interactive, one at a time)
+  python batch.py accounts.json --login
+
+  # Transfer every account's liked songs, 8 accounts at a time
+  python batch.py accounts.json --parallel 8
+
+  # Pass extra main.py options to every account after --
+  python batch.py accounts.json -- --rate 5 --workers 2
+        """
+    )
+    parser.add_argument('manifest', help='JSON file listing the accounts (see accounts.example.json)')
+    parser.add_argument('--parallel', type=int, default=DEFAULT_PARALLEL, metavar='N',
+                        help=f'Accounts transferred at the same time (default: {DEFAULT_PARALLEL})')
+    parser.add_argument('--login', action='store_true',
+                        help='Interactively log in accounts without saved tokens instead of transferring')
+    parser.add_argument('--shared-cache', metavar='FILE',
+                        help='Share one match cache file between all accounts so a track is searched once')
+    parser.add_argument('--summary-out', metavar='FILE', help='Also write the per-account summary as JSON')
+
+    # Everything after -- is passed on to main.py for every account
+    argv = sys.argv[1:]
+    extra_args = []
+    if '--' in argv:
+        split = argv.index('--')
+        argv, extra_args = argv[:split], argv[split + 1:]
+    args = parser.parse_args(argv)
+
+    if args.parallel < 1:
+        parser.error("--parallel must be at least 1")
+
+    try:
+        accounts = load_manifest(args.manifest)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+
+    if args.login:
+        return 1 if login_accounts(accounts) else 0
+
+    shared_cache = os.path.abspath(args.shared_cache) if args.shared_cache else None
+    ready = [account for account in accounts if not missing_tokens(account)]
+    results = [
+        dict({'name': account['name'], 'exit_code': None, 'seconds': 0.0, 'log': None, 'skipped': True},
+             **{status: 0 for status in STATUSES})
+        for account in accounts if missing_tokens(account)
+    ]
+    if results:
+        print(f"✗ {len(results)} account(s) have no saved tokens and are skipped; "
+              f"run with --login first: {', '.join(result['name'] for result in results)}")
+
+    print(f"Transferring {len(ready)} account(s), {args.parallel} at a time...")
+
+    # Each account runs in its own process; the threads only wait on them
+    with ThreadPoolExecutor(max_workers=args.parallel) as pool:
+        futures = {pool.submit(run_account, account, extra_args, shared_cache): account for account in ready}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except OSError as e:
+                account = futures[future]
+                result = dict({'name': account['name'], 'exit_code': -1, 'seconds': 0.0, 'log': str(e)},
+                              **{status: 0 for status in STATUSES})
+            mark = "✓" if result['exit_code'] == 0 else "✗"
+            print(f"{mark} {result['name']} finished in {result['seconds']:.1f}s "
+                  f"({result['added']} added, exit code {result['exit_code']})")
+            results.append(result)
+
+    order = {account['name']: i for i, account in enumerate(accounts)}
+    results.sort(key=lambda result: order[result['name']])
+    print_summary(results)
+
+    if args.summary_out:
+        with open(args.summary_out, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✓ Summary written to {args.summary_out}")
+
+    return 0 if all(result['exit_code'] == 0 for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
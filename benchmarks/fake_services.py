@@ -0,0 +1,565 @@
+"""
+Fake Services Module
+Local stand-in Spotify and Tidal HTTP endpoints for offline benchmarks
+"""
+
+import json
+import random
+import re
+import socket
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+# Two-letter codes repeated in every full Spotify track and album object, as in real responses
+MARKETS = [a + b for a in "ABCDEFGHIJKLMN" for b in "ABCDEFGHIJKLM"][:180]
+
+TIDAL_ID_OFFSET = 10_000_000  # Tidal track IDs are the synthetic index plus this
+DECOYS = 2                    # Extra, wrong tracks returned with every text search hit
+TIDAL_USER_ID = 1             # ID of the logged-in Tidal user
+# Requests made while loading the Tidal session; the login is not part of what is measured, so never throttled
+TIDAL_LOGIN_ROUTES = ("tidal GET /sessions", "tidal GET /users/{id}", "tidal GET /users/{id}/subscription")
+
+_SONG_NUMBER = re.compile(r"\bsong (\d{6})\b")
+
+
+def _fraction(i: int, seed: int, salt: int) -> float:
+    """Deterministic pseudo-random value in [0, 1) for track i"""
+    return ((i * 2654435761 + seed * 40503 + salt * 97) % 1_000_003) / 1_000_003
+
+
+def _spotify_id(prefix: str, i: int) -> str:
+    """22 character base-62 Spotify ID"""
+    return f"{prefix}{i:0{22 - len(prefix)}d}"
+
+
+class SyntheticLibrary:
+    """
+    Deterministic synthetic music library shared by the fake services
+
+    Tracks are generated from their index on demand, so a 100k-track library
+    costs no memory. Titles carry a six-digit serial number ("Song 000123")
+    which the fake Tidal search uses to find the track again.
+    """
+
+    def __init__(self, size: int, isrc_coverage: float = 0.9, missing: float = 0.05,
+                 playlists: int = 10, playlist_size: int = 200, seed: int = 1):
+        """
+        Args:
+            size: Number of liked songs
+            isrc_coverage: Fraction of Spotify tracks that carry an ISRC
+            missing: Fraction of tracks that do not exist on Tidal
+            playlists: Number of playlists owned by the user
+            playlist_size: Tracks per playlist (sampled from the liked songs, so they overlap)
+            seed: Varies which tracks lack an ISRC or are missing
+        """
+        self.size = size
+        self.isrc_coverage = isrc_coverage
+        self.missing = missing
+        self.playlists = playlists
+        self.playlist_size = min(playlist_size, size)
+        self.seed = seed
+
+    def has_isrc(self, i: int) -> bool:
+        return _fraction(i, self.seed, 1) < self.isrc_coverage
+
+    def on_tidal(self, i: int) -> bool:
+        return 0 <= i < self.size and _fraction(i, self.seed, 2) >= self.missing
+
+    def isrc(self, i: int) -> str:
+        return f"QZBEN{i:07d}"
+
+    def spotify_track(self, i: int, full: bool = True) -> Dict:
+        """Spotify track object; `full` adds the bulk a real unfiltered response carries"""
+        artist = {'name': f"Artist {i % 997}"}
+        album = {'name': f"Album {i // 12}"}
+        track = {
+            'type': 'track',
+            'id': _spotify_id("t", i),
+            'uri': f"spotify:track:{_spotify_id('t', i)}",
+            'name': f"Song {i:06d}",
+            'duration_ms': 150_000 + (i * 7919) % 150_000,
+            'artists': [artist],
+            'album': album,
+            'external_ids': {'isrc': self.isrc(i)} if self.has_isrc(i) else {},
+        }
+        if full:
+            artist.update({'id': _spotify_id("a", i % 997), 'type': 'artist',
+                           'href': f"https://api.spotify.com/v1/artists/{_spotify_id('a', i % 997)}",
+                           'external_urls': {'spotify': "https://open.spotify.com/artist/x"}})
+            album.update({'id': _spotify_id("b", i // 12), 'album_type': 'album', 'release_date': '2001-01-01',
+                          'available_markets': MARKETS, 'total_tracks': 12,
+                          'images': [{'url': f"https://i.scdn.co/image/{i // 12}/{size}", 'height': size,
+                                      'width': size} for size in (640, 300, 64)]})
+            track.update({'available_markets': MARKETS, 'popularity': i % 100, 'explicit': False,
+                          'disc_number': 1, 'track_number': i % 12 + 1, 'is_local': False,
+                          'preview_url': f"https://p.scdn.co/mp3-preview/{i}",
+                          'href': f"https://api.spotify.com/v1/tracks/{_spotify_id('t', i)}",
+                          'external_urls': {'spotify': f"https://open.spotify.com/track/{i}"}})
+        return track
+
+    def playlist_id(self, p: int) -> str:
+        return _spotify_id("p", p)
+
+    def playlist_tracks(self, p: int) -> List[int]:
+        """Indices of the tracks of playlist p (deterministic sample of the library)"""
+        rng = random.Random(self.seed * 7919 + p)
+        return rng.sample(range(self.size), self.playlist_size)
+
+    def tidal_track(self, i: int) -> Dict:
+        """Tidal track object with every field tidalapi parses"""
+        duration_ms = 150_000 + (i * 7919) % 150_000
+        artists = [{'id': 500_000 + i % 997, 'name': f"Artist {i % 997}", 'type': "MAIN", 'picture': None}]
+        return {
+            'id': TIDAL_ID_OFFSET + i,
+            'title': f"Song {i:06d}",
+            'isrc': self.isrc(i),
+            'duration': duration_ms // 1000,
+            'version': None,
+            'explicit': False,
+            'allowStreaming': True,
+            'streamReady': True,
+            'stemReady': False,
+            'djReady': True,
+            'adSupportedStreamReady': True,
+            'premiumStreamingOnly': False,
+            'streamStartDate': "2001-01-01T00:00:00.000+0000",
+            'trackNumber': i % 12 + 1,
+            'volumeNumber': 1,
+            'popularity': i % 100,
+            'replayGain': -8.0,
+            'peak': 1.0,
+            'copyright': f"(P) 2001 Label {i % 31}",
+            'audioQuality': "LOSSLESS",
+            'audioModes': ["STEREO"],
+            'mediaMetadata': {'tags': ["LOSSLESS"]},
+            'url': f"http://www.tidal.com/track/{TIDAL_ID_OFFSET + i}",
+            'artist': artists[0],
+            'artists': artists,
+            'album': {'id': 700_000 + i // 12, 'title': f"Album {i // 12}", 'cover': None,
+                      'videoCover': None, 'vibrantColor': None},
+        }
+
+    def tidal_video(self, video_id: int) -> Dict:
+        """Tidal music video object; videos only appear in playlists that a test puts them in"""
+        artists = [{'id': 500_000, 'name': "Video Artist", 'type': "MAIN", 'picture': None}]
+        return {
+            'id': video_id,
+            'title': f"Video {video_id}",
+            'type': "Music Video",
+            'duration': 200,
+            'explicit': False,
+            'allowStreaming': True,
+            'streamReady': True,
+            'stemReady': False,
+            'djReady': False,
+            'adSupportedStreamReady': True,
+            'trackNumber': 1,
+            'volumeNumber': 1,
+            'popularity': 0,
+            'imageId': None,
+            'quality': "MP4_1080P",
+            'artist': artists[0],
+            'artists': artists,
+            'album': None,
+        }
+
+
+class FakeServiceState:
+    """Request counters, fault injection settings and Tidal-side user data"""
+
+    def __init__(self, library: SyntheticLibrary, latency: Dict[str, float],
+                 throttle_rate: Dict[str, float], retry_after: float = 0.1, seed: int = 1):
+        self.library = library
+        self.latency = latency
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.lock = threading.Lock()
+        self.counts = Counter()
+        self.throttled = Counter()
+        self.rng = random.Random(seed)
+        self.favorites = set()
+        self.playlists: Dict[str, Dict] = {}
+        # Track ID -> HTTP status answered to any favorites or playlist write containing it
+        self.write_faults: Dict[int, int] = {}
+        # Synthetic track index -> HTTP status answered to every search for that song
+        self.search_faults: Dict[int, int] = {}
+
+    def reset(self) -> None:
+        with self.lock:
+            self.counts.clear()
+            self.throttled.clear()
+            self.favorites.clear()
+            self.playlists.clear()
+            self.write_faults.clear()
+            self.search_faults.clear()
+
+    def stats(self) -> Dict:
+        with self.lock:
+            return {'requests': dict(self.counts), 'throttled': dict(self.throttled)}
+
+    def add_tidal_playlist(self, title: str, items: List = ()) -> str:
+        """
+        Create a Tidal playlist that already holds some entries
+
+        Args:
+            title: Playlist name
+            items: ('track' or 'video', media ID) pairs, in playlist order
+
+        Returns:
+            str: ID of the new playlist
+        """
+        with self.lock:
+            playlist = _create_playlist(self, title, "")
+            playlist['items'].extend(items)
+            return playlist['uuid']
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Routes /spotify/v1/..., /tidal/v1/... and /tidal/v2/... requests to the fake implementations"""
+
+    protocol_version = "HTTP/1.1"
+    state: FakeServiceState = None  # Set on the subclass created by start_fake_services
+
+    def setup(self):
+        super().setup()
+        # Headers and body are separate writes; without this, delayed ACKs add ~40 ms per response
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output clean
+
+    def _send(self, status: int, body=None, headers: Optional[Dict[str, str]] = None) -> None:
+        data = json.dumps(body, separators=(',', ':')).encode() if body is not None else b""
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _body(self) -> Dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        if not raw:
+            return {}
+        if self.headers.get("Content-Type", "").startswith("application/json"):
+            return json.loads(raw)
+        return {key: values[0] for key, values in parse_qs(raw.decode()).items()}
+
+    def _handle(self, method: str) -> None:
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        parts = [part for part in url.path.split("/") if part]
+        state = self.state
+
+        if parts == ["_stats"]:
+            return self._send(200, state.stats())
+        if parts == ["_reset"]:
+            state.reset()
+            return self._send(200, {})
+
+        if len(parts) < 2 or parts[0] not in ("spotify", "tidal") or parts[1] not in ("v1", "v2"):
+            return self._send(404, {'error': {'status': 404, 'message': "Unknown endpoint"}})
+
+        service, path = parts[0], parts[2:]
+        # Numeric/ID path segments are collapsed so counters group by endpoint
+        route = "/".join("{id}" if any(c.isdigit() for c in part) else part for part in path)
+        if parts[1] == "v2":
+            path, route = ["v2"] + path, "v2/" + route
+        key = f"{service} {method} /{route}"
+        body = self._body() if method in ("POST", "PUT") else {}
+
+        with state.lock:
+            state.counts[key] += 1
+            throttle = key not in TIDAL_LOGIN_ROUTES and state.rng.random() < state.throttle_rate.get(service, 0.0)
+            if throttle:
+                state.throttled[key] += 1
+
+        time.sleep(state.latency.get(service, 0.0))
+        if throttle:
+            # tidalapi parses Retry-After as an integer, and Tidal only sends whole seconds
+            retry_after = f"{round(state.retry_after)}" if service == "tidal" else f"{state.retry_after:g}"
+            return self._send(429, {'error': {'status': 429, 'message': "API rate limit exceeded"}},
+                              {"Retry-After": retry_after})
+
+        handler = _spotify_route if service == "spotify" else _tidal_route
+        self._send(*handler(state, method, path, query, body))
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_PUT(self):
+        self._handle("PUT")
+
+    def do_DELETE(self):
+        self._handle("DELETE")
+
+
+def _page(items: List, total: int, offset: int, limit: int) -> Dict:
+    return {'items': items, 'total': total, 'offset': offset, 'limit': limit,
+            'next': "next" if offset + limit < total else None}
+
+
+def _spotify_route(state: FakeServiceState, method: str, path: List[str], query: Dict, body: Dict):
+    library = state.library
+    limit = int(query.get('limit', 20))
+    offset = int(query.get('offset', 0))
+    # Naming a market drops available_markets; a fields filter returns only the requested parts
+    full = 'market' not in query and 'fields' not in query
+
+    if path == ["me"]:
+        return 200, {'id': "benchuser", 'display_name': "Benchmark User"}
+
+    if path == ["me", "tracks"]:
+        end = min(offset + limit, library.size)
+        items = [{'added_at': "2020-01-01T00:00:00Z", 'track': library.spotify_track(i, full)}
+                 for i in range(offset, end)]
+        return 200, _page(items, library.size, offset, limit)
+
+    if path == ["me", "playlists"]:
+        end = min(offset + limit, library.playlists)
+        items = [{
+            'id': library.playlist_id(p), 'name': f"Playlist {p}", 'description': "",
+            'public': False, 'collaborative': False, 'snapshot_id': f"snapshot-{p}",
+            'tracks': {'total': library.playlist_size}, 'owner': {'id': "benchuser"},
+            'external_urls': {'spotify': f"https://open.spotify.com/playlist/{p}"},
+        } for p in range(offset, end)]
+        return 200, _page(items, library.playlists, offset, limit)
+
+    if len(path) == 3 and path[0] == "playlists" and path[2] in ("tracks", "items"):
+        p = int(path[1][1:])
+        indices = library.playlist_tracks(p)
+        items = [{'track': library.spotify_track(i, full)} for i in indices[offset:offset + limit]]
+        return 200, _page(items, len(indices), offset, limit)
+
+    return 404, {'error': {'status': 404, 'message': "Unknown endpoint"}}
+
+
+def _tidal_page(items: List, total: int, offset: int, limit: int) -> Dict:
+    return {'items': items, 'totalNumberOfItems': total, 'offset': offset, 'limit': limit}
+
+
+def _tidal_error(status: int, message: str):
+    return status, {'status': status, 'subStatus': status * 10, 'userMessage': message}
+
+
+def _tidal_playlist(playlist: Dict) -> Dict:
+    """Tidal playlist object with every field tidalapi parses"""
+    tracks = sum(1 for kind, _ in playlist['items'] if kind == 'track')
+    return {
+        'uuid': playlist['uuid'], 'title': playlist['title'], 'description': playlist['description'],
+        'numberOfTracks': tracks, 'numberOfVideos': len(playlist['items']) - tracks,
+        'duration': 0, 'type': "USER", 'publicPlaylist': False, 'popularity': 0,
+        'created': "2024-01-01T00:00:00.000+0000", 'lastUpdated': "2024-01-01T00:00:00.000+0000",
+        'image': None, 'squareImage': None, 'promotedArtists': [], 'url': "",
+        'creator': {'id': TIDAL_USER_ID},
+    }
+
+
+def _etag(playlist: Dict) -> Dict[str, str]:
+    return {'ETag': f'"{playlist["version"]}"'}
+
+
+def _write_fault(state: FakeServiceState, track_ids: List[int]):
+    """Return the injected error response for a write containing a faulty track, if any"""
+    for track_id in track_ids:
+        status = state.write_faults.get(track_id)
+        if status:
+            return _tidal_error(status, f"Track {track_id} can not be added")
+    return None
+
+
+def _create_playlist(state: FakeServiceState, title: str, description: str) -> Dict:
+    """Add an empty playlist owned by the user (lock must be held)"""
+    playlist_id = f"00000000-0000-4000-8000-{len(state.playlists) + 1:012d}"
+    state.playlists[playlist_id] = {'uuid': playlist_id, 'title': title, 'description': description or "",
+                                    'items': [], 'version': 1}
+    return state.playlists[playlist_id]
+
+
+def _tidal_route(state: FakeServiceState, method: str, path: List[str], query: Dict, body: Dict):
+    library = state.library
+    limit = int(query.get('limit') or 50)
+    offset = int(query.get('offset') or 0)
+    user = str(TIDAL_USER_ID)
+
+    if path == ["sessions"]:
+        return 200, {'sessionId': "benchmark-session", 'countryCode': "US", 'userId': TIDAL_USER_ID}
+
+    if path == ["users", user]:
+        return 200, {'id': TIDAL_USER_ID, 'username': "benchuser", 'firstName': "Benchmark",
+                     'lastName': "User", 'email': "benchuser@example.com"}
+
+    if path == ["users", user, "subscription"]:
+        return 200, {'subscription': {'type': "HIFI"}, 'status': "ACTIVE"}
+
+    if path == ["search"]:
+        text = query.get('query', "").lower()
+        if text.startswith("isrc:"):
+            i = int(text[len("isrc:qzben"):] or -1)
+            hits = [i] if library.has_isrc(i) and library.on_tidal(i) else []
+        else:
+            number = _SONG_NUMBER.search(text)
+            i = int(number.group(1)) if number else -1
+            hits = [i] + [i + d for d in range(1, DECOYS + 1)] if library.on_tidal(i) else []
+        if i in state.search_faults:
+            return _tidal_error(state.search_faults[i], f"Search for song {i} failed")
+        tracks = [library.tidal_track(j) for j in hits if 0 <= j < library.size][:limit]
+        empty = _tidal_page([], 0, offset, limit)
+        return 200, {'artists': empty, 'albums': empty, 'videos': empty, 'playlists': empty,
+                     'tracks': _tidal_page(tracks, len(tracks), offset, limit), 'topHit': None}
+
+    if path == ["users", user, "favorites", "tracks"] and method == "POST":
+        ids = [int(track_id) for track_id in str(body.get('trackId', "")).split(",") if track_id]
+        with state.lock:
+            fault = _write_fault(state, ids)
+            if fault:
+                return fault
+            state.favorites.update(ids)
+        return 200, {}
+
+    # Playlist creation: v2 endpoint in tidalapi 0.8, v1 endpoint before
+    if path == ["v2", "my-collection", "playlists", "folders", "create-playlist"] and method == "PUT":
+        with state.lock:
+            playlist = _create_playlist(state, query.get('name'), query.get('description'))
+            return 200, {'data': _tidal_playlist(playlist)}
+
+    if path == ["users", user, "playlists"]:
+        with state.lock:
+            if method == "POST":
+                playlist = _create_playlist(state, body.get('title'), body.get('description'))
+                return 201, _tidal_playlist(playlist), _etag(playlist)
+            playlists = [_tidal_playlist(p) for p in state.playlists.values()]
+        return 200, _tidal_page(playlists[offset:offset + limit], len(playlists), offset, limit)
+
+    if len(path) >= 2 and path[0] == "playlists":
+        with state.lock:
+            playlist = state.playlists.get(path[1])
+            if playlist is None:
+                return _tidal_error(404, "Playlist not found")
+            if len(path) == 2:
+                return 200, _tidal_playlist(playlist), _etag(playlist)
+
+            items = playlist['items']
+            if method == "POST":
+                ids = [int(track_id) for track_id in str(body.get('trackIds', "")).split(",") if track_id]
+                fault = _write_fault(state, ids)
+                if fault:
+                    return fault
+                if body.get('onDupes') != "ADD":
+                    present = {media_id for _, media_id in items}
+                    ids = [track_id for track_id in dict.fromkeys(ids) if track_id not in present]
+                position = int(body.get('toIndex', len(items)))
+                items[position:position] = [('track', track_id) for track_id in ids]
+                playlist['version'] += 1
+                return 200, {'lastUpdated': 0, 'addedItemIds': ids}
+            if method == "DELETE":
+                # tidalapi 0.8 deletes .../items/<indices>, earlier versions .../tracks/<indices>
+                indices = {int(index) for index in path[3].split(",")}
+                if any(index >= len(items) for index in indices):
+                    return _tidal_error(400, "Index out of range")
+                playlist['items'] = [item for index, item in enumerate(items) if index not in indices]
+                playlist['version'] += 1
+                return 200, {}
+
+            if path[2] == "tracks":
+                entries = [library.tidal_track(media_id - TIDAL_ID_OFFSET) for kind, media_id in items
+                           if kind == 'track']
+                return 200, _tidal_page(entries[offset:offset + limit], len(entries), offset, limit), \
+                    _etag(playlist)
+            entries = [{'item': library.tidal_track(media_id - TIDAL_ID_OFFSET) if kind == 'track'
+                        else library.tidal_video(media_id), 'type': kind, 'cut': None}
+                       for kind, media_id in items[offset:offset + limit]]
+            return 200, _tidal_page(entries, len(items), offset, limit), _etag(playlist)
+
+    return _tidal_error(404, "Unknown endpoint")
+
+
+class FakeServices:
+    """Handle on a running fake Spotify/Tidal server"""
+
+    def __init__(self, server: ThreadingHTTPServer, state: FakeServiceState):
+        self.server = server
+        self.state = state
+        self.url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def start_fake_services(library: SyntheticLibrary, spotify_latency: float = 0.0,
+                        tidal_latency: float = 0.0, spotify_throttle_rate: float = 0.0,
+                        tidal_throttle_rate: float = 0.0, retry_after: float = 0.1) -> FakeServices:
+    """
+    Start the fake services on a free local port in a background thread
+
+    Args:
+        library: Synthetic library the services serve
+        spotify_latency: Seconds added to every Spotify response
+        tidal_latency: Seconds added to every Tidal response
+        spotify_throttle_rate: Fraction of Spotify requests answered with HTTP 429
+        tidal_throttle_rate: Fraction of Tidal requests answered with HTTP 429
+        retry_after: Retry-After seconds sent with injected 429 responses (whole seconds for Tidal)
+
+    Returns:
+        FakeServices: Running server; call stop() when done
+    """
+    state = FakeServiceState(
+        library,
+        latency={'spotify': spotify_latency, 'tidal': tidal_latency},
+        throttle_rate={'spotify': spotify_throttle_rate, 'tidal': tidal_throttle_rate},
+        retry_after=retry_after
+    )
+    handler = type("FakeServiceHandler", (_Handler,), {'state': state})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return FakeServices(server, state)
+
+
+# ---------------------------------------------------------------------------
+# Clients pointed at the fake services
+# ---------------------------------------------------------------------------
+
+def fake_spotify_client(base_url: str):
+    """
+    Create a real spotipy client that talks to the fake Spotify service
+
+    spotipy's own 429 retries are disabled so throttling reaches the
+    tool's shared rate limiter, as it does in production.
+    """
+    import spotipy
+
+    client = spotipy.Spotify(auth="benchmark-token", retries=0, status_retries=0,
+                             status_forcelist=(500, 502, 503, 504), requests_timeout=30)
+    client.prefix = f"{base_url}/spotify/v1/"
+    return client
+
+
+def fake_tidal_session(base_url: str):
+    """
+    Create a real tidalapi session that talks to the fake Tidal service
+
+    Only the login is skipped: the session loads a made-up OAuth token, and
+    every search, paged listing, write and response parse afterwards goes
+    through tidalapi's own code, as it does in production.
+    """
+    import tidalapi
+
+    config = tidalapi.Config()
+    # tidalapi 0.7.3 names the v1 location api_location
+    config.api_location = config.api_v1_location = f"{base_url}/tidal/v1/"
+    config.api_v2_location = f"{base_url}/tidal/v2/"
+    session = tidalapi.Session(config)
+    if not session.load_oauth_session("Bearer", "benchmark-token"):
+        raise RuntimeError(f"Fake Tidal service at {base_url} refused the session")
+    return session
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Transfer Benchmarks
+Measures fetch and transfer throughput against local stand-in Spotify and Tidal services
+"""
+
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Dict, List
+
+import requests
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))  # Repository root, for the tool's modules
+sys.path.insert(0, BENCH_DIR)
+
+from fake_services import (SyntheticLibrary, start_fake_services, fake_spotify_client,  # noqa: E402
+                           fake_tidal_session)
+
+SCENARIOS = ('liked', 'transfer', 'playlist')
+DEFAULT_SIZES = "1000,10000"
+BENCH_RATE = 500.0  # Tidal/Spotify requests per second allowed by the limiter during benchmarks
+
+
+def _peak_rss_mb() -> float:
+    """Peak resident set size of this process in MiB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _run_scenario(scenario: str, url: str, options: Dict, results) -> None:
+    """
+    Run one scenario in this (child) process and put its measurements on `results`
+
+    Each scenario runs in a fresh process with empty caches in a scratch
+    directory, so runs do not warm each other up and peak memory is per scenario.
+    """
+    os.chdir(tempfile.mkdtemp(prefix="transfer-bench-"))
+
+    import spotify_auth
+    import tidal_auth
+    from rate_limiter import configure_rate_limiter
+    from spotify_tracks import get_liked_songs
+    from spotify_playlists import get_user_playlists, get_playlist_tracks
+    from tidal_tracks import transfer_tracks
+    from tidal_playlists import transfer_playlist
+
+    spotify_auth.set_spotify_client(fake_spotify_client(url))
+    tidal_auth.set_tidal_session(fake_tidal_session(url))
+    for service in ("tidal", "spotify"):
+        configure_rate_limiter(options['rate'], options['burst'], service)
+
+    quiet = open(os.devnull, 'w')
+
+    # Untimed preparation: fetch the input the timed phase works on
+    with contextlib.redirect_stdout(quiet):
+        if scenario == 'transfer':
+            tracks = get_liked_songs()
+        elif scenario == 'playlist':
+            playlist = get_user_playlists(limit=1)[0]
+            tracks = get_playlist_tracks(playlist['id'])
+
+    requests.post(f"{url}/_reset")
+    if options['trace_memory']:
+        tracemalloc.start()
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(quiet):
+        if scenario == 'liked':
+            count = len(get_liked_songs())
+        elif scenario == 'transfer':
+            count = transfer_tracks(tracks, workers=options['workers'])['total']
+        else:
+            transfer_playlist(playlist, tracks, workers=options['workers'])
+            count = len(tracks)
+    elapsed = time.perf_counter() - start
+
+    traced_peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024) if options['trace_memory'] else None
+    server = requests.get(f"{url}/_stats").json()
+    request_count = sum(server['requests'].values())
+
+    results.put({
+        'scenario': scenario,
+        'tracks': count,
+        'seconds': round(elapsed, 3),
+        'tracks_per_sec': round(count / elapsed, 1) if elapsed else None,
+        'requests': request_count,
+        'requests_per_track': round(request_count / count, 3) if count else None,
+        'throttled': sum(server['throttled'].values()),
+        'requests_by_endpoint': server['requests'],
+        'peak_rss_mb': round(_peak_rss_mb(), 1),
+        'traced_peak_mb': round(traced_peak, 1) if traced_peak is not None else None,
+    })
+
+
+def run_benchmarks(args) -> List[Dict]:
+    """Run every requested scenario for every library size and return the measurements"""
+    context = multiprocessing.get_context("spawn")
+    options = {'workers': args.workers, 'rate': args.rate, 'burst': args.burst,
+               'trace_memory': args.trace_memory}
+    measurements = []
+
+    for size in args.sizes:
+        library = SyntheticLibrary(size, isrc_coverage=args.isrc_coverage, missing=args.missing,
+                                   playlist_size=args.playlist_size, seed=args.seed)
+        services = start_fake_services(
+            library,
+            spotify_latency=args.spotify_latency_ms / 1000,
+            tidal_latency=args.tidal_latency_ms / 1000,
+            spotify_throttle_rate=args.throttle_rate,
+            tidal_throttle_rate=args.throttle_rate,
+            retry_after=args.retry_after
+        )
+        try:
+            for scenario in args.scenarios:
+                results = context.Queue()
+                process = context.Process(target=_run_scenario, args=(scenario, services.url, options, results))
+                process.start()
+                process.join()
+                if process.exitcode != 0:
+                    print(f"✗ {scenario} ({size} tracks) failed with exit code {process.exitcode}")
+                    continue
+                measurement = results.get()
+                measurement['library_size'] = size
+                measurements.append(measurement)
+                print(_format_row(measurement))
+        finally:
+            services.stop()
+
+    return measurements
+
+
+def _format_row(m: Dict) -> str:
+    traced = f"{m['traced_peak_mb']:>8.1f}" if m['traced_peak_mb'] is not None else f"{'-':>8}"
+    return (f"{m['scenario']:<9} {m['library_size']:>8} {m['tracks']:>8} {m['seconds']:>9.2f} "
+            f"{m['tracks_per_sec']:>10.1f} {m['requests_per_track']:>9.3f} {m['throttled']:>6} "
+            f"{m['peak_rss_mb']:>9.1f} {traced}")
+
+
+def compare_to_baseline(measurements: List[Dict], baseline: List[Dict], tolerance: float) -> List[str]:
+    """
+    Compare measurements with a previous --out file
+
+    Returns:
+        List of regression descriptions (empty if none)
+    """
+    previous = {(m['scenario'], m['library_size']): m for m in baseline}
+    regressions = []
+
+    for m in measurements:
+        old = previous.get((m['scenario'], m['library_size']))
+        if not old:
+            continue
+        name = f"{m['scenario']} ({m['library_size']} tracks)"
+        if old['tracks_per_sec'] and m['tracks_per_sec'] < old['tracks_per_sec'] * (1 - tolerance):
+            regressions.append(f"{name}: {m['tracks_per_sec']} tracks/sec, was {old['tracks_per_sec']}")
+        if old['requests_per_track'] and m['requests_per_track'] > old['requests_per_track'] * (1 + tolerance):
+            regressions.append(f"{name}: {m['requests_per_track']} requests/track, was {old['requests_per_track']}")
+        if old['peak_rss_mb'] and m['peak_rss_mb'] > old['peak_rss_mb'] * (1 + tolerance):
+            regressions.append(f"{name}: {m['peak_rss_mb']} MiB peak RSS, was {old['peak_rss_mb']}")
+
+    return regressions
+
+
+def _csv(kind):
+    """argparse type for comma-separated lists"""
+    def parse(value):
+        return [kind(item) for item in value.split(",") if item]
+    return parse
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark the transfer against local stand-in Spotify and Tidal services',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Quick run with the default library sizes
+  python benchmarks/run_benchmarks.py
+
+  # 100k-track library, 30 ms latency and 2% throttled responses
+  python benchmarks/run_benchmarks.py --sizes 100000 --tidal-latency-ms 30 --throttle-rate 0.02
+
+  # Save results and fail if a later run regresses by more than 20%
+  python benchmarks/run_benchmarks.py --out baseline.json
+  python benchmarks/run_benchmarks.py --baseline baseline.json --tolerance 0.2
+        """
+    )
+    parser.add_argument('--sizes', type=_csv(int), default=_csv(int)(DEFAULT_SIZES), metavar='N[,N...]',
+                        help=f'Synthetic library sizes in tracks (default: {DEFAULT_SIZES})')
+    parser.add_argument('--scenarios', type=_csv(str), default=list(SCENARIOS), metavar='NAME[,NAME...]',
+                        help=f'Scenarios to run: {", ".join(SCENARIOS)} (default: all)')
+    parser.add_argument('--isrc-coverage', type=float, default=0.9, metavar='F',
+                        help='Fraction of tracks with an ISRC (default: 0.9)')
+    parser.add_argument('--missing', type=float, default=0.05, metavar='F',
+                        help='Fraction of tracks missing from Tidal (default: 0.05)')
+    parser.add_argument('--playlist-size', type=int, default=500, metavar='N',
+                        help='Tracks in the benchmarked playlist (default: 500)')
+    parser.add_argument('--spotify-latency-ms', type=float, default=20.0, metavar='MS',
+                        help='Latency added to each Spotify response (default: 20)')
+    parser.add_argument('--tidal-latency-ms', type=float, default=20.0, metavar='MS',
+                        help='Latency added to each Tidal response (default: 20)')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, metavar='F',
+                        help='Fraction of requests answered with HTTP 429 (default: 0)')
+    parser.add_argument('--retry-after', type=float, default=0.1, metavar='S',
+                        help='Retry-After seconds sent with injected 429s; Tidal rounds to whole '
+                             'seconds (default: 0.1)')
+    parser.add_argument('--workers', type=int, default=4, metavar='N',
+                        help='Concurrent Tidal searches (default: 4)')
+    parser.add_argument('--rate', type=float, default=BENCH_RATE, metavar='N',
+                        help=f'Rate limiter requests per second (default: {BENCH_RATE:g})')
+    parser.add_argument('--burst', type=int, default=20, metavar='N',
+                        help='Rate limiter burst (default: 20)')
+    parser.add_argument('--seed', type=int, default=1, help='Synthetic library seed (default: 1)')
+    parser.add_argument('--trace-memory', action='store_true',
+                        help='Also report the tracemalloc peak of the timed phase (slows the run)')
+    parser.add_argument('--out', metavar='FILE', help='Write the measurements to a JSON file')
+    parser.add_argument('--baseline', metavar='FILE', help='Compare with measurements from an earlier --out')
+    parser.add_argument('--tolerance', type=float, default=0.2, metavar='F',
+                        help='Allowed relative regression against --baseline (default: 0.2)')
+    args = parser.parse_args()
+
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"Unknown scenario(s): {', '.join(sorted(unknown))}")
+
+    print("=" * 92)
+    print("Transfer Benchmarks")
+    print("=" * 92)
+    print(f"{'scenario':<9} {'library':>8} {'tracks':>8} {'seconds':>9} {'tracks/s':>10} "
+          f"{'req/track':>9} {'429s':>6} {'peak RSS':>9} {'traced':>8}")
+    print("-" * 92)
+
+    measurements = run_benchmarks(args)
+
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(measurements, f, indent=2)
+        print(f"\n✓ Measurements written to {args.out}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare_to_baseline(measurements, json.load(f), args.tolerance)
+        if regressions:
+            print(f"\n✗ Regressions against {args.baseline}:")
+            for regression in regressions:
+                print(f"  - {regression}")
+            return 1
+        print(f"\n✓ No regressions against {args.baseline}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
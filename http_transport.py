@@ -0,0 +1,242 @@
+"""
+HTTP Transport Module
+Records Spotify and Tidal API responses to a cassette file and replays them offline
+"""
+
+import gzip
+import hashlib
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from datetime import datetime, timezone
+from typing import Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+CASSETTE_FILE = "api_cassette.jsonl.gz"
+
+# Token endpoints are never recorded: their responses carry credentials
+SKIPPED_HOSTS = ('accounts.spotify.com', 'auth.tidal.com', 'login.tidal.com')
+
+# Query parameters that differ between runs without changing the response
+IGNORED_PARAMS = ('sessionId',)
+
+# Response headers the API clients read; everything else is dropped from the cassette
+KEPT_HEADERS = ('Content-Type', 'Retry-After', 'ETag', 'Location')
+
+
+def request_key(request: requests.PreparedRequest) -> str:
+    """
+    Build the key a request is recorded and replayed under
+
+    The key is the method, host, path and sorted query (minus IGNORED_PARAMS),
+    plus a short hash of the body so different writes to the same endpoint
+    are told apart. Auth headers are not part of the key, so a cassette
+    replays with any (or no) token.
+    """
+    url = urlsplit(request.url)
+    query = sorted((k, v) for k, v in parse_qsl(url.query, keep_blank_values=True) if k not in IGNORED_PARAMS)
+    key = f"{request.method} {url.netloc}{url.path}"
+    if query:
+        key += "?" + urlencode(query)
+    body = request.body
+    if body:
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        key += " #" + hashlib.sha1(body).hexdigest()[:12]
+    return key
+
+
+class Cassette:
+    """
+    Gzip-compressed JSON Lines file of recorded API responses
+
+    Every line holds one response: its request key, status, the headers the
+    clients need, the body and the time the server took to answer. When a
+    key was recorded more than once (e.g. a paged endpoint polled twice),
+    replay returns the recordings in order and then keeps repeating the last.
+    """
+
+    def __init__(self, path: str = CASSETTE_FILE, mode: str = 'replay'):
+        """
+        Open a cassette
+
+        Args:
+            path: Location of the cassette file
+            mode: 'record' to write a new cassette, 'replay' to read one
+        """
+        self.path = path
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._responses: Dict[str, deque] = defaultdict(deque)
+        self._last: Dict[str, Dict] = {}
+        self.recorded = 0
+        self.replayed = 0
+        self.missed = 0
+
+        if mode == 'record':
+            self._file = gzip.open(path, 'wt', encoding='utf-8')
+            self._write({'cassette': 1, 'created': datetime.now(timezone.utc).isoformat()})
+        else:
+            self._file = None
+            self._load()
+
+    def _load(self) -> None:
+        """Read every recorded response"""
+        try:
+            with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # Partially written line from an interrupted recording
+                    if 'k' in entry:
+                        self._responses[entry['k']].append(entry)
+        except EOFError:
+            pass  # Recording was interrupted; keep what was read
+
+    def _write(self, entry: Dict) -> None:
+        self._file.write(json.dumps(entry, separators=(',', ':')) + "\n")
+
+    def record(self, request: requests.PreparedRequest, response: requests.Response, elapsed: float) -> None:
+        """Append a response to the cassette"""
+        entry = {
+            'k': request_key(request),
+            's': response.status_code,
+            'h': {name: response.headers[name] for name in KEPT_HEADERS if name in response.headers},
+            'b': response.content.decode('utf-8', errors='replace'),
+            't': round(elapsed, 4)
+        }
+        with self._lock:
+            self._write(entry)
+            self.recorded += 1
+
+    def take(self, request: requests.PreparedRequest) -> Optional[Dict]:
+        """Return the next recorded response for a request, or None if it was never recorded"""
+        key = request_key(request)
+        with self._lock:
+            queue = self._responses.get(key)
+            if queue:
+                self._last[key] = queue.popleft()
+            entry = self._last.get(key)
+            if entry is None:
+                self.missed += 1
+            else:
+                self.replayed += 1
+            return entry
+
+    def close(self) -> None:
+        """Flush and close a cassette being recorded"""
+        with self._lock:
+            if self._file is not None and not self._file.closed:
+                self._file.close()
+
+
+class RecordingAdapter(HTTPAdapter):
+    """HTTPAdapter that sends requests normally and records the responses"""
+
+    def __init__(self, cassette: Cassette, **kwargs):
+        super().__init__(**kwargs)
+        self.cassette = cassette
+
+    def send(self, request, **kwargs):
+        start = time.monotonic()
+        response = super().send(request, **kwargs)
+        if urlsplit(request.url).hostname not in SKIPPED_HOSTS:
+            _ = response.content  # Read the body while timing the request
+            self.cassette.record(request, response, time.monotonic() - start)
+        return response
+
+
+class ReplayAdapter(BaseAdapter):
+    """Adapter that answers requests from a cassette without touching the network"""
+
+    def __init__(self, cassette: Cassette, latency: bool = False):
+        super().__init__()
+        self.cassette = cassette
+        self.latency = latency
+
+    def send(self, request, **kwargs):
+        entry = self.cassette.take(request)
+        if entry is None:
+            raise requests.ConnectionError(
+                f"No recorded response for {request_key(request)} in {self.cassette.path}", request=request
+            )
+        if self.latency:
+            time.sleep(entry['t'])
+
+        response = requests.Response()
+        response.status_code = entry['s']
+        response.headers = CaseInsensitiveDict(entry['h'])
+        response._content = entry['b'].encode('utf-8')
+        response.encoding = 'utf-8'
+        response.url = request.url
+        response.request = request
+        response.reason = "Replayed"
+        return response
+
+    def close(self):
+        pass
+
+
+_cassette: Optional[Cassette] = None
+_replay_latency = False
+
+
+def configure_transport(mode: Optional[str], path: str = CASSETTE_FILE, latency: bool = False) -> None:
+    """
+    Select how API clients created from now on send their requests
+
+    Args:
+        mode: 'record', 'replay', or None for plain network access
+        path: Cassette file to write or read
+        latency: When replaying, wait as long as each recorded response took
+    """
+    global _cassette, _replay_latency
+    close_transport()
+    _cassette = Cassette(path, mode) if mode else None
+    _replay_latency = latency
+
+
+def transport_mode() -> Optional[str]:
+    """Return 'record', 'replay' or None"""
+    return _cassette.mode if _cassette else None
+
+
+def install_transport(session: requests.Session) -> None:
+    """
+    Mount the configured record or replay adapter on an API client's requests session
+
+    The recording adapter keeps the retry policy of the adapter it replaces.
+
+    Args:
+        session: requests.Session used by spotipy or tidalapi
+    """
+    if _cassette is None:
+        return
+    if _cassette.mode == 'record':
+        retries = session.get_adapter("https://").max_retries
+        adapter = RecordingAdapter(_cassette, max_retries=retries)
+    else:
+        adapter = ReplayAdapter(_cassette, _replay_latency)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+
+def close_transport() -> Optional[Dict[str, int]]:
+    """
+    Close the active cassette
+
+    Returns:
+        Dict with 'recorded', 'replayed' and 'missed' counts, or None if no cassette was active
+    """
+    global _cassette
+    if _cassette is None:
+        return None
+    cassette, _cassette = _cassette, None
+    cassette.close()
+    return {'recorded': cassette.recorded, 'replayed': cassette.replayed, 'missed': cassette.missed}
@@ -4,124 +4,211 @@ Spotify to Tidal Transfer Tool
 Transfers your liked songs and playlists from Spotify to Tidal
 """
 
+import os
 import sys
 import argparse
-from spotify_tracks import get_liked_songs, display_track_info
-from spotify_playlists import get_user_playlists, get_playlist_tracks, display_playlist_info
-from tidal_tracks import transfer_tracks
-from tidal_playlists import transfer_playlist, playlist_exists
+from spotify_tracks import get_liked_songs, iter_liked_songs, count_liked_songs, display_track_info
+from spotify_playlists import get_user_playlists, get_playlist_tracks, iter_playlist_tracks, display_playlist_info
+from tidal_tracks import transfer_tracks, resolve_unique_tracks
+from tidal_playlists import transfer_playlist, sync_existing_playlist, playlist_exists, PLAYLIST_CHUNK_SIZE
 from spotify_auth import test_connection as test_spotify
 from tidal_auth import test_connection as test_tidal
-
-
-def transfer_playlists_mode(args):
-    """Handle playlist transfer mode"""
-    try:
-        # Fetch playlists from Spotify
-        print("\nFetching your playlists from Spotify...")
-        playlists = get_user_playlists(limit=args.playlist_limit)
-        
-        if not playlists:
-            print("No playlists found on Spotify.")
-            return 0
+from rate_limiter import configure_rate_limiter, DEFAULT_RATE, DEFAULT_BURST
+from parallel import prefetch
+from transfer_journal import TransferJournal, JOURNAL_FILE
+from sync_state import get_liked_songs_watermark, set_liked_songs_watermark
+from http_transport import configure_transport, close_transport, CASSETTE_FILE
+from metrics import metrics
+from progress import configure_progress, close_progress
+from work_queue import resolve_with_queue, QUEUE_FILE
+
+# Tracks buffered between the Spotify fetch and Tidal search stages in --stream mode
+STREAM_BUFFER_SIZE = 1000
+
+
+def confirm(args, question: str) -> bool:
+    """
+    Ask a yes/no question, or answer yes automatically with --yes
+
+    Args:
+        args: Parsed command line arguments
+        question: Question shown to the user
+
+    Returns:
+        bool: True if the user agreed
+    """
+    if args.yes:
+        print(f"{question} yes (--yes)")
+        return True
+    response = input(f"{question} (yes/no): ").lower().strip()
+    return response in ['yes', 'y']
+
+
+def select_playlists(args, journal):
+    """
+    Fetch the user's Spotify playlists and ask which ones to transfer
+
+    Returns:
+        Tuple of (selected playlists, exit code to use when none are selected)
+    """
+    # Fetch playlists from Spotify
+    print("\nFetching your playlists from Spotify...")
+    playlists = get_user_playlists(limit=args.playlist_limit)
+    
+    if not playlists:
+        print("No playlists found on Spotify.")
+        return [], 0
+    
+    # Show playlists
+    print(f"\nFound {len(playlists)} playlist(s):")
+    print("-" * 60)
+    for i, playlist in enumerate(playlists, 1):
+        print(f"{i}. {display_playlist_info(playlist)}")
+    
+    # Ask which playlists to transfer (--yes takes every listed playlist)
+    if not args.all_playlists and not args.yes:
+        print("\nWhich playlists would you like to transfer?")
+        print("Enter playlist numbers separated by commas (e.g., 1,3,5)")
+        print("Or enter 'all' to transfer all playlists: ")
         
-        # Show playlists
-        print(f"\nFound {len(playlists)} playlist(s):")
-        print("-" * 60)
-        for i, playlist in enumerate(playlists, 1):
-            print(f"{i}. {display_playlist_info(playlist)}")
+        selection = input().strip().lower()
         
-        # Ask which playlists to transfer
-        if not args.all_playlists:
-            print("\nWhich playlists would you like to transfer?")
-            print("Enter playlist numbers separated by commas (e.g., 1,3,5)")
-            print("Or enter 'all' to transfer all playlists: ")
-            
-            selection = input().strip().lower()
-            
-            if selection == 'all':
-                selected_playlists = playlists
-            else:
-                try:
-                    # Parse the selection
-                    indices = [int(x.strip()) - 1 for x in selection.split(',')]
-                    selected_playlists = [playlists[i] for i in indices if 0 <= i < len(playlists)]
-                    
-                    if not selected_playlists:
-                        print("No valid playlists selected.")
-                        return 0
-                except (ValueError, IndexError):
-                    print("Invalid selection.")
-                    return 1
-        else:
+        if selection == 'all':
             selected_playlists = playlists
+        else:
+            try:
+                # Parse the selection
+                indices = [int(x.strip()) - 1 for x in selection.split(',')]
+                selected_playlists = [playlists[i] for i in indices if 0 <= i < len(playlists)]
+                
+                if not selected_playlists:
+                    print("No valid playlists selected.")
+                    return [], 0
+            except (ValueError, IndexError):
+                print("Invalid selection.")
+                return [], 1
+    else:
+        selected_playlists = playlists
+    
+    # Check for existing playlists if not overwriting or syncing into them
+    if not args.overwrite and not args.sync:
+        print("\nChecking for existing playlists on Tidal...")
+        existing = []
+        for playlist in selected_playlists:
+            # Playlists started by an interrupted run are continued, not duplicated
+            if journal.playlist_state(playlist['id']):
+                continue
+            if playlist_exists(playlist['name']):
+                existing.append(playlist['name'])
         
-        # Check for existing playlists if not overwriting
-        if not args.overwrite:
-            print("\nChecking for existing playlists on Tidal...")
-            existing = []
-            for playlist in selected_playlists:
-                if playlist_exists(playlist['name']):
-                    existing.append(playlist['name'])
+        if existing:
+            print(f"\nWarning: The following playlists already exist on Tidal:")
+            for name in existing:
+                print(f"  - {name}")
             
-            if existing:
-                print(f"\nWarning: The following playlists already exist on Tidal:")
-                for name in existing:
-                    print(f"  - {name}")
+            if args.yes:
+                # Unattended runs never create duplicates; pass --sync or --overwrite to decide otherwise
+                print("Skipping existing playlists (--yes)")
+                choice = '1'
+            else:
                 print("\nDo you want to:")
                 print("1. Skip existing playlists")
                 print("2. Create duplicates (will have the same name)")
                 print("3. Cancel")
+                print("4. Sync into existing playlists (only add missing tracks)")
                 
-                choice = input("Enter your choice (1/2/3): ").strip()
-                
-                if choice == '1':
-                    selected_playlists = [p for p in selected_playlists if p['name'] not in existing]
-                    if not selected_playlists:
-                        print("No playlists to transfer after skipping existing ones.")
-                        return 0
-                elif choice == '3':
-                    print("Transfer cancelled.")
-                    return 0
-                # Choice 2 continues with all playlists
-        
-        # Confirm transfer
-        total_tracks = sum(p['total_tracks'] for p in selected_playlists)
-        print(f"\nReady to transfer {len(selected_playlists)} playlist(s) with approximately {total_tracks} total tracks.")
-        response = input("Do you want to continue? (yes/no): ").lower().strip()
-        
-        if response not in ['yes', 'y']:
-            print("Transfer cancelled.")
-            return 0
-        
-        # Transfer playlists
-        print("\n" + "=" * 60)
-        print("Starting Playlist Transfer")
-        print("=" * 60)
+                choice = input("Enter your choice (1/2/3/4): ").strip()
+            
+            if choice == '1':
+                selected_playlists = [p for p in selected_playlists if p['name'] not in existing]
+                if not selected_playlists:
+                    print("No playlists to transfer after skipping existing ones.")
+                    return [], 0
+            elif choice == '3':
+                print("Transfer cancelled.")
+                return [], 0
+            elif choice == '4':
+                args.sync = True
+            # Choice 2 continues with all playlists
+    
+    # Confirm transfer
+    total_tracks = sum(p['total_tracks'] for p in selected_playlists)
+    print(f"\nReady to transfer {len(selected_playlists)} playlist(s) with approximately {total_tracks} total tracks.")
+    if not confirm(args, "Do you want to continue?"):
+        print("Transfer cancelled.")
+        return [], 0
+
+    return selected_playlists, 0
+
+
+def transfer_selected_playlists(args, journal, selected_playlists, playlist_tracks=None, resolved=None):
+    """
+    Transfer (or sync) the selected playlists to Tidal
+
+    Args:
+        args: Parsed command line arguments
+        journal: TransferJournal recording progress
+        selected_playlists: Playlists chosen by select_playlists
+        playlist_tracks: Optional tracks of each selected playlist, already fetched
+        resolved: Optional results of resolve_unique_tracks shared by every playlist
+
+    Returns:
+        int: Exit code
+    """
+    # Transfer playlists
+    print("\n" + "=" * 60)
+    print("Starting Playlist Transfer")
+    print("=" * 60)
+    
+    successful = 0
+    failed = 0
+    
+    for i, playlist in enumerate(selected_playlists, 1):
+        print(f"\n[{i}/{len(selected_playlists)}] Processing: {playlist['name']}")
         
-        successful = 0
-        failed = 0
+        # Fetch tracks for this playlist
+        if playlist_tracks is not None:
+            tracks = playlist_tracks[i - 1]
+        elif args.stream:
+            tracks = prefetch(iter_playlist_tracks(playlist['id'], snapshot_id=playlist['snapshot_id']),
+                              STREAM_BUFFER_SIZE)
+        else:
+            with metrics.phase("fetch_playlist_tracks"):
+                tracks = get_playlist_tracks(playlist['id'], snapshot_id=playlist['snapshot_id'])
         
-        for i, playlist in enumerate(selected_playlists, 1):
-            print(f"\n[{i}/{len(selected_playlists)}] Processing: {playlist['name']}")
-            
-            # Fetch tracks for this playlist
-            tracks = get_playlist_tracks(playlist['id'])
-            
-            if transfer_playlist(playlist, tracks):
-                successful += 1
+        with metrics.phase("transfer_playlists"):
+            if args.sync:
+                ok = sync_existing_playlist(playlist, tracks, workers=args.workers, journal=journal,
+                                            chunk_size=args.chunk_size, remove_stale=args.remove_stale,
+                                            resolved=resolved)
             else:
-                failed += 1
-        
-        # Final summary
-        print("\n" + "=" * 60)
-        print("Playlist Transfer Complete!")
-        print("=" * 60)
-        print(f"Successfully transferred: {successful} playlist(s)")
-        if failed > 0:
-            print(f"Failed: {failed} playlist(s)")
+                ok = transfer_playlist(playlist, tracks, workers=args.workers, journal=journal,
+                                       chunk_size=args.chunk_size, resolved=resolved)
         
-        return 0 if successful > 0 else 1
+        if ok:
+            successful += 1
+        else:
+            failed += 1
+    
+    # Final summary
+    print("\n" + "=" * 60)
+    print("Playlist Transfer Complete!")
+    print("=" * 60)
+    print(f"Successfully transferred: {successful} playlist(s)")
+    if failed > 0:
+        print(f"Failed: {failed} playlist(s)")
+    
+    return 0 if successful > 0 else 1
+
+
+def transfer_playlists_mode(args, journal):
+    """Handle playlist transfer mode"""
+    try:
+        selected_playlists, result = select_playlists(args, journal)
+        if not selected_playlists:
+            return result
+
+        return transfer_selected_playlists(args, journal, selected_playlists)
         
     except KeyboardInterrupt:
         print("\n\nTransfer interrupted by user.")
@@ -133,6 +220,48 @@ def transfer_playlists_mode(args):
         return 1
 
 
+def liked_songs_exit_code(stats):
+    """Determine the exit code of a liked songs transfer from its stats"""
+    if stats['added'] == stats['total']:
+        return 0  # All successful
+    elif stats['added'] > 0:
+        return 0  # Partial success (still consider success)
+    else:
+        return 1  # No songs transferred
+
+
+def transfer_liked_songs_streaming(args, journal):
+    """
+    Transfer liked songs without materializing the library
+
+    Spotify pages are fetched on a background thread into a bounded buffer
+    while earlier tracks are already being searched and written to Tidal.
+    """
+    total = count_liked_songs()
+    if args.limit:
+        total = min(total, args.limit)
+
+    if not total:
+        print("No liked songs found on Spotify.")
+        return 0
+
+    # Confirm transfer
+    print(f"\nReady to transfer {total} liked songs to Tidal.")
+    if not confirm(args, "Do you want to continue?"):
+        print("Transfer cancelled.")
+        return 0
+
+    print("\nStreaming liked songs from Spotify to Tidal...")
+    liked_songs = iter_liked_songs(max_items=args.limit or None)
+
+    with metrics.phase("transfer_liked_songs"):
+        stats = transfer_tracks(
+            prefetch(liked_songs, STREAM_BUFFER_SIZE), workers=args.workers, total=total, journal=journal
+        )
+
+    return liked_songs_exit_code(stats)
+
+
 def main():
     """Main function to orchestrate the transfer"""
     parser = argparse.ArgumentParser(
@@ -152,11 +281,36 @@ Examples:
   # Transfer first 5 playlists
   python main.py --playlists --playlist-limit 5
 
+  # Re-sync playlists that already exist on Tidal
+  python main.py --playlists --all-playlists --sync
+
   # Test connections only
   python main.py --test
 
   # Preview first 10 liked songs without transferring
   python main.py --preview 10
+
+  # Nightly sync: only transfer songs liked since the last run
+  python main.py --likes --incremental
+
+  # Continue a transfer that was interrupted
+  python main.py --likes --resume
+
+  # Stream a very large library without loading it into memory first
+  python main.py --likes --stream
+
+  # Record a run, then replay it offline (e.g. for profiling)
+  python main.py --likes --record
+  python main.py --likes --replay --replay-latency
+
+  # Save API call counts, latencies and phase timings of a run
+  python main.py --likes --metrics-out metrics.json
+
+  # Search a very large library with 4 worker processes
+  python main.py --likes --processes 4
+
+  # Unattended run: no prompts or progress lines, one JSON record per track in a log file
+  python main.py --likes --yes --quiet --jsonl transfer.jsonl
         """
     )
 
@@ -215,8 +369,207 @@ Examples:
         help='Create duplicate playlists even if they already exist on Tidal'
     )
 
+    parser.add_argument(
+        '--sync',
+        action='store_true',
+        help='Sync into playlists that already exist on Tidal, adding only missing tracks'
+    )
+
+    parser.add_argument(
+        '--remove-stale',
+        action='store_true',
+        help='With --sync, also remove tracks that are no longer on the Spotify playlist'
+    )
+
+    parser.add_argument(
+        '--chunk-size',
+        type=int,
+        default=PLAYLIST_CHUNK_SIZE,
+        metavar='N',
+        help=f'Number of tracks added to a Tidal playlist per request (default: {PLAYLIST_CHUNK_SIZE})'
+    )
+
+    # Performance options
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=4,
+        metavar='N',
+        help='Number of concurrent Tidal searches (default: 4, use 1 to search sequentially)'
+    )
+
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Only transfer liked songs added since the last incremental run'
+    )
+
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help=f'Continue an interrupted transfer, skipping work recorded in {JOURNAL_FILE}'
+    )
+
+    parser.add_argument(
+        '--stream',
+        action='store_true',
+        help='Stream tracks from Spotify to Tidal as they are fetched instead of '
+             'loading the whole library first (keeps memory flat for large libraries)'
+    )
+
+    parser.add_argument(
+        '--rate',
+        type=float,
+        default=DEFAULT_RATE,
+        metavar='N',
+        help=f'Maximum Tidal requests per second (default: {DEFAULT_RATE:g}); '
+             'the rate backs off automatically when Tidal throttles'
+    )
+
+    parser.add_argument(
+        '--burst',
+        type=int,
+        default=DEFAULT_BURST,
+        metavar='N',
+        help=f'Maximum Tidal requests sent back-to-back (default: {DEFAULT_BURST})'
+    )
+
+    parser.add_argument(
+        '--record',
+        nargs='?',
+        const=CASSETTE_FILE,
+        metavar='FILE',
+        help=f'Record every Spotify and Tidal API response of this run to a cassette file '
+             f'(default: {CASSETTE_FILE})'
+    )
+
+    parser.add_argument(
+        '--replay',
+        nargs='?',
+        const=CASSETTE_FILE,
+        metavar='FILE',
+        help='Replay a recorded cassette instead of calling Spotify and Tidal (no network or login needed)'
+    )
+
+    parser.add_argument(
+        '--replay-latency',
+        action='store_true',
+        help='With --replay, wait as long as each recorded response originally took'
+    )
+
+    parser.add_argument(
+        '--processes',
+        type=int,
+        default=0,
+        metavar='N',
+        help='Search tracks in N worker processes that share a work queue file; '
+             '--rate is split between them (default: search in this process)'
+    )
+
+    parser.add_argument(
+        '--queue',
+        default=QUEUE_FILE,
+        metavar='FILE',
+        help=f'Work queue file used with --processes (default: {QUEUE_FILE})'
+    )
+
+    parser.add_argument(
+        '--yes', '-y',
+        action='store_true',
+        help='Answer every prompt for unattended runs: continue, transfer all listed playlists '
+             'and skip those that already exist on Tidal'
+    )
+
+    parser.add_argument(
+        '--quiet',
+        action='store_true',
+        help='Do not print progress while tracks are transferred; only summaries'
+    )
+
+    parser.add_argument(
+        '--jsonl',
+        metavar='FILE',
+        help='Append one JSON record per track (target, Spotify ID, status, Tidal ID) to FILE'
+    )
+
+    parser.add_argument(
+        '--metrics-out',
+        metavar='FILE',
+        help='Write per-endpoint API call counts, latency histograms, 429 counts and phase timings '
+             'to a JSON file when the run ends'
+    )
+
+    parser.add_argument(
+        '--metrics-port',
+        type=int,
+        metavar='PORT',
+        help='Serve the same metrics in the Prometheus text format at http://127.0.0.1:PORT/metrics '
+             'while the run is in progress'
+    )
+
     args = parser.parse_args()
 
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.remove_stale and not args.sync:
+        parser.error("--remove-stale requires --sync")
+    if args.sync and args.overwrite:
+        parser.error("--sync cannot be combined with --overwrite")
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be at least 1")
+    if args.incremental and args.limit:
+        parser.error("--incremental cannot be combined with --limit")
+    if args.rate <= 0 or args.burst < 1:
+        parser.error("--rate must be positive and --burst at least 1")
+    if args.record and args.replay:
+        parser.error("--record cannot be combined with --replay")
+    if args.replay_latency and not args.replay:
+        parser.error("--replay-latency requires --replay")
+    if args.processes < 0:
+        parser.error("--processes cannot be negative")
+    if args.processes and args.stream:
+        parser.error("--processes cannot be combined with --stream")
+    if args.processes and (args.record or args.replay):
+        # Worker processes would call the APIs directly instead of going through the cassette
+        parser.error("--processes cannot be combined with --record or --replay")
+    if args.yes and not (args.likes or args.playlists or args.test or args.preview):
+        parser.error("--yes requires --likes or --playlists")
+    if args.replay and not os.path.exists(args.replay):
+        parser.error(f"Cassette {args.replay} not found; record one first with --record")
+
+    configure_rate_limiter(args.rate, args.burst)
+
+    if args.metrics_port is not None:
+        try:
+            metrics.serve_prometheus(args.metrics_port)
+        except OSError as e:
+            parser.error(f"Cannot serve metrics on port {args.metrics_port}: {e}")
+        print(f"Serving metrics at http://127.0.0.1:{args.metrics_port}/metrics")
+
+    configure_progress(quiet=args.quiet, log_path=args.jsonl)
+
+    if args.record or args.replay:
+        configure_transport('record' if args.record else 'replay', args.record or args.replay,
+                            latency=args.replay_latency)
+    try:
+        return run(args)
+    finally:
+        cassette = close_transport()
+        if cassette and args.record:
+            print(f"\nRecorded {cassette['recorded']} API responses to {args.record}")
+        elif cassette:
+            print(f"\nReplayed {cassette['replayed']} API responses from {args.replay}"
+                  f" ({cassette['missed']} requests were not in the cassette)")
+        records = close_progress()
+        if records is not None:
+            print(f"✓ {records} track records written to {args.jsonl}")
+        if args.metrics_out:
+            metrics.write_json(args.metrics_out)
+            print(f"✓ Metrics written to {args.metrics_out}")
+
+
+def run(args):
+    """Run the mode selected on the command line"""
     print("=" * 60)
     print("Spotify to Tidal Transfer Tool")
     print("=" * 60)
@@ -259,8 +612,9 @@ Examples:
     # Handle preview mode
     if args.preview:
         try:
+            # Only the pages holding the previewed songs are fetched
             print("\nFetching liked songs from Spotify...")
-            liked_songs = get_liked_songs()
+            liked_songs = get_liked_songs(max_items=args.preview)
 
             if not liked_songs:
                 print("No liked songs found on Spotify.")
@@ -275,46 +629,171 @@ Examples:
             print(f"\nError: {e}")
             return 1
 
+    # Progress is journaled so an interrupted transfer can be resumed
+    journal = TransferJournal(resume=args.resume)
+    try:
+        return run_transfers(args, journal)
+    finally:
+        journal.close()
+
+
+def fetch_liked_songs(args):
+    """
+    Fetch the liked songs to transfer and ask for confirmation
+
+    Returns:
+        List of liked songs, or None if there is nothing to transfer
+    """
+    watermark = get_liked_songs_watermark() if args.incremental else None
+
+    print("\nStep 1: Fetching liked songs from Spotify...")
+    with metrics.phase("fetch_liked_songs"):
+        liked_songs = get_liked_songs(since=watermark, max_items=args.limit or None)
+
+    if not liked_songs:
+        if watermark:
+            print("No new liked songs since the last sync.")
+        else:
+            print("No liked songs found on Spotify.")
+        return None
+
+    if args.limit:
+        print(f"\nLimited to first {args.limit} songs for transfer")
+
+    # Confirm transfer
+    print(f"\nReady to transfer {len(liked_songs)} liked songs to Tidal.")
+    if not confirm(args, "Do you want to continue?"):
+        print("Transfer cancelled.")
+        return None
+
+    return liked_songs
+
+
+def transfer_liked_songs(args, journal, liked_songs, resolved=None):
+    """
+    Add fetched liked songs to Tidal favorites
+
+    Args:
+        args: Parsed command line arguments
+        journal: TransferJournal recording progress
+        liked_songs: Songs returned by fetch_liked_songs
+        resolved: Optional results of resolve_unique_tracks
+
+    Returns:
+        int: Exit code
+    """
+    print("\nStep 2: Transferring liked songs to Tidal...")
+    with metrics.phase("transfer_liked_songs"):
+        stats = transfer_tracks(liked_songs, workers=args.workers, journal=journal, resolved=resolved)
+
+    # Only move the watermark forward once every new song has been handled. A song whose
+    # search errored was never looked for, so it blocks the watermark like a failed write.
+    if args.incremental:
+        if stats['failed'] == 0 and stats['search_failed'] == 0:
+            set_liked_songs_watermark(liked_songs[0]['added_at'])
+        elif stats['search_failed']:
+            print(f"\nThe Tidal search failed for {stats['search_failed']} songs; "
+                  "the next incremental run will retry them.")
+        else:
+            print("\nSome songs failed to transfer; the next incremental run will retry them.")
+
+    return liked_songs_exit_code(stats)
+
+
+def pending_tracks(tracks, playlist, journal):
+    """Return the tracks of a playlist that the journal has not completed yet"""
+    state = journal.playlist_state(playlist['id']) or {}
+    if state.get('done'):
+        return []
+    if state.get('tidal_id'):
+        return tracks[state.get('written', 0):]
+    return tracks
+
+
+def run_planned_transfers(args, journal):
+    """
+    Transfer playlists (and liked songs) with one shared resolution phase
+
+    Every selected source is fetched first, the union of their tracks is
+    resolved on Tidal once, and the results are fanned out to each playlist
+    and to favorites, so a track shared by several sources is searched once.
+    With --processes the resolution is spread over worker processes through
+    the work queue; the writes still happen here, in Spotify order.
+    """
+    try:
+        selected_playlists, result = select_playlists(args, journal) if args.playlists else ([], 0)
+
+        liked_songs = fetch_liked_songs(args) if args.likes else None
+        if liked_songs is None and not selected_playlists:
+            return result if not args.likes else 0
+
+        print("\nFetching playlist tracks from Spotify...")
+        # Playlists whose snapshot is unchanged since the last run are read from the local cache
+        with metrics.phase("fetch_playlist_tracks"):
+            playlist_tracks = [
+                get_playlist_tracks(playlist['id'], snapshot_id=playlist['snapshot_id'])
+                for playlist in selected_playlists
+            ]
+
+        # Work left over from an interrupted run is not planned again
+        sources = [
+            pending_tracks(tracks, playlist, journal)
+            for playlist, tracks in zip(selected_playlists, playlist_tracks)
+        ]
+        if liked_songs:
+            sources.append([t for t in liked_songs if not journal.track_done(t['spotify_id'])])
+
+        # A single source gains nothing from planning; it is resolved while writing
+        resolved = None
+        if args.processes:
+            with metrics.phase("resolve"):
+                resolved = resolve_with_queue(sources, args.processes, args.workers, args.queue,
+                                              args.rate, args.burst, resume=args.resume)
+        elif len(sources) > 1:
+            with metrics.phase("resolve"):
+                resolved = resolve_unique_tracks(sources, args.workers)
+
+        if selected_playlists:
+            result = transfer_selected_playlists(args, journal, selected_playlists, playlist_tracks, resolved)
+        if liked_songs:
+            result = transfer_liked_songs(args, journal, liked_songs, resolved)
+        return result
+
+    except KeyboardInterrupt:
+        print("\n\nTransfer interrupted by user.")
+        return 130
+
+    except Exception as e:
+        print(f"\nError: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+
+def run_transfers(args, journal):
+    """Run the playlist and liked songs transfers selected on the command line"""
+    # Streaming keeps memory flat, so only buffered runs collect every source up front
+    if (args.playlists or args.processes) and not args.stream:
+        return run_planned_transfers(args, journal)
+
     # Transfer playlists
     if args.playlists:
-        result = transfer_playlists_mode(args)
+        result = transfer_playlists_mode(args, journal)
         if not args.likes:
             return result
 
     # Transfer liked songs
     if args.likes:
         try:
-            print("\nStep 1: Fetching liked songs from Spotify...")
-            liked_songs = get_liked_songs()
-
-            if not liked_songs:
-                print("No liked songs found on Spotify.")
-                return 0
+            # Incremental runs only fetch a page or two, so they never need streaming
+            if args.stream and not args.incremental:
+                return transfer_liked_songs_streaming(args, journal)
 
-            # Limit songs if specified
-            if args.limit:
-                liked_songs = liked_songs[:args.limit]
-                print(f"\nLimited to first {args.limit} songs for transfer")
-
-            # Confirm transfer
-            print(f"\nReady to transfer {len(liked_songs)} liked songs to Tidal.")
-            response = input("Do you want to continue? (yes/no): ").lower().strip()
-
-            if response not in ['yes', 'y']:
-                print("Transfer cancelled.")
+            liked_songs = fetch_liked_songs(args)
+            if liked_songs is None:
                 return 0
 
-            # Transfer songs
-            print("\nStep 2: Transferring liked songs to Tidal...")
-            stats = transfer_tracks(liked_songs)
-
-            # Determine exit code based on results
-            if stats['added'] == stats['total']:
-                return 0  # All successful
-            elif stats['added'] > 0:
-                return 0  # Partial success (still consider success)
-            else:
-                return 1  # No songs transferred
+            return transfer_liked_songs(args, journal, liked_songs)
 
         except KeyboardInterrupt:
             print("\n\nTransfer interrupted by user.")
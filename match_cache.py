@@ -0,0 +1,147 @@
+"""
+Match Cache Module
+Persists Spotify -> Tidal track matches between runs
+"""
+
+import os
+import sqlite3
+import threading
+from types import SimpleNamespace
+from typing import Dict, Optional
+
+CACHE_FILE = "match_cache.db"
+
+
+class CachedTrack:
+    """
+    Lightweight stand-in for a tidalapi.Track resolved from the match cache
+
+    Exposes the attributes the transfer code reads (id, name, artist, artists)
+    so a cache hit never needs a round-trip to Tidal.
+    """
+
+    def __init__(self, track_id: int, name: str, artist_name: str):
+        self.id = track_id
+        self.name = name
+        self.artist = SimpleNamespace(name=artist_name)
+        self.artists = [self.artist]
+
+
+class MatchCache:
+    """
+    SQLite-backed cache mapping ISRC codes and Spotify track IDs to Tidal tracks
+
+    The database runs in WAL mode so concurrent readers never block a writer,
+    and a single connection is shared between threads behind a lock.
+    """
+
+    def __init__(self, path: str = CACHE_FILE):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS matches (
+                key TEXT PRIMARY KEY,
+                tidal_id INTEGER NOT NULL,
+                name TEXT,
+                artist TEXT
+            )
+            """
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _keys(track_info: Dict):
+        """Yield the lookup keys for a Spotify track, most reliable first"""
+        if track_info.get('isrc'):
+            yield f"isrc:{track_info['isrc'].upper()}"
+        if track_info.get('spotify_id'):
+            yield f"spotify:{track_info['spotify_id']}"
+
+    def get(self, track_info: Dict) -> Optional[CachedTrack]:
+        """
+        Look up a previously resolved Tidal track
+
+        Args:
+            track_info: Dictionary containing track information from Spotify
+
+        Returns:
+            CachedTrack if a match is cached, None otherwise
+        """
+        keys = list(self._keys(track_info))
+
+        with self._lock:
+            for key in keys:
+                row = self._conn.execute(
+                    "SELECT tidal_id, name, artist FROM matches WHERE key = ?", (key,)
+                ).fetchone()
+                if row:
+                    self.hits += 1
+                    return CachedTrack(*row)
+
+            if keys:
+                self.misses += 1
+        return None
+
+    def put(self, track_info: Dict, tidal_track) -> None:
+        """
+        Store a successful match under every key of the Spotify track
+
+        Args:
+            track_info: Dictionary containing track information from Spotify
+            tidal_track: Tidal track object the Spotify track resolved to
+        """
+        artist = getattr(tidal_track, 'artist', None) or tidal_track.artists[0]
+        rows = [
+            (key, tidal_track.id, tidal_track.name, artist.name)
+            for key in self._keys(track_info)
+        ]
+        if not rows:
+            return
+
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO matches (key, tidal_id, name, artist) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Return the hit/miss counters for this process
+
+        Returns:
+            Dict with 'hits' and 'misses' counts
+        """
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses}
+
+    def close(self) -> None:
+        """Close the underlying database connection"""
+        with self._lock:
+            self._conn.close()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_match_cache() -> MatchCache:
+    """
+    Return the process-wide match cache, opening it on first use
+
+    The location can be overridden with the MATCH_CACHE_FILE environment variable.
+
+    Returns:
+        MatchCache: Shared match cache
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = MatchCache(os.getenv('MATCH_CACHE_FILE', CACHE_FILE))
+        return _cache
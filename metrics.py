@@ -0,0 +1,237 @@
+"""
+Metrics Module
+Per-endpoint call counts, latency histograms, 429 counts and phase timings
+"""
+
+import json
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional
+
+from rate_limiter import throttle_info
+
+# Upper bounds (seconds) of the latency histogram buckets; a final +Inf bucket is implied
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _EndpointStats:
+    """Counters and latency histogram of one endpoint"""
+
+    __slots__ = ('calls', 'errors', 'throttled', 'total', 'max', 'buckets')
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.throttled = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def observe(self, seconds: float, status: Optional[int], failed: bool) -> None:
+        self.calls += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        if failed:
+            self.errors += 1
+        if status == 429:
+            self.throttled += 1
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+                break
+        else:
+            self.buckets[-1] += 1
+
+    def to_dict(self) -> Dict:
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip(LATENCY_BUCKETS + (float('inf'),), self.buckets):
+            cumulative += count
+            buckets['+Inf' if bound == float('inf') else f"{bound:g}"] = cumulative
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'throttled': self.throttled,
+            'total_seconds': round(self.total, 4),
+            'mean_seconds': round(self.total / self.calls, 4) if self.calls else 0.0,
+            'max_seconds': round(self.max, 4),
+            'buckets': buckets
+        }
+
+
+class Metrics:
+    """
+    Thread-safe registry of API call metrics and phase timings
+
+    Endpoints are named "<service>.<operation>", e.g. "tidal.search.isrc"
+    or "spotify.current_user_saved_tracks". Every attempt is observed
+    separately, so calls retried after a 429 show up as throttled attempts.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints: Dict[str, _EndpointStats] = {}
+        self._phases: Dict[str, float] = {}
+        self._started = time.time()
+
+    def observe(self, endpoint: str, seconds: float, status: Optional[int] = None, failed: bool = False) -> None:
+        """
+        Record one API call
+
+        Args:
+            endpoint: Endpoint name
+            seconds: Time the call took
+            status: HTTP status of a failed call, if known
+            failed: Whether the call raised
+        """
+        with self._lock:
+            stats = self._endpoints.get(endpoint)
+            if stats is None:
+                stats = self._endpoints[endpoint] = _EndpointStats()
+            stats.observe(seconds, status, failed)
+
+    def instrument(self, endpoint: str, func: Callable) -> Callable:
+        """
+        Wrap an API function so each call is timed and counted
+
+        Pass the wrapper to the rate limiter (not the other way round) so
+        every attempt, including throttled ones, is observed.
+
+        Args:
+            endpoint: Endpoint name
+            func: Function performing a single API request
+
+        Returns:
+            Callable with the same signature as func
+        """
+        def call(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                status, _ = throttle_info(e)
+                self.observe(endpoint, time.perf_counter() - start, status, failed=True)
+                raise
+            self.observe(endpoint, time.perf_counter() - start)
+            return result
+        return call
+
+    def merge(self, endpoints: Dict[str, Dict]) -> None:
+        """
+        Add endpoint metrics collected elsewhere (e.g. by a worker process)
+
+        Args:
+            endpoints: The 'endpoints' part of another registry's snapshot()
+        """
+        with self._lock:
+            for name, other in endpoints.items():
+                stats = self._endpoints.get(name)
+                if stats is None:
+                    stats = self._endpoints[name] = _EndpointStats()
+                stats.calls += other['calls']
+                stats.errors += other['errors']
+                stats.throttled += other['throttled']
+                stats.total += other['total_seconds']
+                stats.max = max(stats.max, other['max_seconds'])
+                # Snapshot buckets are cumulative; turn them back into per-bucket counts
+                previous = 0
+                for i, cumulative in enumerate(other['buckets'].values()):
+                    stats.buckets[i] += cumulative - previous
+                    previous = cumulative
+
+    @contextmanager
+    def phase(self, name: str):
+        """Context manager adding the wall time of a block to a named phase"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._phases[name] = self._phases.get(name, 0.0) + time.perf_counter() - start
+
+    def snapshot(self) -> Dict:
+        """
+        Return every metric as a JSON-serializable dictionary
+
+        Returns:
+            Dict with 'uptime_seconds', 'endpoints' and 'phases'
+        """
+        with self._lock:
+            return {
+                'uptime_seconds': round(time.time() - self._started, 3),
+                'endpoints': {name: stats.to_dict() for name, stats in sorted(self._endpoints.items())},
+                'phases': {name: round(seconds, 4) for name, seconds in self._phases.items()}
+            }
+
+    def write_json(self, path: str) -> None:
+        """Write the current snapshot to a JSON file"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, indent=2)
+
+    def prometheus_text(self) -> str:
+        """Render the metrics in the Prometheus text exposition format"""
+        snapshot = self.snapshot()
+        lines = [
+            "# HELP transfer_api_calls_total API calls by endpoint",
+            "# TYPE transfer_api_calls_total counter",
+        ]
+        for name, stats in snapshot['endpoints'].items():
+            lines.append(f'transfer_api_calls_total{{endpoint="{name}"}} {stats["calls"]}')
+        lines += ["# HELP transfer_api_errors_total Failed API calls by endpoint",
+                  "# TYPE transfer_api_errors_total counter"]
+        for name, stats in snapshot['endpoints'].items():
+            lines.append(f'transfer_api_errors_total{{endpoint="{name}"}} {stats["errors"]}')
+        lines += ["# HELP transfer_api_throttled_total HTTP 429 responses by endpoint",
+                  "# TYPE transfer_api_throttled_total counter"]
+        for name, stats in snapshot['endpoints'].items():
+            lines.append(f'transfer_api_throttled_total{{endpoint="{name}"}} {stats["throttled"]}')
+        lines += ["# HELP transfer_api_latency_seconds API call latency by endpoint",
+                  "# TYPE transfer_api_latency_seconds histogram"]
+        for name, stats in snapshot['endpoints'].items():
+            for bound, count in stats['buckets'].items():
+                lines.append(f'transfer_api_latency_seconds_bucket{{endpoint="{name}",le="{bound}"}} {count}')
+            lines.append(f'transfer_api_latency_seconds_sum{{endpoint="{name}"}} {stats["total_seconds"]}')
+            lines.append(f'transfer_api_latency_seconds_count{{endpoint="{name}"}} {stats["calls"]}')
+        lines += ["# HELP transfer_phase_seconds Wall time spent in each transfer phase",
+                  "# TYPE transfer_phase_seconds gauge"]
+        for name, seconds in snapshot['phases'].items():
+            lines.append(f'transfer_phase_seconds{{phase="{name}"}} {seconds}')
+        return "\n".join(lines) + "\n"
+
+    def serve_prometheus(self, port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+        """
+        Serve /metrics in the Prometheus text format from a background thread
+
+        Args:
+            port: Port to listen on
+            host: Interface to bind (local only by default)
+
+        Returns:
+            The running server
+        """
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.prometheus_text().encode('utf-8')
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Scrapes would otherwise interleave with transfer output
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+metrics = Metrics()
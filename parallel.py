@@ -0,0 +1,116 @@
+"""
+Parallel Helpers Module
+Bounded, order-preserving concurrent map used by the fetch and search stages
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+import queue
+import threading
+from typing import Callable, Iterable, Iterator, Tuple, TypeVar
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+
+def ordered_map(func: Callable[[T], R], items: Iterable[T], workers: int,
+                window: int = None) -> Iterator[Tuple[T, R]]:
+    """
+    Apply func to items on a thread pool, yielding results in input order
+
+    Items are pulled from the iterable lazily and at most `window` calls are
+    in flight ahead of the consumer, so memory stays bounded even for
+    unbounded inputs. Exceptions raised by func propagate to the consumer.
+
+    Args:
+        func: Function to call for each item
+        items: Input items (may be a generator)
+        workers: Number of worker threads (1 runs everything inline)
+        window: Maximum calls in flight, defaults to four per worker
+
+    Yields:
+        Tuple of (item, func(item))
+    """
+    if workers <= 1:
+        for item in items:
+            yield item, func(item)
+        return
+
+    window = window or workers * 4
+    pending = deque()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        try:
+            for item in items:
+                pending.append((item, executor.submit(func, item)))
+
+                if len(pending) >= window:
+                    item, future = pending.popleft()
+                    yield item, future.result()
+
+            while pending:
+                item, future = pending.popleft()
+                yield item, future.result()
+        finally:
+            # Don't leave queued calls running if the consumer stops early
+            for _, future in pending:
+                future.cancel()
+
+
+class _End:
+    """Marker put on a prefetch queue when the producer finishes or fails"""
+
+    def __init__(self, error: BaseException = None):
+        self.error = error
+
+
+def prefetch(items: Iterable[T], maxsize: int) -> Iterator[T]:
+    """
+    Run a producer iterable on a background thread behind a bounded queue
+
+    The producer (e.g. a Spotify pager) keeps fetching while the consumer
+    works, but never gets more than `maxsize` items ahead, so memory stays
+    flat however long the input is. Exceptions in the producer are re-raised
+    in the consumer.
+
+    Args:
+        items: Iterable to consume on the background thread
+        maxsize: Maximum number of items buffered between the two sides
+
+    Yields:
+        Items from the iterable, in order
+    """
+    buffer = queue.Queue(maxsize=maxsize)
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        # Block while the queue is full, but give up once the consumer has gone
+        while not stop.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in items:
+                if not put(item):
+                    return
+            put(_End())
+        except BaseException as e:
+            put(_End(e))
+
+    threading.Thread(target=produce, daemon=True).start()
+
+    try:
+        while True:
+            item = buffer.get()
+            if isinstance(item, _End):
+                if item.error is not None:
+                    raise item.error
+                return
+            yield item
+    finally:
+        stop.set()
@@ -0,0 +1,118 @@
+"""
+Playlist Cache Module
+Persists fetched Spotify playlist contents keyed by snapshot ID
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+
+from track_record import TrackRecord
+
+CACHE_FILE = "playlist_cache.db"
+
+
+class PlaylistCache:
+    """
+    SQLite-backed store of Spotify playlist track lists
+
+    Spotify gives every playlist a snapshot ID that changes whenever its
+    contents change, so a stored track list is valid for exactly as long as
+    the snapshot ID it was fetched under. Only the latest snapshot of each
+    playlist is kept.
+    """
+
+    def __init__(self, path: str = CACHE_FILE):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS playlists (
+                playlist_id TEXT PRIMARY KEY,
+                snapshot_id TEXT NOT NULL,
+                tracks TEXT NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get(self, playlist_id: str, snapshot_id: str) -> Optional[List[TrackRecord]]:
+        """
+        Look up the tracks of a playlist snapshot
+
+        Args:
+            playlist_id: Spotify playlist ID
+            snapshot_id: Snapshot ID reported by Spotify for the playlist
+
+        Returns:
+            List of track records, or None if this snapshot is not stored
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT tracks FROM playlists WHERE playlist_id = ? AND snapshot_id = ?",
+                (playlist_id, snapshot_id)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return [TrackRecord.from_row(track) for track in json.loads(row[0])]
+
+    def put(self, playlist_id: str, snapshot_id: str, tracks: List[TrackRecord]) -> None:
+        """
+        Store the tracks of a playlist snapshot, replacing any older snapshot
+
+        Args:
+            playlist_id: Spotify playlist ID
+            snapshot_id: Snapshot ID the tracks were fetched under
+            tracks: Track records
+        """
+        data = json.dumps([track.to_row() for track in tracks], separators=(',', ':'))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO playlists (playlist_id, snapshot_id, tracks) VALUES (?, ?, ?)",
+                (playlist_id, snapshot_id, data)
+            )
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Return the hit/miss counters for this process
+
+        Returns:
+            Dict with 'hits' and 'misses' counts
+        """
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses}
+
+    def close(self) -> None:
+        """Close the underlying database connection"""
+        with self._lock:
+            self._conn.close()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_playlist_cache() -> PlaylistCache:
+    """
+    Return the process-wide playlist cache, opening it on first use
+
+    The location can be overridden with the PLAYLIST_CACHE_FILE environment variable.
+
+    Returns:
+        PlaylistCache: Shared playlist cache
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = PlaylistCache(os.getenv('PLAYLIST_CACHE_FILE', CACHE_FILE))
+        return _cache
@@ -0,0 +1,198 @@
+"""
+Progress Module
+Throttled progress output and an asynchronous per-track JSON Lines log
+"""
+
+import json
+import queue
+import sys
+import threading
+import time
+from typing import Dict, Optional
+
+PROGRESS_INTERVAL = 0.5       # Minimum seconds between progress updates on a terminal
+PROGRESS_LOG_INTERVAL = 10.0  # Minimum seconds between progress lines when output is redirected
+
+
+def _format_duration(seconds: float) -> str:
+    """Format a duration as e.g. 1h02m, 9m32s or 12s"""
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
+
+
+class ProgressRenderer:
+    """
+    Single progress line showing tracks/sec, the found ratio and an ETA
+
+    Updates are cheap counter increments; the line is redrawn at most once
+    per PROGRESS_INTERVAL on a terminal (in place) and once per
+    PROGRESS_LOG_INTERVAL when stdout is a file or pipe, so large transfers
+    do not flood logs or slow down on a slow terminal.
+    """
+
+    def __init__(self, total: Optional[int] = None, prefix: str = "", stream=None):
+        """
+        Args:
+            total: Expected number of tracks, if known
+            prefix: Text shown before the counters (e.g. indentation)
+            stream: Output stream, defaults to sys.stdout
+        """
+        self.total = total
+        self.prefix = prefix
+        self.stream = stream or sys.stdout
+        self.enabled = not _quiet
+        self.interactive = self.enabled and hasattr(self.stream, 'isatty') and self.stream.isatty()
+        self.interval = PROGRESS_INTERVAL if self.interactive else PROGRESS_LOG_INTERVAL
+        self.done = 0
+        self.found = 0
+        self._start = time.monotonic()
+        self._last = self._start
+
+    def update(self, found: bool) -> None:
+        """Count one processed track"""
+        self.advance(1, 1 if found else 0)
+
+    def advance(self, done: int, found: int) -> None:
+        """Count several processed tracks at once (e.g. progress polled from elsewhere)"""
+        self.done += done
+        self.found += found
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        if now - self._last >= self.interval:
+            self._last = now
+            self._render(now)
+
+    def close(self) -> None:
+        """Draw the final state and end the progress line"""
+        if not self.enabled:
+            return
+        self._render(time.monotonic())
+        if self.interactive:
+            self.stream.write("\n")
+            self.stream.flush()
+
+    def _render(self, now: float) -> None:
+        elapsed = now - self._start
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        found = 100 * self.found / self.done if self.done else 0.0
+
+        line = f"{self.prefix}{self.done}/{self.total} tracks" if self.total else f"{self.prefix}{self.done} tracks"
+        line += f" | {rate:.1f} tracks/s | found {found:.1f}%"
+        remaining = self.total - self.done if self.total else 0
+        if remaining > 0 and rate:
+            line += f" | ETA {_format_duration(remaining / rate)}"
+        else:
+            line += f" | {_format_duration(elapsed)} elapsed"
+
+        if self.interactive:
+            self.stream.write("\r" + line.ljust(78))
+        else:
+            self.stream.write(line + "\n")
+        self.stream.flush()
+
+
+class TrackLog:
+    """
+    JSON Lines file with one compact record per transferred track
+
+    Records are queued and serialized by a background thread, so writing
+    the log never blocks the transfer loop.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.records = 0
+        self._queue = queue.SimpleQueue()
+        self._file = open(path, 'a', encoding='utf-8')
+        self._thread = threading.Thread(target=self._run, name="track-log", daemon=True)
+        self._thread.start()
+
+    def write(self, target: str, track_info: Dict, status: str, tidal_id=None) -> None:
+        """
+        Queue the outcome of one track
+
+        Args:
+            target: 'favorites' or the Tidal playlist name
+            track_info: Spotify track
+            status: 'added', 'present', 'not_found' or 'failed'
+            tidal_id: Matched Tidal track ID, if any
+        """
+        self._queue.put((target, track_info.get('spotify_id'), track_info.get('isrc'), status, tidal_id))
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            lines = []
+            # Drain whatever else is queued so a burst becomes one write
+            while item is not None:
+                target, spotify_id, isrc, status, tidal_id = item
+                record = {'target': target, 'spotify_id': spotify_id, 'status': status}
+                if isrc:
+                    record['isrc'] = isrc
+                if tidal_id is not None:
+                    record['tidal_id'] = int(tidal_id)
+                lines.append(json.dumps(record, separators=(',', ':')))
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            if lines:
+                self._file.write("\n".join(lines) + "\n")
+                self.records += len(lines)
+            if item is None:
+                self._file.close()
+                return
+
+    def close(self) -> int:
+        """
+        Write every queued record and close the file
+
+        Returns:
+            int: Number of records written
+        """
+        self._queue.put(None)
+        self._thread.join()
+        return self.records
+
+
+_quiet = False
+_track_log: Optional[TrackLog] = None
+
+
+def configure_progress(quiet: bool = False, log_path: Optional[str] = None) -> None:
+    """
+    Select how transfer progress is reported
+
+    Args:
+        quiet: Suppress progress lines (summaries are still printed)
+        log_path: Append one JSON record per track to this file
+    """
+    global _quiet, _track_log
+    close_progress()
+    _quiet = quiet
+    _track_log = TrackLog(log_path) if log_path else None
+
+
+def log_track(target: str, track_info: Dict, status: str, tidal_id=None) -> None:
+    """Record the outcome of one track in the JSON Lines log, if one is configured"""
+    if _track_log is not None:
+        _track_log.write(target, track_info, status, tidal_id)
+
+
+def close_progress() -> Optional[int]:
+    """
+    Flush and close the JSON Lines log
+
+    Returns:
+        Number of records written, or None if no log was configured
+    """
+    global _track_log
+    if _track_log is None:
+        return None
+    track_log, _track_log = _track_log, None
+    return track_log.close()
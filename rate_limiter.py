@@ -0,0 +1,240 @@
+"""
+Rate Limiter Module
+Adaptive token-bucket limiter shared by all API calls to a service
+"""
+
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+
+try:
+    from tidalapi.exceptions import ObjectNotFound, TooManyRequests
+except ImportError:
+    # tidalapi < 0.7.5 raises requests.HTTPError for every failed request
+    class ObjectNotFound(Exception):
+        """Placeholder for the tidalapi exception; never raised"""
+
+    class TooManyRequests(Exception):
+        """Placeholder for the tidalapi exception; never raised"""
+
+DEFAULT_RATE = 10.0   # Requests per second when responses are clean
+DEFAULT_BURST = 20    # Requests allowed back-to-back after an idle period
+MIN_RATE = 0.5        # Never back off below this many requests per second
+MAX_RETRIES = 5       # Attempts per call before a 429 is surfaced to the caller
+
+
+def _parse_retry_after(value) -> Optional[float]:
+    """
+    Parse a Retry-After header value (delta seconds or HTTP date)
+
+    Returns:
+        Seconds to wait, or None if the header is missing or malformed
+    """
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def throttle_info(error: Exception) -> Tuple[Optional[int], Optional[float]]:
+    """
+    Extract the HTTP status and Retry-After delay from an API exception
+
+    Handles tidalapi's TooManyRequests and ObjectNotFound (which carry no
+    response but chain the original requests.HTTPError), plain
+    requests.HTTPError and spotipy's SpotifyException, which expose the
+    status and headers differently. The Retry-After header is read from the
+    chained response, since only tidalapi 0.8.7 and later copy it onto the
+    exception.
+
+    Returns:
+        Tuple of (HTTP status or None, Retry-After seconds or None)
+    """
+    if isinstance(error, ObjectNotFound):
+        return 404, None
+    if isinstance(error, TooManyRequests):
+        # Older tidalapi raises it bare while handling the HTTPError, so check the context too
+        response = getattr(error.__cause__ or error.__context__, 'response', None)
+        headers = getattr(response, 'headers', None) or {}
+        retry_after = _parse_retry_after(headers.get('Retry-After'))
+        if retry_after is None and (getattr(error, 'retry_after', None) or -1) > 0:
+            retry_after = float(error.retry_after)
+        return 429, retry_after
+
+    response = getattr(error, 'response', None)
+    if response is not None:
+        status = getattr(response, 'status_code', None)
+        headers = getattr(response, 'headers', None) or {}
+    else:
+        status = getattr(error, 'http_status', None)
+        headers = getattr(error, 'headers', None) or {}
+    return status, _parse_retry_after(headers.get('Retry-After'))
+
+
+def is_client_error(error: Exception) -> bool:
+    """
+    Return True if the server rejected the request itself (HTTP 4xx)
+
+    429 (throttling) and 401 (authentication) say nothing about the request's
+    content, and errors without a status (connection failures, timeouts)
+    are transient, so none of them count.
+    """
+    status, _ = throttle_info(error)
+    return status is not None and 400 <= status < 500 and status not in (401, 429)
+
+
+class RateLimiter:
+    """
+    Token bucket whose refill rate adapts to server throttling
+
+    The rate is halved whenever a 429 is seen (and all calls pause for the
+    server's Retry-After), then grows back towards the configured maximum by
+    a small step for every clean response.
+    """
+
+    def __init__(self, rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST):
+        self._lock = threading.Lock()
+        self.configure(rate, burst)
+        self.throttled_count = 0
+
+    def configure(self, rate: float, burst: int) -> None:
+        """
+        Set the maximum request rate and burst size
+
+        Args:
+            rate: Maximum sustained requests per second
+            burst: Maximum number of requests sent back-to-back
+        """
+        if rate <= 0 or burst < 1:
+            raise ValueError("Rate must be positive and burst at least 1")
+        with self._lock:
+            self.max_rate = float(rate)
+            self.rate = float(rate)
+            self.burst = int(burst)
+            self._tokens = float(burst)
+            self._updated = time.monotonic()
+            self._paused_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        """Add the tokens earned since the last update (lock must be held)"""
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self) -> None:
+        """Block until a request may be sent"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                else:
+                    self._refill(now)
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def throttled(self, retry_after: Optional[float] = None) -> None:
+        """
+        Record a 429 response: back off and pause until Retry-After elapses
+
+        Args:
+            retry_after: Seconds requested by the server, if provided
+        """
+        with self._lock:
+            self.throttled_count += 1
+            self.rate = max(MIN_RATE, self.rate / 2)
+            delay = retry_after if retry_after is not None else 1 / self.rate
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+            # Start refilling from empty when the pause ends, so no burst goes out right after it
+            self._tokens = 0.0
+            self._updated = self._paused_until
+
+    def succeeded(self) -> None:
+        """Record a clean response and ramp the rate back up"""
+        with self._lock:
+            if self.rate < self.max_rate:
+                self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+    def call(self, func, *args, **kwargs):
+        """
+        Call an API function under the limiter, retrying on HTTP 429
+
+        Args:
+            func: Function performing a single API request
+            *args, **kwargs: Arguments passed to func
+
+        Returns:
+            Whatever func returns
+        """
+        for attempt in range(1, MAX_RETRIES + 1):
+            self.acquire()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                status, retry_after = throttle_info(e)
+                if status != 429 or attempt == MAX_RETRIES:
+                    raise
+                self.throttled(retry_after)
+                continue
+            self.succeeded()
+            return result
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Return the current rate and number of throttled responses
+
+        Returns:
+            Dict with 'rate', 'max_rate' and 'throttled' values
+        """
+        with self._lock:
+            return {'rate': self.rate, 'max_rate': self.max_rate, 'throttled': self.throttled_count}
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(service: str = "tidal") -> RateLimiter:
+    """
+    Return the shared rate limiter for a service, creating it on first use
+
+    Args:
+        service: Name of the API the limiter protects
+
+    Returns:
+        RateLimiter: Limiter shared by every caller of that service
+    """
+    with _limiters_lock:
+        if service not in _limiters:
+            _limiters[service] = RateLimiter()
+        return _limiters[service]
+
+
+def configure_rate_limiter(rate: float, burst: int, service: str = "tidal") -> RateLimiter:
+    """
+    Set the maximum rate and burst of a service's shared limiter
+
+    Args:
+        rate: Maximum sustained requests per second
+        burst: Maximum number of requests sent back-to-back
+        service: Name of the API the limiter protects
+
+    Returns:
+        RateLimiter: The configured limiter
+    """
+    limiter = get_rate_limiter(service)
+    limiter.configure(rate, burst)
+    return limiter
@@ -6,19 +6,35 @@ Handles authentication with Spotify API using OAuth 2.0
 import spotipy
 from spotipy.oauth2 import SpotifyOAuth
 import os
+import threading
+from typing import Dict
 from dotenv import load_dotenv
+from http_transport import install_transport, transport_mode
 
 # Load environment variables
 load_dotenv()
 
+CACHE_PATH = ".cache"  # OAuth token cache; override with SPOTIFY_CACHE_PATH
 
-def get_spotify_client():
+# Process-wide client and user profile, created on first use
+_client = None
+_current_user = None
+_client_lock = threading.Lock()
+
+
+def _create_spotify_client():
     """
-    Create and return an authenticated Spotify client
+    Create an authenticated Spotify client
 
     Returns:
         spotipy.Spotify: Authenticated Spotify client
     """
+    if transport_mode() == 'replay':
+        # Recorded responses are served without credentials
+        spotify = spotipy.Spotify(auth="replay")
+        install_transport(spotify._session)
+        return spotify
+
     client_id = os.getenv('SPOTIFY_CLIENT_ID')
     client_secret = os.getenv('SPOTIFY_CLIENT_SECRET')
     redirect_uri = os.getenv('SPOTIFY_REDIRECT_URI', 'http://localhost:8888/callback')
@@ -38,22 +54,67 @@ def get_spotify_client():
         client_secret=client_secret,
         redirect_uri=redirect_uri,
         scope=scope,
-        cache_path=".cache"
+        cache_path=os.getenv('SPOTIFY_CACHE_PATH', CACHE_PATH)
     )
 
     # Create and return Spotify client
     spotify = spotipy.Spotify(auth_manager=auth_manager)
+    install_transport(spotify._session)
 
     return spotify
 
 
+def get_spotify_client():
+    """
+    Return the shared authenticated Spotify client, creating it on first use
+
+    The OAuth manager refreshes its token as needed, so one client serves
+    the whole run.
+
+    Returns:
+        spotipy.Spotify: Authenticated Spotify client
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = _create_spotify_client()
+        return _client
+
+
+def set_spotify_client(client) -> None:
+    """
+    Replace the shared Spotify client (e.g. with one pointed at a local stand-in server)
+
+    Args:
+        client: spotipy.Spotify compatible client used for every later request
+    """
+    global _client, _current_user
+    with _client_lock:
+        _client = client
+        _current_user = None
+
+
+def get_current_user() -> Dict:
+    """
+    Return the current Spotify user's profile, fetched once per process
+
+    Returns:
+        Dict: User profile as returned by the Spotify API
+    """
+    global _current_user
+    spotify = get_spotify_client()
+    with _client_lock:
+        if _current_user is None:
+            _current_user = spotify.current_user()
+        return _current_user
+
+
 def test_connection():
     """
     Test the Spotify connection and display user information
     """
     try:
-        spotify = get_spotify_client()
-        user = spotify.current_user()
+        user = get_current_user()
         print(f"Successfully connected to Spotify!")
         print(f"User: {user['display_name']}")
         print(f"User ID: {user['id']}")
@@ -0,0 +1,57 @@
+"""
+Spotify Pager Module
+Fetches offset-paginated Spotify endpoints with concurrent page requests
+"""
+
+from metrics import metrics
+from parallel import ordered_map
+from rate_limiter import get_rate_limiter
+from typing import Callable, Dict, Iterator, Optional
+
+PAGE_WORKERS = 4  # Concurrent page requests after the first page
+
+
+def endpoint_name(func: Callable) -> str:
+    """Return the spotipy method name behind a (possibly partial) function, for metrics"""
+    return getattr(getattr(func, 'func', func), '__name__', 'request')
+
+
+def fetch_pages(fetch_page: Callable[..., Dict], page_size: int,
+                workers: int = PAGE_WORKERS, max_items: Optional[int] = None) -> Iterator[Dict]:
+    """
+    Yield every page of a paginated Spotify endpoint in offset order
+
+    The first page is fetched on its own to learn the total; the remaining
+    offsets are then requested concurrently (bounded by `workers` and the
+    shared Spotify rate limiter) and yielded in order as they complete.
+    With `max_items`, no page beyond the first `max_items` items is requested.
+
+    Args:
+        fetch_page: Spotipy method accepting limit and offset keyword arguments
+        page_size: Number of items per page
+        workers: Number of concurrent page requests
+        max_items: Optional number of items after which paging stops
+
+    Yields:
+        Dict: Raw Spotify paging object for each page
+    """
+    limiter = get_rate_limiter("spotify")
+    fetch_page = metrics.instrument(f"spotify.{endpoint_name(fetch_page)}", fetch_page)
+
+    if max_items is not None:
+        page_size = max(1, min(page_size, max_items))
+
+    first = limiter.call(fetch_page, limit=page_size, offset=0)
+    yield first
+
+    if not first['items'] or first['next'] is None:
+        return
+
+    end = first['total'] if max_items is None else min(first['total'], max_items)
+    offsets = range(page_size, end, page_size)
+
+    def fetch(offset):
+        return limiter.call(fetch_page, limit=page_size, offset=offset)
+
+    for _, page in ordered_map(fetch, offsets, workers):
+        yield page
@@ -3,8 +3,19 @@ Spotify Playlists Module
 Fetches user playlists and their tracks from Spotify
 """
 
-from spotify_auth import get_spotify_client
-from typing import List, Dict, Optional
+from spotify_auth import get_spotify_client, get_current_user
+from spotify_pager import fetch_pages, PAGE_WORKERS
+from metrics import metrics
+from playlist_cache import get_playlist_cache
+from track_record import TrackRecord, track_label
+from functools import partial
+from typing import Iterator, List, Dict, Optional
+
+# Only the parts of each playlist item the transfer uses (Spotify "fields" filter)
+PLAYLIST_TRACK_FIELDS = (
+    "items(track(type,id,uri,name,duration_ms,artists(name),album(name),"
+    "external_ids(isrc),linked_from(id))),total,next"
+)
 
 
 def get_user_playlists(limit: Optional[int] = None) -> List[Dict]:
@@ -18,22 +29,24 @@ def get_user_playlists(limit: Optional[int] = None) -> List[Dict]:
         List[Dict]: List of playlist information dictionaries
     """
     spotify = get_spotify_client()
+    user_id = get_current_user()['id']
     playlists = []
     offset = 0
     batch_limit = 50  # Max allowed by Spotify API
     
     print("Fetching your playlists from Spotify...")
+    fetch_page = metrics.instrument("spotify.current_user_playlists", spotify.current_user_playlists)
     
     while True:
         # Fetch a batch of playlists
-        results = spotify.current_user_playlists(limit=batch_limit, offset=offset)
+        results = fetch_page(limit=batch_limit, offset=offset)
         
         if not results['items']:
             break
             
         for playlist in results['items']:
             # Only include playlists owned by the user
-            if playlist['owner']['id'] == spotify.current_user()['id']:
+            if playlist['owner']['id'] == user_id:
                 playlist_info = {
                     'id': playlist['id'],
                     'name': playlist['name'],
@@ -41,6 +54,7 @@ def get_user_playlists(limit: Optional[int] = None) -> List[Dict]:
                     'public': playlist['public'],
                     'collaborative': playlist['collaborative'],
                     'total_tracks': playlist['tracks']['total'],
+                    'snapshot_id': playlist.get('snapshot_id'),  # Changes whenever the contents change
                     'spotify_url': playlist['external_urls']['spotify']
                 }
                 playlists.append(playlist_info)
@@ -64,28 +78,36 @@ def get_user_playlists(limit: Optional[int] = None) -> List[Dict]:
     return playlists
 
 
-def get_playlist_tracks(playlist_id: str) -> List[Dict]:
+def iter_playlist_tracks(playlist_id: str, workers: int = PAGE_WORKERS,
+                         snapshot_id: Optional[str] = None) -> Iterator[TrackRecord]:
     """
-    Fetch all tracks from a specific playlist
+    Lazily yield the tracks of a playlist as their pages arrive
     
     Args:
         playlist_id: Spotify playlist ID
+        workers: Number of concurrent page requests
+        snapshot_id: Optional snapshot ID; if the tracks of this snapshot
+            were stored by an earlier run they are yielded without any
+            requests, otherwise they are stored once fully fetched
         
-    Returns:
-        List[Dict]: List of track information dictionaries
+    Yields:
+        TrackRecord: Compact track record
     """
+    fetched = None
+    if snapshot_id:
+        cached = get_playlist_cache().get(playlist_id, snapshot_id)
+        if cached is not None:
+            yield from cached
+            return
+        fetched = []
+    
     spotify = get_spotify_client()
-    tracks = []
-    offset = 0
     limit = 100  # Max allowed by Spotify API for playlist tracks
     
-    while True:
-        # Fetch a batch of tracks
-        results = spotify.playlist_tracks(playlist_id, limit=limit, offset=offset)
-        
-        if not results['items']:
-            break
-            
+    # Asking for the user's market also drops the per-track available_markets arrays
+    fetch_page = partial(spotify.playlist_tracks, playlist_id,
+                         fields=PLAYLIST_TRACK_FIELDS, market="from_token")
+    for results in fetch_pages(fetch_page, limit, workers):
         # Process each track
         for item in results['items']:
             # Skip if track is None (deleted tracks)
@@ -98,26 +120,31 @@ def get_playlist_tracks(playlist_id: str) -> List[Dict]:
             if track['type'] != 'track':
                 continue
             
-            # Extract relevant information
-            track_info = {
-                'name': track['name'],
-                'artists': [artist['name'] for artist in track['artists']],
-                'album': track['album']['name'],
-                'isrc': track.get('external_ids', {}).get('isrc'),
-                'duration_ms': track['duration_ms'],
-                'spotify_id': track['id'],
-                'spotify_uri': track['uri']
-            }
-            
-            tracks.append(track_info)
-        
-        # Check if there are more tracks to fetch
-        if results['next'] is None:
-            break
+            track_info = TrackRecord.from_spotify(track)
             
-        offset += limit
+            if fetched is not None:
+                fetched.append(track_info)
+            yield track_info
+    
+    if fetched is not None:
+        get_playlist_cache().put(playlist_id, snapshot_id, fetched)
+
+
+def get_playlist_tracks(playlist_id: str, workers: int = PAGE_WORKERS,
+                        snapshot_id: Optional[str] = None) -> List[TrackRecord]:
+    """
+    Fetch all tracks from a specific playlist
     
-    return tracks
+    Args:
+        playlist_id: Spotify playlist ID
+        workers: Number of concurrent page requests
+        snapshot_id: Optional snapshot ID; unchanged playlists are served from
+            the local playlist cache and fetched ones are stored in it
+        
+    Returns:
+        List[TrackRecord]: List of track records
+    """
+    return list(iter_playlist_tracks(playlist_id, workers, snapshot_id))
 
 
 def display_playlist_info(playlist: Dict) -> str:
@@ -151,7 +178,6 @@ if __name__ == "__main__":
             if tracks:
                 print("\nFirst 5 tracks:")
                 for i, track in enumerate(tracks[:5], 1):
-                    artists_str = ", ".join(track['artists'])
-                    print(f"  {i}. {track['name']} by {artists_str}")
+                    print(f"  {i}. {track_label(track)}")
     except Exception as e:
         print(f"Error: {e}")
@@ -4,71 +4,124 @@ Fetches liked songs from Spotify
 """
 
 from spotify_auth import get_spotify_client
-from typing import List, Dict
+from spotify_pager import fetch_pages, PAGE_WORKERS
+from metrics import metrics
+from track_record import TrackRecord, track_label
+from functools import partial
+from itertools import islice
+from typing import Iterator, List, Optional
 
 
-def get_liked_songs() -> List[Dict]:
+def _liked_song_pages(workers: int = PAGE_WORKERS, max_items: Optional[int] = None) -> Iterator[List[TrackRecord]]:
     """
-    Fetch all liked songs from Spotify
+    Yield liked songs one page at a time, newest first
 
-    Returns:
-        List[Dict]: List of track information dictionaries
+    Args:
+        workers: Number of concurrent page requests
+        max_items: Optional number of songs after which paging stops
+
+    Yields:
+        List[TrackRecord]: Track records for one page
     """
     spotify = get_spotify_client()
-    liked_songs = []
-    offset = 0
     limit = 50  # Max allowed by Spotify API
 
-    print("Fetching liked songs from Spotify...")
+    # The saved tracks endpoint has no fields filter, but naming a market drops
+    # the per-track and per-album available_markets arrays from the response
+    fetch_page = partial(spotify.current_user_saved_tracks, market="from_token")
+
+    for results in fetch_pages(fetch_page, limit, workers, max_items):
+        yield [TrackRecord.from_spotify(item['track'], added_at=item['added_at'])
+               for item in results['items']]
+
 
-    while True:
-        # Fetch a batch of liked songs
-        results = spotify.current_user_saved_tracks(limit=limit, offset=offset)
+def iter_liked_songs(workers: int = PAGE_WORKERS, since: Optional[str] = None,
+                     max_items: Optional[int] = None) -> Iterator[TrackRecord]:
+    """
+    Lazily yield liked songs from Spotify as their pages arrive
 
-        if not results['items']:
-            break
+    Args:
+        workers: Number of concurrent page requests
+        since: Only yield songs added after this ISO 8601 timestamp; paging
+            stops as soon as an older song is reached
+        max_items: Optional number of songs after which paging stops
 
-        # Process each track
-        for item in results['items']:
-            track = item['track']
+    Yields:
+        TrackRecord: Compact track record
+    """
+    if since:
+        # Pages are requested one at a time so nothing past the watermark is fetched
+        workers = 1
 
-            # Extract relevant information
-            track_info = {
-                'name': track['name'],
-                'artists': [artist['name'] for artist in track['artists']],
-                'album': track['album']['name'],
-                'isrc': track.get('external_ids', {}).get('isrc'),  # International Standard Recording Code
-                'duration_ms': track['duration_ms'],
-                'spotify_id': track['id'],
-                'spotify_uri': track['uri']
-            }
+    def songs():
+        for page in _liked_song_pages(workers, max_items):
+            for track_info in page:
+                # Saved tracks come newest first, so everything after this is already synced
+                if since and track_info['added_at'] <= since:
+                    return
+                yield track_info
 
-            liked_songs.append(track_info)
+    return islice(songs(), max_items)
 
-        print(f"Fetched {len(liked_songs)} songs so far...")
 
-        # Check if there are more songs to fetch
-        if results['next'] is None:
-            break
+def count_liked_songs() -> int:
+    """
+    Return the number of liked songs without fetching them
+
+    Returns:
+        int: Total number of saved tracks
+    """
+    spotify = get_spotify_client()
+    fetch_page = metrics.instrument("spotify.current_user_saved_tracks", spotify.current_user_saved_tracks)
+    return fetch_page(limit=1)['total']
+
+
+def get_liked_songs(workers: int = PAGE_WORKERS, since: Optional[str] = None,
+                    max_items: Optional[int] = None) -> List[TrackRecord]:
+    """
+    Fetch all liked songs from Spotify
+
+    Args:
+        workers: Number of concurrent page requests
+        since: Only fetch songs added after this ISO 8601 timestamp
+        max_items: Optional number of songs to fetch; only the pages holding
+            them are requested (used by --preview and --limit)
+
+    Returns:
+        List[TrackRecord]: List of track records, newest first
+    """
+    if since:
+        print(f"Fetching liked songs added since {since} from Spotify...")
+        liked_songs = list(iter_liked_songs(workers, since, max_items))
+        print(f"Total new liked songs fetched: {len(liked_songs)}")
+        return liked_songs
+
+    liked_songs = []
+
+    print("Fetching liked songs from Spotify...")
+
+    for page in _liked_song_pages(workers, max_items):
+        liked_songs.extend(page)
+        print(f"Fetched {len(liked_songs)} songs so far...")
 
-        offset += limit
+    if max_items is not None:
+        del liked_songs[max_items:]
 
     print(f"Total liked songs fetched: {len(liked_songs)}")
     return liked_songs
 
 
-def display_track_info(track: Dict) -> str:
+def display_track_info(track: TrackRecord) -> str:
     """
     Format track information for display
 
     Args:
-        track: Track information dictionary
+        track: Track record (or track information dictionary)
 
     Returns:
         str: Formatted track information
     """
-    artists_str = ", ".join(track['artists'])
-    return f"{track['name']} by {artists_str} (Album: {track['album']})"
+    return f"{track_label(track)} (Album: {track['album']})"
 
 
 if __name__ == "__main__":
@@ -0,0 +1,52 @@
+"""
+Sync State Module
+Persists small pieces of state between runs (e.g. incremental sync watermarks)
+"""
+
+import json
+import os
+from typing import Optional
+
+STATE_FILE = "sync_state.json"
+
+
+def _load_state() -> dict:
+    """Read the state file, returning an empty state if it is missing or unreadable"""
+    if not os.path.exists(STATE_FILE):
+        return {}
+    try:
+        with open(STATE_FILE, 'r') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"Warning: Could not read {STATE_FILE}: {e}")
+        return {}
+
+
+def _save_state(state: dict) -> None:
+    """Atomically replace the state file"""
+    tmp_path = STATE_FILE + ".tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, STATE_FILE)
+
+
+def get_liked_songs_watermark() -> Optional[str]:
+    """
+    Return the added_at timestamp of the newest liked song already synced
+
+    Returns:
+        ISO 8601 timestamp, or None if no incremental sync has completed yet
+    """
+    return _load_state().get('liked_songs_added_at')
+
+
+def set_liked_songs_watermark(added_at: str) -> None:
+    """
+    Record the added_at timestamp of the newest liked song synced
+
+    Args:
+        added_at: ISO 8601 timestamp from Spotify's saved-tracks endpoint
+    """
+    state = _load_state()
+    state['liked_songs_added_at'] = added_at
+    _save_state(state)
@@ -0,0 +1,66 @@
+"""
+Shared Test Fixtures
+Local stand-in Spotify and Tidal services from the benchmarks, and per-test state
+"""
+
+import pytest
+
+import match_cache
+import playlist_cache
+import spotify_auth
+import tidal_auth
+import tidal_playlists
+from fake_services import SyntheticLibrary, fake_spotify_client, fake_tidal_session, start_fake_services
+from rate_limiter import configure_rate_limiter
+
+TEST_RATE = 1000.0  # Requests per second allowed by the limiters, so tests never wait on them
+
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    """
+    Run every test in its own directory with empty caches
+
+    The journal, caches and sync state are created in the working directory,
+    so nothing leaks between tests or into the repository.
+    """
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(match_cache, '_cache', None)
+    monkeypatch.setattr(playlist_cache, '_cache', None)
+    monkeypatch.setattr(tidal_playlists, '_playlist_index', None)
+    for service in ("tidal", "spotify"):
+        configure_rate_limiter(TEST_RATE, 100, service)
+    yield tmp_path
+    for module in (match_cache, playlist_cache):
+        if module._cache is not None:
+            module._cache.close()
+
+
+@pytest.fixture
+def library():
+    """Small synthetic library: 60 liked songs and 3 playlists of 20 tracks"""
+    return SyntheticLibrary(60, playlists=3, playlist_size=20)
+
+
+@pytest.fixture
+def services(library):
+    """Fake Spotify and Tidal services running on a local port"""
+    services = start_fake_services(library)
+    yield services
+    services.stop()
+
+
+@pytest.fixture
+def spotify(services):
+    """Real spotipy client talking to the fake Spotify service, shared like in a run"""
+    spotify_auth.set_spotify_client(fake_spotify_client(services.url))
+    yield services
+    spotify_auth.set_spotify_client(None)
+
+
+@pytest.fixture
+def tidal(services):
+    """Real tidalapi session talking to the fake Tidal service, shared like in a run"""
+    tidal_auth.set_tidal_session(fake_tidal_session(services.url))
+    yield services
+    tidal_auth.set_tidal_session(None)
@@ -0,0 +1,117 @@
+"""
+HTTP Transport Tests
+Recording API responses to a cassette and replaying them without a server
+"""
+
+import pytest
+import requests
+
+from http_transport import Cassette, configure_transport, close_transport, install_transport, request_key
+
+
+@pytest.fixture
+def cassette_path(tmp_path):
+    yield str(tmp_path / "cassette.jsonl.gz")
+    close_transport()
+
+
+def client():
+    """A requests session with the configured transport mounted, like the API clients get"""
+    session = requests.Session()
+    install_transport(session)
+    return session
+
+
+def prepared(method, url, body=None):
+    return requests.Request(method, url, data=body).prepare()
+
+
+def response(status, body, headers=None):
+    result = requests.Response()
+    result.status_code = status
+    result.headers.update(headers or {})
+    result._content = body.encode('utf-8')
+    return result
+
+
+def test_replay_answers_recorded_requests_without_the_server(services, cassette_path):
+    url = f"{services.url}/spotify/v1/me/tracks"
+    configure_transport('record', cassette_path)
+    recorded = client().get(url, params={'limit': 5, 'offset': 0})
+    counts = close_transport()
+    assert counts == {'recorded': 1, 'replayed': 0, 'missed': 0}
+
+    services.stop()
+    configure_transport('replay', cassette_path)
+    replayed = client().get(url, params={'offset': 0, 'limit': 5})  # Query order does not matter
+    assert replayed.status_code == recorded.status_code
+    assert replayed.json() == recorded.json()
+    assert replayed.headers['Content-Type'] == "application/json"
+    assert close_transport() == {'recorded': 0, 'replayed': 1, 'missed': 0}
+
+
+def test_unrecorded_request_fails_like_a_dropped_connection(cassette_path):
+    configure_transport('record', cassette_path)
+    close_transport()
+
+    configure_transport('replay', cassette_path)
+    with pytest.raises(requests.ConnectionError):
+        client().get("https://api.tidal.com/v1/search", params={'query': "never recorded"})
+    assert close_transport()['missed'] == 1
+
+
+def test_request_key_ignores_session_id_and_auth_but_not_bodies():
+    first = prepared('GET', "https://api.tidal.com/v1/search?query=a&sessionId=1&limit=10")
+    second = prepared('GET', "https://api.tidal.com/v1/search?limit=10&query=a&sessionId=2")
+    second.headers['Authorization'] = "Bearer another-token"
+    assert request_key(first) == request_key(second) == "GET api.tidal.com/v1/search?limit=10&query=a"
+
+    one = prepared('POST', "https://api.tidal.com/v1/playlists/1/items", {'trackIds': "1,2"})
+    other = prepared('POST', "https://api.tidal.com/v1/playlists/1/items", {'trackIds': "3"})
+    assert request_key(one) != request_key(other)
+
+
+def test_repeated_requests_replay_in_order_then_repeat_the_last(cassette_path):
+    request = prepared('GET', "https://api.spotify.com/v1/me/playlists")
+    cassette = Cassette(cassette_path, 'record')
+    for body in ('{"page":1}', '{"page":2}'):
+        cassette.record(request, response(200, body), 0.01)
+    cassette.close()
+
+    replay = Cassette(cassette_path)
+    assert [replay.take(request)['b'] for _ in range(3)] == ['{"page":1}', '{"page":2}', '{"page":2}']
+
+
+def test_only_the_headers_clients_read_are_kept(cassette_path):
+    request = prepared('GET', "https://api.tidal.com/v1/playlists/1")
+    cassette = Cassette(cassette_path, 'record')
+    cassette.record(request, response(429, "{}", {'Retry-After': "3", 'Set-Cookie': "secret"}), 0.01)
+    cassette.close()
+
+    entry = Cassette(cassette_path).take(request)
+    assert entry['s'] == 429
+    assert entry['h'] == {'Retry-After': "3"}
+
+
+def test_interrupted_recording_keeps_the_complete_responses(cassette_path):
+    cassette = Cassette(cassette_path, 'record')
+    for i in range(50):
+        cassette.record(prepared('GET', f"https://api.spotify.com/v1/tracks/{i}"), response(200, "{}"), 0.01)
+    cassette.close()
+
+    # A killed recording leaves the gzip stream without its end
+    with open(cassette_path, 'rb') as f:
+        data = f.read()
+    with open(cassette_path, 'wb') as f:
+        f.write(data[:-8])
+
+    replay = Cassette(cassette_path)
+    assert replay.take(prepared('GET', "https://api.spotify.com/v1/tracks/0")) is not None
+
+
+def test_without_a_cassette_clients_are_left_alone():
+    close_transport()
+    session = requests.Session()
+    adapter = session.get_adapter("https://")
+    install_transport(session)
+    assert session.get_adapter("https://") is adapter
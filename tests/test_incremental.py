@@ -0,0 +1,38 @@
+"""
+Incremental Sync Tests
+The liked-songs watermark only moves once every new song has been handled
+"""
+
+from argparse import Namespace
+
+import pytest
+
+from main import transfer_liked_songs
+from spotify_tracks import get_liked_songs
+from sync_state import get_liked_songs_watermark
+from transfer_journal import TransferJournal
+
+
+@pytest.fixture
+def args():
+    return Namespace(incremental=True, workers=4)
+
+
+@pytest.fixture
+def journal():
+    journal = TransferJournal()
+    yield journal
+    journal.close()
+
+
+def test_watermark_advances_after_a_clean_run(spotify, tidal, args, journal):
+    songs = get_liked_songs()
+    transfer_liked_songs(args, journal, songs)
+    assert get_liked_songs_watermark() == songs[0]['added_at']
+
+
+def test_failed_search_keeps_the_watermark(spotify, tidal, services, library, args, journal):
+    songs = get_liked_songs()
+    services.state.search_faults[next(i for i in range(library.size) if library.on_tidal(i))] = 500
+    transfer_liked_songs(args, journal, songs)
+    assert get_liked_songs_watermark() is None
@@ -0,0 +1,66 @@
+"""
+Match Cache Tests
+Lookup, replacement and persistence of cached Tidal matches
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from match_cache import MatchCache
+
+
+def tidal_track(track_id, name="Song", artist="Artist"):
+    """Build an object shaped like a tidalapi.Track"""
+    return SimpleNamespace(id=track_id, name=name, artist=SimpleNamespace(name=artist))
+
+
+@pytest.fixture
+def match_cache(tmp_path):
+    cache = MatchCache(str(tmp_path / "match_cache.db"))
+    yield cache
+    cache.close()
+
+
+def test_match_cache_miss_then_hit(match_cache):
+    track = {'isrc': "usum71900001", 'spotify_id': "sp1"}
+    assert match_cache.get(track) is None
+
+    match_cache.put(track, tidal_track(101, "Song 1", "Artist 1"))
+    cached = match_cache.get(track)
+    assert (cached.id, cached.name, cached.artist.name) == (101, "Song 1", "Artist 1")
+    assert match_cache.stats() == {'hits': 1, 'misses': 1}
+
+
+def test_match_cache_finds_tracks_by_isrc_or_spotify_id(match_cache):
+    match_cache.put({'isrc': "USUM71900001", 'spotify_id': "sp1"}, tidal_track(101))
+
+    # The same recording under another Spotify ID (e.g. on a compilation), ISRC in any case
+    assert match_cache.get({'isrc': "usum71900001", 'spotify_id': "sp2"}).id == 101
+    # The same Spotify track without an ISRC
+    assert match_cache.get({'isrc': None, 'spotify_id': "sp1"}).id == 101
+
+
+def test_match_cache_put_replaces_a_stale_match(match_cache):
+    track = {'isrc': "USUM71900001", 'spotify_id': "sp1"}
+    match_cache.put(track, tidal_track(101))
+    match_cache.put(track, tidal_track(202))
+    assert match_cache.get(track).id == 202
+    assert match_cache.get({'isrc': None, 'spotify_id': "sp1"}).id == 202
+
+
+def test_match_cache_ignores_tracks_without_keys(match_cache):
+    match_cache.put({'isrc': None, 'spotify_id': None}, tidal_track(101))
+    assert match_cache.get({'isrc': None, 'spotify_id': None}) is None
+    assert match_cache.stats() == {'hits': 0, 'misses': 0}
+
+
+def test_match_cache_persists_between_runs(tmp_path):
+    path = str(tmp_path / "match_cache.db")
+    first = MatchCache(path)
+    first.put({'isrc': "USUM71900001", 'spotify_id': "sp1"}, tidal_track(101))
+    first.close()
+
+    second = MatchCache(path)
+    assert second.get({'isrc': "USUM71900001"}).id == 101
+    second.close()
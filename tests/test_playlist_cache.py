@@ -0,0 +1,60 @@
+"""
+Playlist Cache Tests
+Snapshot-keyed lookups and invalidation of cached Spotify playlist contents
+"""
+
+import pytest
+
+from playlist_cache import PlaylistCache
+from track_record import TrackRecord
+
+
+@pytest.fixture
+def playlist_cache(tmp_path):
+    cache = PlaylistCache(str(tmp_path / "playlist_cache.db"))
+    yield cache
+    cache.close()
+
+
+def playlist_tracks(*names):
+    return [TrackRecord(name, ["Artist"], "Album", spotify_id=f"sp-{name}") for name in names]
+
+
+def test_playlist_cache_hit_for_the_same_snapshot(playlist_cache):
+    assert playlist_cache.get("pl1", "snap1") is None
+    playlist_cache.put("pl1", "snap1", playlist_tracks("a", "b"))
+
+    cached = playlist_cache.get("pl1", "snap1")
+    assert [track.name for track in cached] == ["a", "b"]
+    assert cached[0].to_row() == playlist_tracks("a")[0].to_row()
+    assert playlist_cache.stats() == {'hits': 1, 'misses': 1}
+
+
+def test_playlist_cache_is_invalidated_by_a_new_snapshot(playlist_cache):
+    playlist_cache.put("pl1", "snap1", playlist_tracks("a", "b"))
+
+    # The playlist changed on Spotify, so its snapshot ID changed
+    assert playlist_cache.get("pl1", "snap2") is None
+
+    playlist_cache.put("pl1", "snap2", playlist_tracks("a", "b", "c"))
+    assert len(playlist_cache.get("pl1", "snap2")) == 3
+    # Only the latest snapshot is kept
+    assert playlist_cache.get("pl1", "snap1") is None
+
+
+def test_playlist_cache_keeps_playlists_apart(playlist_cache):
+    playlist_cache.put("pl1", "snap", playlist_tracks("a"))
+    playlist_cache.put("pl2", "snap", playlist_tracks("b"))
+    assert playlist_cache.get("pl1", "snap")[0].name == "a"
+    assert playlist_cache.get("pl2", "snap")[0].name == "b"
+
+
+def test_playlist_cache_persists_between_runs(tmp_path):
+    path = str(tmp_path / "playlist_cache.db")
+    first = PlaylistCache(path)
+    first.put("pl1", "snap1", playlist_tracks("a"))
+    first.close()
+
+    second = PlaylistCache(path)
+    assert second.get("pl1", "snap1")[0].name == "a"
+    second.close()
@@ -0,0 +1,216 @@
+"""
+Rate Limiter Tests
+Token-bucket arithmetic, 429 back-off and extraction of the server's Retry-After
+"""
+
+import requests
+import pytest
+import rate_limiter
+# The tidalapi exceptions, or placeholders on versions without tidalapi.exceptions
+from rate_limiter import MIN_RATE, ObjectNotFound, RateLimiter, TooManyRequests, is_client_error, throttle_info
+
+
+class FakeClock:
+    """
+    Replaces time.monotonic and time.sleep so waits are recorded instead of slept
+
+    Rates in these tests are powers of two so token arithmetic is exact.
+    """
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(rate_limiter.time, 'monotonic', fake.monotonic)
+    monkeypatch.setattr(rate_limiter.time, 'sleep', fake.sleep)
+    return fake
+
+
+def http_error(status, headers=None):
+    """Build a requests.HTTPError carrying a response with the given status"""
+    response = requests.Response()
+    response.status_code = status
+    response.headers.update(headers or {})
+    return requests.HTTPError(f"HTTP {status}", response=response)
+
+
+def too_many_requests(retry_after_header=None):
+    """Raise and catch TooManyRequests the way tidalapi does: chained to the HTTPError"""
+    headers = {'Retry-After': retry_after_header} if retry_after_header is not None else {}
+    try:
+        try:
+            raise http_error(429, headers)
+        except requests.HTTPError as e:
+            raise TooManyRequests("Too many requests") from e
+    except TooManyRequests as e:
+        return e
+
+
+def bare_too_many_requests(retry_after_header):
+    """Raise TooManyRequests without `from`, as tidalapi before 0.8.7 does"""
+    try:
+        try:
+            raise http_error(429, {'Retry-After': retry_after_header})
+        except requests.HTTPError:
+            raise TooManyRequests()
+    except TooManyRequests as e:
+        return e
+
+
+def test_burst_is_sent_back_to_back_then_paced_at_rate(clock):
+    limiter = RateLimiter(rate=8, burst=5)
+    for _ in range(5):
+        limiter.acquire()
+    assert clock.sleeps == []
+
+    limiter.acquire()
+    assert clock.sleeps == [0.125]
+
+
+def test_tokens_refill_with_time_up_to_burst(clock):
+    limiter = RateLimiter(rate=8, burst=5)
+    for _ in range(5):
+        limiter.acquire()
+
+    clock.now += 0.375  # Three tokens earned
+    for _ in range(3):
+        limiter.acquire()
+    assert clock.sleeps == []
+
+    clock.now += 60  # Far more than the burst earned; the bucket is capped
+    for _ in range(5):
+        limiter.acquire()
+    assert clock.sleeps == []
+    limiter.acquire()
+    assert len(clock.sleeps) == 1
+
+
+def test_throttled_halves_rate_and_pauses_for_retry_after(clock):
+    limiter = RateLimiter(rate=8, burst=4)
+    limiter.throttled(retry_after=3)
+    assert limiter.rate == 4
+    assert limiter.stats()['throttled'] == 1
+
+    limiter.acquire()
+    # First the Retry-After pause, then the emptied bucket refills at the halved rate
+    assert clock.sleeps[0] == pytest.approx(3)
+    assert sum(clock.sleeps) == pytest.approx(3 + 1 / 4)
+
+
+def test_throttled_without_retry_after_waits_one_interval(clock):
+    limiter = RateLimiter(rate=8, burst=4)
+    limiter.throttled()
+    limiter.acquire()
+    assert clock.sleeps[0] == pytest.approx(1 / 4)
+
+
+def test_rate_never_drops_below_minimum(clock):
+    limiter = RateLimiter(rate=1, burst=1)
+    for _ in range(10):
+        limiter.throttled(retry_after=0)
+    assert limiter.rate == MIN_RATE
+
+
+def test_clean_responses_ramp_rate_back_to_maximum(clock):
+    limiter = RateLimiter(rate=20, burst=5)
+    limiter.throttled(retry_after=0)
+    assert limiter.rate == 10
+
+    limiter.succeeded()
+    assert limiter.rate == 11  # One twentieth of the maximum per clean response
+    for _ in range(50):
+        limiter.succeeded()
+    assert limiter.rate == 20
+
+
+def test_configure_rejects_invalid_limits():
+    with pytest.raises(ValueError):
+        RateLimiter(rate=0, burst=5)
+    with pytest.raises(ValueError):
+        RateLimiter(rate=5, burst=0)
+
+
+def test_call_retries_tidalapi_too_many_requests(clock):
+    limiter = RateLimiter(rate=100, burst=10)
+    attempts = []
+
+    def search():
+        attempts.append(clock.now)
+        if len(attempts) < 3:
+            raise too_many_requests("2")
+        return "result"
+
+    assert limiter.call(search) == "result"
+    assert len(attempts) == 3
+    assert limiter.stats()['throttled'] == 2
+    assert attempts[1] - attempts[0] >= 2
+
+
+def test_call_gives_up_after_max_retries(clock, monkeypatch):
+    monkeypatch.setattr(rate_limiter, 'MAX_RETRIES', 3)
+    limiter = RateLimiter(rate=100, burst=10)
+    attempts = []
+
+    def search():
+        attempts.append(1)
+        raise too_many_requests("1")
+
+    with pytest.raises(TooManyRequests):
+        limiter.call(search)
+    assert len(attempts) == 3
+
+
+def test_call_does_not_retry_other_errors(clock):
+    limiter = RateLimiter(rate=100, burst=10)
+    attempts = []
+
+    def search():
+        attempts.append(1)
+        raise http_error(500)
+
+    with pytest.raises(requests.HTTPError):
+        limiter.call(search)
+    assert len(attempts) == 1
+
+
+def test_throttle_info_reads_tidalapi_exceptions():
+    # The header is read from the HTTPError the exception was raised from or while handling
+    assert throttle_info(too_many_requests("4")) == (429, 4.0)
+    assert throttle_info(bare_too_many_requests("5")) == (429, 5.0)
+    assert throttle_info(TooManyRequests()) == (429, None)
+    assert throttle_info(ObjectNotFound()) == (404, None)
+
+    # tidalapi 0.8.7 and later also copy the delay onto the exception
+    error = TooManyRequests("Too many requests")
+    error.retry_after = 7
+    assert throttle_info(error) == (429, 7.0)
+    error.retry_after = -1  # Header missing
+    assert throttle_info(error) == (429, None)
+
+
+def test_throttle_info_reads_http_errors():
+    assert throttle_info(http_error(429, {'Retry-After': "2.5"})) == (429, 2.5)
+    assert throttle_info(http_error(503)) == (503, None)
+    status, delay = throttle_info(http_error(429, {'Retry-After': "Wed, 21 Oct 2015 07:28:00 GMT"}))
+    assert status == 429 and delay == 0.0  # A date in the past means no wait
+    assert throttle_info(ValueError("no status")) == (None, None)
+
+
+def test_is_client_error_excludes_throttling_auth_and_transient_errors():
+    assert is_client_error(http_error(400))
+    assert is_client_error(ObjectNotFound())
+    assert not is_client_error(too_many_requests("1"))
+    assert not is_client_error(http_error(401))
+    assert not is_client_error(http_error(502))
+    assert not is_client_error(requests.ConnectionError("reset"))
@@ -0,0 +1,82 @@
+"""
+Spotify Fetch Tests
+Parallel paging of liked songs and playlists against the fake Spotify service, and the snapshot cache
+"""
+
+import pytest
+
+from fake_services import SyntheticLibrary
+from spotify_playlists import get_playlist_tracks, get_user_playlists, iter_playlist_tracks
+from spotify_tracks import get_liked_songs
+
+
+@pytest.fixture
+def library():
+    """Enough songs for several pages of liked songs and playlist tracks"""
+    return SyntheticLibrary(230, playlists=2, playlist_size=230)
+
+
+def requests_to(services, endpoint):
+    """Number of requests the fake service received for an endpoint, e.g. 'GET /me/tracks'"""
+    return services.state.stats()['requests'].get(f"spotify {endpoint}", 0)
+
+
+def playlist_page_requests(services):
+    """Playlist track pages requested (newer spotipy versions call the /items endpoint)"""
+    return requests_to(services, "GET /playlists/{id}/tracks") + requests_to(services, "GET /playlists/{id}/items")
+
+
+def test_liked_songs_keep_spotify_order_across_parallel_pages(spotify, library):
+    songs = get_liked_songs(workers=4)
+    assert [song['spotify_id'] for song in songs] == [library.spotify_track(i)['id'] for i in range(230)]
+    assert requests_to(spotify, "GET /me/tracks") == 5  # Pages of 50
+
+
+def test_liked_songs_stop_paging_at_max_items(spotify):
+    songs = get_liked_songs(workers=4, max_items=60)
+    assert len(songs) == 60
+    assert requests_to(spotify, "GET /me/tracks") == 2
+
+
+def test_liked_songs_carry_isrc_and_added_at(spotify, library):
+    song = get_liked_songs(max_items=1)[0]
+    assert song['name'] == "Song 000000"
+    assert song['isrc'] == (library.isrc(0) if library.has_isrc(0) else None)
+    assert song['added_at'] == "2020-01-01T00:00:00Z"
+
+
+def test_playlist_tracks_are_fetched_in_order(spotify, library):
+    playlist = get_user_playlists()[0]
+    tracks = get_playlist_tracks(playlist['id'], workers=4)
+    expected = [library.spotify_track(i)['id'] for i in library.playlist_tracks(0)]
+    assert [track['spotify_id'] for track in tracks] == expected
+    assert playlist['total_tracks'] == len(tracks)
+
+
+def test_unchanged_snapshot_is_served_from_the_cache(spotify):
+    playlist = get_user_playlists()[0]
+    first = get_playlist_tracks(playlist['id'], snapshot_id=playlist['snapshot_id'])
+    fetched = playlist_page_requests(spotify)
+    assert fetched == 3  # Pages of 100
+
+    again = get_playlist_tracks(playlist['id'], snapshot_id=playlist['snapshot_id'])
+    assert [t['spotify_id'] for t in again] == [t['spotify_id'] for t in first]
+    assert playlist_page_requests(spotify) == fetched
+
+
+def test_new_snapshot_is_fetched_again(spotify):
+    playlist = get_user_playlists()[0]
+    get_playlist_tracks(playlist['id'], snapshot_id=playlist['snapshot_id'])
+    fetched = playlist_page_requests(spotify)
+
+    get_playlist_tracks(playlist['id'], snapshot_id="changed-snapshot")
+    assert playlist_page_requests(spotify) == 2 * fetched
+
+
+def test_partly_read_playlist_is_not_cached(spotify):
+    playlist = get_user_playlists()[0]
+    tracks = iter_playlist_tracks(playlist['id'], snapshot_id=playlist['snapshot_id'])
+    next(tracks)
+    tracks.close()  # The consumer stopped early, e.g. the transfer failed
+
+    assert len(get_playlist_tracks(playlist['id'], snapshot_id=playlist['snapshot_id'])) == 230
@@ -0,0 +1,130 @@
+"""
+Tidal Playlists Tests
+Playlist transfers through a real tidalapi session and the fake Tidal service
+"""
+
+import pytest
+
+from fake_services import TIDAL_ID_OFFSET
+from spotify_playlists import get_playlist_tracks, get_user_playlists
+from tidal_playlists import load_playlist, sync_existing_playlist, sync_playlist, transfer_playlist
+from transfer_journal import TransferJournal
+
+
+@pytest.fixture
+def playlist(spotify, tidal):
+    """First Spotify playlist and its tracks"""
+    spotify_playlist = get_user_playlists()[0]
+    return spotify_playlist, get_playlist_tracks(spotify_playlist['id'])
+
+
+def tidal_items(services):
+    """Media IDs in the only Tidal playlist, in order"""
+    (tidal_playlist,) = services.state.playlists.values()
+    return [media_id for _, media_id in tidal_playlist['items']]
+
+
+def not_found_ids(library, p=0):
+    """Tidal IDs of the tracks of Spotify playlist p that the search does not find"""
+    return [TIDAL_ID_OFFSET + i for i in library.playlist_tracks(p) if not library.on_tidal(i)]
+
+
+def stale_ids(library, count, p=0):
+    """Tidal IDs of found tracks that are not on Spotify playlist p"""
+    on_playlist = set(library.playlist_tracks(p))
+    return [TIDAL_ID_OFFSET + i for i in range(library.size)
+            if i not in on_playlist and library.on_tidal(i)][:count]
+
+
+def expected_ids(library, p=0):
+    """Tidal IDs a transfer of Spotify playlist p should write, in order"""
+    return [TIDAL_ID_OFFSET + i for i in library.playlist_tracks(p) if library.on_tidal(i)]
+
+
+def test_playlist_is_created_with_the_found_tracks_in_order(playlist, services, library):
+    assert transfer_playlist(*playlist, workers=4, chunk_size=5)
+    assert tidal_items(services) == expected_ids(library)
+
+
+def test_failed_search_leaves_the_playlist_to_resume(playlist, services, library):
+    spotify_playlist, tracks = playlist
+    indices = library.playlist_tracks(0)
+    position = next(p for p in range(8, len(indices)) if library.on_tidal(indices[p]))
+    services.state.search_faults[indices[position]] = 500
+
+    journal = TransferJournal()
+    assert not transfer_playlist(spotify_playlist, tracks, workers=4, journal=journal, chunk_size=5)
+    journal.close()
+    journal = TransferJournal(resume=True)
+    state = journal.playlist_state(spotify_playlist['id'])
+    assert state['written'] == position  # The checkpoint stops before the failed search
+    assert not state.get('done')
+
+    services.state.search_faults.clear()
+    assert transfer_playlist(spotify_playlist, tracks, workers=4, journal=journal, chunk_size=5)
+    journal.close()
+    # The retried track is appended; Tidal skipped the tracks written twice
+    assert sorted(tidal_items(services)) == sorted(expected_ids(library))
+
+
+def test_rejected_track_is_isolated_by_bisection(playlist, services, library):
+    expected = expected_ids(library)
+    rejected = expected[5]
+    services.state.write_faults[rejected] = 400
+
+    assert transfer_playlist(*playlist, workers=4, chunk_size=len(expected))
+    assert tidal_items(services) == [track_id for track_id in expected if track_id != rejected]
+    # One rejected chunk, then two halves per level down to the bad track
+    writes = services.state.stats()['requests']["tidal POST /playlists/{id}/items"]
+    assert writes <= 1 + 2 * len(expected).bit_length()
+
+
+def test_server_error_is_not_bisected(playlist, services, library):
+    spotify_playlist, tracks = playlist
+    services.state.write_faults[expected_ids(library)[5]] = 500
+    journal = TransferJournal()
+
+    assert not transfer_playlist(spotify_playlist, tracks, workers=4, journal=journal, chunk_size=100)
+    journal.close()
+    assert tidal_items(services) == []
+    assert services.state.stats()['requests']["tidal POST /playlists/{id}/items"] == 1
+    journal = TransferJournal(resume=True)
+    assert not journal.playlist_state(spotify_playlist['id']).get('done')
+    journal.close()
+
+
+def test_sync_adds_missing_tracks_and_removes_stale_ones_around_videos(playlist, services, library):
+    spotify_playlist, tracks = playlist
+    expected = expected_ids(library)
+    stale = stale_ids(library, 2)
+    # Songs the search misses may still be on the Tidal playlist, e.g. added by hand
+    kept = not_found_ids(library)
+    assert kept
+    existing = [('track', expected[0]), ('video', 900001), ('track', stale[0]), ('track', kept[0]),
+                ('video', 900002), ('track', expected[1]), ('track', stale[1])]
+    existing += [('track', track_id) for track_id in kept[1:]]
+    playlist_id = services.state.add_tidal_playlist(spotify_playlist['name'], existing)
+
+    stats = sync_playlist(load_playlist(playlist_id), tracks, workers=4, remove_stale=True, chunk_size=5)
+
+    assert stats['present'] == 2
+    assert stats['added'] == len(expected) - 2
+    assert stats['removed'] == 2
+    items = services.state.playlists[playlist_id]['items']
+    # Only the stale tracks went: the videos and the unmatched songs' tracks kept their order
+    assert [item for item in items if item in existing] == [item for item in existing if item[1] not in stale]
+    assert sorted(media_id for kind, media_id in items if kind == 'track') == sorted(expected + kept)
+
+
+def test_failed_search_skips_stale_removal(playlist, services, library):
+    spotify_playlist, tracks = playlist
+    expected = expected_ids(library)
+    stale = stale_ids(library, 1)
+    playlist_id = services.state.add_tidal_playlist(spotify_playlist['name'],
+                                                    [('track', expected[0]), ('track', stale[0])])
+    services.state.search_faults[expected[3] - TIDAL_ID_OFFSET] = 500
+
+    assert not sync_existing_playlist(spotify_playlist, tracks, workers=4, remove_stale=True)
+    items = [media_id for _, media_id in services.state.playlists[playlist_id]['items']]
+    assert stale[0] in items
+    assert items == [expected[0], stale[0]] + [track_id for track_id in expected[1:] if track_id != expected[3]]
@@ -0,0 +1,82 @@
+"""
+Tidal Tracks Tests
+Liked-song transfers into Tidal favorites through a real tidalapi session and the fake Tidal service
+"""
+
+import pytest
+import requests
+
+from fake_services import TIDAL_ID_OFFSET
+from spotify_tracks import get_liked_songs
+from tidal_tracks import transfer_tracks
+from transfer_journal import TransferJournal
+
+
+@pytest.fixture
+def songs(spotify, tidal):
+    return get_liked_songs()
+
+
+def first_on_tidal(library, start=0):
+    """Index of the first song from `start` on that Tidal has"""
+    return next(i for i in range(start, library.size) if library.on_tidal(i))
+
+
+def test_found_songs_are_added_to_favorites(songs, services, library):
+    stats = transfer_tracks(songs, workers=4)
+    expected = {TIDAL_ID_OFFSET + i for i in range(library.size) if library.on_tidal(i)}
+    assert services.state.favorites == expected
+    assert stats['added'] == len(expected)
+    assert stats['not_found'] == library.size - len(expected)
+    assert stats['failed'] == 0
+
+
+def test_failed_search_is_journaled_as_failed_and_retried_on_resume(songs, services, library):
+    errored = first_on_tidal(library, 10)
+    services.state.search_faults[errored] = 500
+    journal = TransferJournal()
+    stats = transfer_tracks(songs, workers=4, journal=journal)
+    journal.close()
+
+    assert stats['failed'] == stats['search_failed'] == 1
+    assert TIDAL_ID_OFFSET + errored not in services.state.favorites
+
+    services.state.search_faults.clear()
+    journal = TransferJournal(resume=True)
+    assert not journal.track_done(songs[errored]['spotify_id'])
+    stats = transfer_tracks(songs, workers=4, journal=journal)
+    journal.close()
+
+    assert stats['skipped'] == library.size - 1
+    assert stats['added'] == 1
+    assert TIDAL_ID_OFFSET + errored in services.state.favorites
+
+
+def test_rejected_batch_is_retried_per_track(songs, services, library):
+    rejected = first_on_tidal(library, 5)
+    services.state.write_faults[TIDAL_ID_OFFSET + rejected] = 400
+    journal = TransferJournal()
+    stats = transfer_tracks(songs, workers=4, journal=journal)
+    journal.close()
+
+    expected = {TIDAL_ID_OFFSET + i for i in range(library.size) if library.on_tidal(i) and i != rejected}
+    assert services.state.favorites == expected
+    assert stats['favorite_batch_failures'] == 1
+    assert stats['failed'] == 1
+    assert stats['added'] == len(expected)
+    # Only the batch holding the rejected track was retried one track at a time
+    writes = services.state.stats()['requests']["tidal POST /users/{id}/favorites/tracks"]
+    assert writes == stats['favorite_batches'] + 50
+
+    journal = TransferJournal(resume=True)
+    assert not journal.track_done(songs[rejected]['spotify_id'])
+    assert journal.track_done(songs[first_on_tidal(library, rejected + 1)]['spotify_id'])
+    journal.close()
+
+
+def test_server_error_on_a_batch_is_raised_not_retried(songs, services, library):
+    services.state.write_faults[TIDAL_ID_OFFSET + first_on_tidal(library)] = 500
+    with pytest.raises(requests.HTTPError):
+        transfer_tracks(songs, workers=4)
+    assert services.state.favorites == set()
+    assert services.state.stats()['requests']["tidal POST /users/{id}/favorites/tracks"] == 1
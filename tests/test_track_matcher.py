@@ -0,0 +1,106 @@
+"""
+Track Matcher Tests
+Normalization, candidate scoring and the search query ladder
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from track_matcher import MATCH_THRESHOLD, TrackKey, normalize, queries_per_track
+
+
+def candidate(name, artists, duration=None, album=None):
+    """Build an object shaped like a tidalapi.Track search result"""
+    return SimpleNamespace(
+        name=name,
+        artists=[SimpleNamespace(name=artist) for artist in artists],
+        duration=duration,
+        album=SimpleNamespace(name=album) if album else None
+    )
+
+
+SPOTIFY_TRACK = {
+    'name': "Blinding Lights",
+    'artists': ["The Weeknd"],
+    'album': "After Hours",
+    'duration_ms': 200040
+}
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("Blinding Lights", "blinding lights"),
+    ("Beyoncé", "beyonce"),
+    ("Song (Live at Wembley)", "song"),
+    ("Song [2019 Remaster]", "song"),
+    ("Song feat. Someone Else", "song"),
+    ("Song ft. Someone Else", "song"),
+    ("Here Comes the Sun - Remastered 2009", "here comes the sun"),
+    ("Song - Radio Edit", "song"),
+    ("Simon & Garfunkel", "simon and garfunkel"),
+    ("Don't Stop Me Now!", "don t stop me now"),
+    ("  Many   spaces  ", "many spaces"),
+    ("", ""),
+    (None, ""),
+])
+def test_normalize(raw, expected):
+    assert normalize(raw) == expected
+
+
+def test_normalize_keeps_dash_suffix_that_is_not_a_version():
+    assert normalize("Song - Part Two") == "song part two"
+
+
+def test_queries_go_from_specific_to_broad_without_duplicates():
+    key = TrackKey({'name': "Under Pressure", 'artists': ["Queen", "David Bowie"], 'album': None})
+    assert key.queries() == ["under pressure queen", "under pressure david bowie", "under pressure"]
+
+    single = TrackKey({'name': "Song", 'artists': [], 'album': None})
+    assert single.queries() == ["song"]
+
+
+def test_exact_candidate_scores_one():
+    key = TrackKey(SPOTIFY_TRACK)
+    exact = candidate("Blinding Lights", ["The Weeknd"], duration=200, album="After Hours")
+    assert key.score(exact) == pytest.approx(1.0)
+
+
+def test_version_suffixes_and_featured_artists_still_match():
+    key = TrackKey(SPOTIFY_TRACK)
+    remaster = candidate("Blinding Lights (Remastered)", ["The Weeknd", "Someone"], duration=201,
+                         album="After Hours (Deluxe)")
+    assert key.score(remaster) == pytest.approx(1.0)
+
+
+@pytest.mark.parametrize("duration, component", [(202, 1.0), (205, 0.7), (210, 0.3), (240, 0.0)])
+def test_duration_tolerance(duration, component):
+    key = TrackKey(SPOTIFY_TRACK)
+    exact = key.score(candidate("Blinding Lights", ["The Weeknd"], duration=200, album="After Hours"))
+    off = key.score(candidate("Blinding Lights", ["The Weeknd"], duration=duration, album="After Hours"))
+    assert exact - off == pytest.approx(0.15 * (1.0 - component))
+
+
+def test_unknown_duration_and_album_are_neutral():
+    key = TrackKey({'name': "Song", 'artists': ["Artist"], 'album': None})
+    assert key.score(candidate("Song", ["Artist"])) == pytest.approx(0.45 + 0.30 + 0.15 * 0.5 + 0.10 * 0.5)
+
+
+def test_best_match_prefers_the_right_track_over_decoys():
+    key = TrackKey(SPOTIFY_TRACK)
+    right = candidate("Blinding Lights", ["The Weeknd"], duration=200, album="After Hours")
+    cover = candidate("Blinding Lights", ["Cover Band"], duration=230, album="Covers")
+    other = candidate("Save Your Tears", ["The Weeknd"], duration=215, album="After Hours")
+    assert key.best_match([cover, other, right]) is right
+
+
+def test_best_match_rejects_candidates_below_threshold():
+    key = TrackKey(SPOTIFY_TRACK)
+    wrong = candidate("Something Else", ["Another Artist"], duration=100, album="Elsewhere")
+    assert key.score(wrong) < MATCH_THRESHOLD
+    assert key.best_match([wrong]) is None
+    assert key.best_match([]) is None
+
+
+def test_queries_per_track():
+    assert queries_per_track({'queries': 10, 'resolved': 4}, {'queries': 25, 'resolved': 14}) == 1.5
+    assert queries_per_track({'queries': 3, 'resolved': 2}, {'queries': 3, 'resolved': 2}) == 0.0
@@ -0,0 +1,112 @@
+"""
+Transfer Journal Tests
+Replay of an existing journal, truncated lines and starting over
+"""
+
+import json
+
+import pytest
+
+from transfer_journal import TransferJournal
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "journal.jsonl")
+
+
+def test_replay_restores_track_and_playlist_progress(path):
+    journal = TransferJournal(path)
+    journal.record_track("sp1", 'added', 101)
+    journal.record_track("sp2", 'not_found')
+    journal.record_track("sp3", 'failed', 103)
+    journal.record_playlist("pl1", tidal_id="tidal-pl1", written=0)
+    journal.record_playlist("pl1", written=200)
+    journal.close()
+
+    resumed = TransferJournal(path, resume=True)
+    assert resumed.track_done("sp1")
+    assert resumed.track_done("sp2")
+    assert not resumed.track_done("sp3")  # Failed tracks are tried again
+    assert not resumed.track_done("sp4")
+    # Playlist records are merged, so earlier fields survive later partial updates
+    assert resumed.playlist_state("pl1") == {'kind': 'playlist', 'id': "pl1", 'tidal_id': "tidal-pl1",
+                                             'written': 200}
+    assert resumed.playlist_state("pl2") is None
+    resumed.close()
+
+
+def test_last_record_for_a_track_wins(path):
+    journal = TransferJournal(path)
+    journal.record_track("sp1", 'failed', 101)
+    journal.record_track("sp1", 'added', 101)
+    journal.close()
+
+    assert TransferJournal(path, resume=True).track_done("sp1")
+
+
+def test_truncated_last_line_is_ignored(path):
+    journal = TransferJournal(path)
+    journal.record_track("sp1", 'added', 101)
+    journal.record_playlist("pl1", tidal_id="tidal-pl1", written=100)
+    journal.close()
+
+    # A crash in the middle of a write leaves half a record behind
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"kind":"playlist","id":"pl1","wri')
+
+    resumed = TransferJournal(path, resume=True)
+    assert resumed.track_done("sp1")
+    assert resumed.playlist_state("pl1")['written'] == 100
+    resumed.close()
+
+
+def test_record_after_a_truncated_line_survives(path):
+    journal = TransferJournal(path)
+    journal.record_track("sp1", 'added', 101)
+    journal.close()
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"kind":"track","id":"sp2","sta')
+
+    resumed = TransferJournal(path, resume=True)
+    resumed.record_track("sp3", 'added', 103)
+    resumed.close()
+
+    replayed = TransferJournal(path, resume=True)
+    assert replayed.track_done("sp1")
+    assert replayed.track_done("sp3")
+    replayed.close()
+    with open(path, 'r', encoding='utf-8') as f:
+        assert [json.loads(line)['id'] for line in f] == ["sp1", "sp3"]
+
+
+def test_resume_appends_to_the_existing_journal(path):
+    journal = TransferJournal(path)
+    journal.record_track("sp1", 'added', 101)
+    journal.close()
+
+    resumed = TransferJournal(path, resume=True)
+    resumed.record_track("sp2", 'added', 102)
+    resumed.close()
+
+    with open(path, 'r', encoding='utf-8') as f:
+        ids = [json.loads(line)['id'] for line in f]
+    assert ids == ["sp1", "sp2"]
+
+
+def test_without_resume_the_journal_starts_over(path):
+    journal = TransferJournal(path)
+    journal.record_track("sp1", 'added', 101)
+    journal.close()
+
+    fresh = TransferJournal(path)
+    assert not fresh.track_done("sp1")
+    fresh.close()
+    with open(path, 'r', encoding='utf-8') as f:
+        assert f.read() == ""
+
+
+def test_close_is_idempotent(path):
+    journal = TransferJournal(path)
+    journal.close()
+    journal.close()
@@ -0,0 +1,160 @@
+"""
+Work Queue Tests
+Leasing, lease expiry, completion and failure handling of the SQLite work queue
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+import work_queue
+from fake_services import TIDAL_ID_OFFSET
+from spotify_tracks import get_liked_songs
+from track_record import TrackRecord
+from work_queue import MAX_ATTEMPTS, WorkQueue, run_worker
+
+
+def track(i):
+    return TrackRecord(f"Song {i}", [f"Artist {i}"], f"Album {i}", isrc=f"ISRC{i:05d}", spotify_id=f"sp{i}")
+
+
+def tidal_track(track_id, name="Song", artist="Artist"):
+    """Build an object shaped like a tidalapi.Track"""
+    return SimpleNamespace(id=track_id, name=name, artist=SimpleNamespace(name=artist))
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = WorkQueue(str(tmp_path / "queue.db"))
+    yield queue
+    queue.close()
+
+
+def test_enqueue_skips_duplicates_and_tracks_without_id(queue):
+    assert queue.enqueue([track(1), track(2), {'name': "Local file", 'spotify_id': None}]) == 2
+    assert queue.enqueue([track(2), track(3)]) == 1
+    assert queue.counts()['pending'] == 3
+
+
+def test_lease_hands_each_item_to_one_worker(queue):
+    queue.enqueue(track(i) for i in range(5))
+
+    first = queue.lease("a", limit=3)
+    second = queue.lease("b", limit=3)
+    assert len(first) == 3 and len(second) == 2
+    assert {t.spotify_id for t in first}.isdisjoint(t.spotify_id for t in second)
+    assert queue.lease("c") == []
+    assert queue.counts()['leased'] == 5
+
+    # Leased items come back as full track records
+    i = int(first[0].spotify_id[2:])
+    assert first[0].to_row() == track(i).to_row()
+
+
+def test_complete_stores_matches_and_misses(queue):
+    queue.enqueue([track(1), track(2)])
+    leased = {t.spotify_id: t for t in queue.lease("a")}
+
+    completed = queue.complete("a", [(leased['sp1'], tidal_track(101, "Song 1", "Artist 1")),
+                                     (leased['sp2'], None)])
+    assert completed == 2
+
+    counts = queue.counts()
+    assert (counts['done'], counts['found'], counts['leased']) == (2, 1, 0)
+    results = queue.results()
+    assert results['sp2'] is None
+    assert (results['sp1'].id, results['sp1'].name, results['sp1'].artist.name) == (101, "Song 1", "Artist 1")
+
+
+def test_expired_lease_passes_to_another_worker(queue):
+    queue.enqueue([track(1)])
+    stale = queue.lease("dead", lease_seconds=-1)  # Already expired
+
+    taken_over = queue.lease("alive")
+    assert [t.spotify_id for t in taken_over] == [t.spotify_id for t in stale]
+
+    # The first worker's late result is dropped; the new owner's is kept
+    assert queue.complete("dead", [(stale[0], tidal_track(1))]) == 0
+    assert queue.complete("alive", [(taken_over[0], tidal_track(2))]) == 1
+    assert queue.results()['sp1'].id == 2
+
+
+def test_unexpired_lease_is_not_taken_over(queue):
+    queue.enqueue([track(1)])
+    queue.lease("a", lease_seconds=60)
+    assert queue.lease("b") == []
+
+
+def test_expire_leases_frees_items_of_exited_workers(queue):
+    queue.enqueue([track(1), track(2)])
+    queue.lease("exited", limit=1, lease_seconds=60)
+    queue.lease("running", limit=1, lease_seconds=60)
+
+    queue.expire_leases(["exited"])
+    freed = queue.lease("main")
+    assert len(freed) == 1
+    assert queue.lease("main") == []
+
+
+def test_release_retries_then_fails_after_max_attempts(queue):
+    queue.enqueue([track(1)])
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        leased = queue.lease("a")
+        assert len(leased) == 1
+        queue.release("a", ["sp1"], "search failed")
+        expected = 'failed' if attempt == MAX_ATTEMPTS else 'pending'
+        assert queue.counts()[expected] == 1
+
+    assert queue.lease("a") == []
+    # Failed items are left out of the results so the writers search them again
+    assert queue.results() == {}
+
+
+def test_items_whose_leases_keep_expiring_are_failed(queue):
+    queue.enqueue([track(1)])
+    for _ in range(MAX_ATTEMPTS):
+        assert len(queue.lease("crashing", lease_seconds=-1)) == 1
+
+    assert queue.lease("a") == []
+    assert queue.counts()['failed'] == 1
+
+
+def test_clear_removes_everything(queue):
+    queue.enqueue([track(1), track(2)])
+    queue.complete("a", [(t, None) for t in queue.lease("a")])
+    queue.clear()
+    assert sum(queue.counts().values()) == 0
+
+
+def test_queue_is_shared_between_connections(tmp_path):
+    path = str(tmp_path / "queue.db")
+    producer, worker = WorkQueue(path), WorkQueue(path)
+    try:
+        producer.enqueue([track(1), track(2)])
+        leased = worker.lease(work_queue.worker_id())
+        worker.complete(work_queue.worker_id(), [(t, tidal_track(7)) for t in leased])
+        assert producer.counts()['found'] == 2
+    finally:
+        producer.close()
+        worker.close()
+
+
+def test_worker_releases_tracks_whose_search_failed(spotify, tidal, services, library, tmp_path):
+    path = str(tmp_path / "queue.db")
+    queue = WorkQueue(path)
+    queue.enqueue(get_liked_songs())
+    errored = next(i for i in range(library.size) if library.on_tidal(i))
+    services.state.search_faults[errored] = 500
+
+    stats = run_worker(path, workers=4)
+
+    # The failing track was released and retried until it ran out of attempts
+    assert stats['released'] == MAX_ATTEMPTS
+    counts = queue.counts()
+    assert (counts['done'], counts['failed']) == (library.size - 1, 1)
+    # Failed tracks are left to the writers; the rest resolved normally
+    results = queue.results()
+    assert library.spotify_track(errored)['id'] not in results
+    found = {result.id for result in results.values() if result}
+    assert found == {TIDAL_ID_OFFSET + i for i in range(library.size) if library.on_tidal(i) and i != errored}
+    queue.close()
@@ -6,55 +6,50 @@ Handles authentication with Tidal API
 import tidalapi
 import os
 import json
+import threading
+from datetime import datetime, timedelta, timezone
 from dotenv import load_dotenv
+from rate_limiter import get_rate_limiter, throttle_info
+from http_transport import install_transport, transport_mode
 
 # Load environment variables
 load_dotenv()
 
-SESSION_FILE = "tidal_session.json"
+SESSION_FILE = "tidal_session.json"  # Saved OAuth tokens; override with TIDAL_SESSION_FILE
 
+# Process-wide session shared by every module
+_session = None
+_session_lock = threading.Lock()
+_session_generation = 0
 
-def get_tidal_session():
-    """
-    Create and return an authenticated Tidal session
 
-    Returns:
-        tidalapi.Session: Authenticated Tidal session
-    """
-    session = tidalapi.Session()
+def _session_file() -> str:
+    """Return the path of the saved session, honouring TIDAL_SESSION_FILE"""
+    return os.getenv('TIDAL_SESSION_FILE', SESSION_FILE)
 
-    # Try to load existing session
-    if os.path.exists(SESSION_FILE):
-        try:
-            with open(SESSION_FILE, 'r') as f:
-                session_data = json.load(f)
-                session.load_oauth_session(
-                    session_data['token_type'],
-                    session_data['access_token'],
-                    session_data['refresh_token'],
-                    session_data.get('expiry_time')
-                )
-                if session.check_login():
-                    print("Loaded existing Tidal session")
-                    return session
-        except Exception as e:
-            print(f"Could not load existing session: {e}")
 
-    # Need to perform new login
-    print("\nTidal Login Required")
-    print("===================")
-    print("A browser window will open for you to authorize this application.")
-    print("Please follow the instructions in your browser.\n")
+def _parse_expiry(value):
+    """Parse a stored expiry_time into a datetime, or None"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
 
-    # OAuth2 login
-    login, future = session.login_oauth()
 
-    print(f"Visit this URL to authorize: {login.verification_uri_complete}")
-    print("Waiting for authorization...")
+def _is_expired(expiry) -> bool:
+    """Return True if a token expiry time is missing or already in the past"""
+    if expiry is None:
+        return True
+    if expiry.tzinfo is None:
+        # tidalapi stores naive UTC timestamps
+        expiry = expiry.replace(tzinfo=timezone.utc)
+    return expiry <= datetime.now(timezone.utc)
 
-    future.result()  # Wait for login to complete
 
-    # Save session for future use
+def _save_session(session):
+    """Persist the session tokens for future runs"""
     try:
         session_data = {
             'token_type': session.token_type,
@@ -62,15 +57,163 @@ def get_tidal_session():
             'refresh_token': session.refresh_token,
             'expiry_time': session.expiry_time.isoformat() if session.expiry_time else None
         }
-        with open(SESSION_FILE, 'w') as f:
+        with open(_session_file(), 'w') as f:
             json.dump(session_data, f)
         print("Session saved for future use")
     except Exception as e:
         print(f"Warning: Could not save session: {e}")
 
+
+def _login(session):
+    """Run the interactive OAuth device login on the given session"""
+    print("\nTidal Login Required")
+    print("===================")
+    print("A browser window will open for you to authorize this application.")
+    print("Please follow the instructions in your browser.\n")
+
+    # OAuth2 login
+    login, future = session.login_oauth()
+
+    print(f"Visit this URL to authorize: {login.verification_uri_complete}")
+    print("Waiting for authorization...")
+
+    future.result()  # Wait for login to complete
+
+    # Save session for future use
+    _save_session(session)
+
+
+def _create_session():
+    """
+    Load the saved Tidal session, or log in if there is no usable one
+
+    Loading the saved tokens already validates them against the server, so
+    a session that loaded and has not reached its stored expiry time is used
+    without a further check_login(). Otherwise the token is refreshed and
+    validated again before falling back to a new login.
+
+    Returns:
+        tidalapi.Session: Authenticated Tidal session
+    """
+    session = tidalapi.Session()
+    install_transport(session.request_session)
+
+    if transport_mode() == 'replay':
+        # The recorded session lookup supplies the user; no real token is needed
+        session.load_oauth_session('Bearer', 'replay', None,
+                                   datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(days=1))
+        return session
+
+    # Try to load existing session
+    if os.path.exists(_session_file()):
+        try:
+            with open(_session_file(), 'r') as f:
+                session_data = json.load(f)
+            expiry = _parse_expiry(session_data.get('expiry_time'))
+            loaded = session.load_oauth_session(
+                session_data['token_type'],
+                session_data['access_token'],
+                session_data['refresh_token'],
+                expiry
+            )
+            if loaded and not _is_expired(expiry):
+                print("Loaded existing Tidal session")
+                return session
+            # Rejected or expired: refresh, then load again so the session and user are filled in
+            if session.token_refresh(session_data['refresh_token']) and session.load_oauth_session(
+                    session.token_type, session.access_token, session.refresh_token, session.expiry_time):
+                _save_session(session)
+                print("Refreshed existing Tidal session")
+                return session
+        except Exception as e:
+            print(f"Could not load existing session: {e}")
+
+    # Need to perform new login
+    _login(session)
     return session
 
 
+def get_tidal_session():
+    """
+    Return the authenticated Tidal session, creating it on first use
+
+    The session is created once per process and shared by every caller;
+    expired tokens are refreshed lazily by tidal_request().
+
+    Returns:
+        tidalapi.Session: Authenticated Tidal session
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = _create_session()
+        return _session
+
+
+def set_tidal_session(session) -> None:
+    """
+    Replace the shared Tidal session (e.g. with one pointed at a local stand-in server)
+
+    Args:
+        session: tidalapi.Session compatible object used for every later request
+    """
+    global _session, _session_generation
+    with _session_lock:
+        _session = session
+        _session_generation += 1
+
+
+def refresh_tidal_session(generation: int = None):
+    """
+    Refresh the shared session's access token after an auth failure
+
+    The session object is updated in place, so bound methods captured by
+    callers keep working. If another thread already refreshed the session
+    since `generation` was read, nothing is done.
+
+    Args:
+        generation: Session generation observed before the failed request
+    """
+    global _session_generation
+    with _session_lock:
+        if _session is None:
+            return
+        if generation is not None and generation != _session_generation:
+            return
+        try:
+            if not _session.token_refresh(_session.refresh_token):
+                raise ValueError("Token refresh was rejected")
+            _save_session(_session)
+        except Exception as e:
+            print(f"Could not refresh Tidal session: {e}")
+            _login(_session)
+        _session_generation += 1
+
+
+def tidal_request(func, *args, **kwargs):
+    """
+    Call a Tidal API function under the shared rate limiter
+
+    A 401 response triggers one token refresh and a retry.
+
+    Args:
+        func: Function performing a single Tidal request
+        *args, **kwargs: Arguments passed to func
+
+    Returns:
+        Whatever func returns
+    """
+    generation = _session_generation
+    try:
+        return get_rate_limiter().call(func, *args, **kwargs)
+    except Exception as e:
+        status, _ = throttle_info(e)
+        if status != 401:
+            raise
+    refresh_tidal_session(generation)
+    return get_rate_limiter().call(func, *args, **kwargs)
+
+
 def test_connection():
     """
     Test the Tidal connection and display user information
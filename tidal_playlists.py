@@ -3,10 +3,28 @@ Tidal Playlists Module
 Handles creating playlists and adding tracks to them on Tidal
 """
 
-from tidal_auth import get_tidal_session
-from tidal_tracks import search_track_on_tidal
-from typing import Dict, List, Optional
-import time
+from tidal_auth import get_tidal_session, tidal_request
+from tidal_tracks import SearchFailed, resolve_tracks
+from match_cache import get_match_cache
+from metrics import metrics
+from rate_limiter import is_client_error
+from progress import ProgressRenderer, log_track
+from track_matcher import TrackKey, match_stats, queries_per_track
+from track_record import track_label
+from itertools import islice
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import tidalapi
+
+PLAYLIST_CHUNK_SIZE = 100       # Track IDs sent per playlist write
+NOT_FOUND_SHOWN = 10            # Not-found tracks listed by name in the summary
+TIDAL_PLAYLIST_PAGE_SIZE = 50   # Playlists requested per page when building the index
+TIDAL_ITEM_PAGE_SIZE = 100      # Tracks and videos requested per page when reading a playlist
+NEAR_MATCH_THRESHOLD = 0.6      # Tidal tracks this close to a not-found Spotify track are not stale
+
+# Name index of the user's Tidal playlists, built once per run
+_playlist_index = None
+_playlist_index_lock = threading.Lock()
 
 
 def create_playlist(name: str, description: str = "") -> Optional[object]:
@@ -25,7 +43,8 @@ def create_playlist(name: str, description: str = "") -> Optional[object]:
     try:
         # Create the playlist
         user = session.user
-        playlist = user.create_playlist(name, description)
+        playlist = tidal_request(user.create_playlist, name, description)
+        _add_to_index(playlist)
         
         print(f"  ✓ Created playlist: {name}")
         return playlist
@@ -34,99 +53,196 @@ def create_playlist(name: str, description: str = "") -> Optional[object]:
         return None
 
 
-def add_tracks_to_playlist(playlist, tracks: List[Dict]) -> Dict[str, int]:
+def _write_tracks(playlist, entries: List[Tuple[int, Dict]], stats: Dict[str, int],
+                  rejected: List[str]) -> None:
+    """
+    Add a chunk of tracks to a Tidal playlist, isolating rejected IDs by bisection
+
+    If Tidal rejects the chunk (HTTP 4xx), each half is retried on its own
+    until the offending tracks are found, so k bad IDs cost O(k log n)
+    requests instead of one request per track. Playlist order is preserved.
+    Other failures (throttling that outlasted the retries, server errors,
+    connection errors) are not caused by the tracks and are re-raised
+    instead of being bisected.
+
+    Args:
+        playlist: Tidal playlist object
+        entries: (Tidal track ID, Spotify track info) pairs, in playlist order
+        stats: Transfer statistics to update
+        rejected: Descriptions of tracks Tidal refused, appended to
+
+    Raises:
+        Exception: The original error if it was not a client rejection
+    """
+    try:
+        # Add tracks to playlist (Tidal API typically accepts track IDs)
+        # Note: The exact method might vary depending on tidalapi version
+        tidal_request(metrics.instrument("tidal.playlist.add", playlist.add),
+                      [track_id for track_id, _ in entries])
+        stats['added'] += len(entries)
+        for track_id, track_info in entries:
+            log_track(playlist.name, track_info, 'added', track_id)
+    except Exception as e:
+        if not is_client_error(e):
+            raise
+        if len(entries) == 1:
+            track_id, track_info = entries[0]
+            stats['failed'] += 1
+            log_track(playlist.name, track_info, 'failed', track_id)
+            rejected.append(f"{track_label(track_info)} (Tidal ID {track_id}): {e}")
+            return
+        
+        middle = len(entries) // 2
+        _write_tracks(playlist, entries[:middle], stats, rejected)
+        _write_tracks(playlist, entries[middle:], stats, rejected)
+
+
+def add_tracks_to_playlist(playlist, tracks: Iterable[Dict], workers: int = 1,
+                           total: Optional[int] = None,
+                           on_written: Optional[Callable[[int], None]] = None,
+                           chunk_size: int = PLAYLIST_CHUNK_SIZE,
+                           resolved: Optional[Dict[str, Optional[object]]] = None) -> Dict[str, int]:
     """
     Add tracks to a Tidal playlist
     
+    Tracks are searched as they arrive and found IDs are written in chunks
+    of `chunk_size`, so `tracks` may be a generator and the first tracks
+    reach Tidal before the rest have been fetched or searched.
+    
     Args:
         playlist: Tidal playlist object
-        tracks: List of track information from Spotify
+        tracks: Track information from Spotify (list or iterator)
+        workers: Number of concurrent Tidal searches
+        total: Expected number of tracks, for progress output when tracks is an iterator
+        on_written: Called with the number of input tracks fully processed
+            each time a chunk has been written (used for checkpointing); it
+            never moves past a track whose search failed
+        chunk_size: Number of track IDs sent per playlist write
+        resolved: Optional results of resolve_unique_tracks to use instead of searching
         
     Returns:
         Dict containing statistics about the transfer
     """
     session = get_tidal_session()
+    cache = get_match_cache()
+    cache_before = cache.stats()
+    match_before = match_stats.snapshot()
+    
+    if total is None and hasattr(tracks, '__len__'):
+        total = len(tracks)
     
     stats = {
-        'total': len(tracks),
+        'total': 0,
         'found': 0,
         'added': 0,
         'not_found': 0,
-        'failed': 0
+        'failed': 0,
+        'search_failed': 0
     }
     
     not_found_tracks = []
-    found_track_ids = []
+    rejected_tracks = []
+    pending = []
+    processed = None  # Checkpoint cap: tracks before the first failed search
     
-    print(f"  Searching for {stats['total']} tracks on Tidal...")
+    print(f"  Searching for {total if total is not None else 'all'} tracks on Tidal...")
     
-    # First, search for all tracks
-    for i, track_info in enumerate(tracks, 1):
-        track_name = track_info['name']
-        artists = ", ".join(track_info['artists'])
-        
-        # Show progress every 10 tracks
-        if i % 10 == 0 or i == stats['total']:
-            print(f"    Searching... {i}/{stats['total']}")
-        
-        # Search for track on Tidal
-        tidal_track = search_track_on_tidal(session, track_info)
+    # Search tracks (concurrently, results keep playlist order) and write as we go
+    results = resolve_tracks(session, tracks, workers, cache, resolved)
+    progress = ProgressRenderer(total, prefix="    Searching... ")
+    
+    for i, (track_info, tidal_track) in enumerate(results, 1):
+        stats['total'] = i
+        progress.update(bool(tidal_track))
         
         if tidal_track:
             stats['found'] += 1
-            found_track_ids.append(tidal_track.id)
+            pending.append((tidal_track.id, track_info))
+            if len(pending) >= chunk_size:
+                _write_tracks(playlist, pending, stats, rejected_tracks)
+                pending = []
+                if on_written:
+                    on_written(i if processed is None else processed)
+        elif isinstance(tidal_track, SearchFailed):
+            # Resuming from before this track searches it again; Tidal skips the duplicates
+            stats['failed'] += 1
+            stats['search_failed'] += 1
+            log_track(playlist.name, track_info, 'failed')
+            if processed is None:
+                processed = i - 1
         else:
             stats['not_found'] += 1
-            not_found_tracks.append(f"{track_name} by {artists}")
-        
-        # Small delay to avoid rate limiting
-        if i % 20 == 0:
-            time.sleep(0.5)
+            log_track(playlist.name, track_info, 'not_found')
+            if len(not_found_tracks) < NOT_FOUND_SHOWN:
+                not_found_tracks.append(track_info)
+    
+    if pending:
+        _write_tracks(playlist, pending, stats, rejected_tracks)
+    if on_written:
+        on_written(stats['total'] if processed is None else processed)
+    progress.close()
+    
+    cache_after = cache.stats()
+    stats['cache_hits'] = cache_after['hits'] - cache_before['hits']
+    stats['cache_misses'] = cache_after['misses'] - cache_before['misses']
+    stats['queries_per_track'] = queries_per_track(match_before, match_stats.snapshot())
     
     print(f"  Found {stats['found']}/{stats['total']} tracks on Tidal")
+    if stats['added'] > 0:
+        print(f"  ✓ Successfully added {stats['added']} tracks to playlist")
+    if stats['search_failed']:
+        print(f"  ✗ Searches failed for {stats['search_failed']} tracks")
     
-    # Now add all found tracks to the playlist in batches
-    if found_track_ids:
-        print(f"  Adding {len(found_track_ids)} tracks to playlist...")
-        
-        try:
-            # Add tracks to playlist (Tidal API typically accepts track IDs)
-            # Note: The exact method might vary depending on tidalapi version
-            playlist.add(found_track_ids)
-            stats['added'] = len(found_track_ids)
-            print(f"  ✓ Successfully added {stats['added']} tracks to playlist")
-        except Exception as e:
-            print(f"  ✗ Error adding tracks to playlist: {e}")
-            # Try adding tracks one by one as fallback
-            print("  Attempting to add tracks individually...")
-            for track_id in found_track_ids:
-                try:
-                    playlist.add([track_id])
-                    stats['added'] += 1
-                except Exception as track_error:
-                    stats['failed'] += 1
-                    
-            if stats['added'] > 0:
-                print(f"  ✓ Successfully added {stats['added']} tracks individually")
+    # Report tracks Tidal refused to add
+    if rejected_tracks:
+        print(f"\n  Tracks rejected by Tidal ({len(rejected_tracks)}):")
+        for track in rejected_tracks:
+            print(f"    - {track}")
     
     # Report tracks not found
-    if not_found_tracks and len(not_found_tracks) <= 10:
-        print(f"\n  Tracks not found on Tidal ({len(not_found_tracks)}):")
+    if not_found_tracks and stats['not_found'] <= NOT_FOUND_SHOWN:
+        print(f"\n  Tracks not found on Tidal ({stats['not_found']}):")
         for track in not_found_tracks:
-            print(f"    - {track}")
+            print(f"    - {track_label(track)}")
     elif not_found_tracks:
-        print(f"\n  {len(not_found_tracks)} tracks not found on Tidal")
+        print(f"\n  {stats['not_found']} tracks not found on Tidal")
     
     return stats
 
 
-def transfer_playlist(spotify_playlist: Dict, spotify_tracks: List[Dict]) -> bool:
+def load_playlist(playlist_id: str) -> Optional[object]:
+    """
+    Fetch an existing Tidal playlist by ID
+    
+    Args:
+        playlist_id: Tidal playlist ID
+        
+    Returns:
+        Tidal playlist object if found, None otherwise
+    """
+    session = get_tidal_session()
+    
+    try:
+        return tidal_request(session.playlist, playlist_id)
+    except Exception as e:
+        print(f"  ✗ Error loading playlist {playlist_id}: {e}")
+        return None
+
+
+def transfer_playlist(spotify_playlist: Dict, spotify_tracks: Iterable[Dict], workers: int = 1,
+                      journal=None, chunk_size: int = PLAYLIST_CHUNK_SIZE,
+                      resolved: Optional[Dict[str, Optional[object]]] = None) -> bool:
     """
     Transfer a complete playlist from Spotify to Tidal
     
     Args:
         spotify_playlist: Playlist information from Spotify
-        spotify_tracks: List of tracks in the playlist
+        spotify_tracks: Tracks in the playlist (list or iterator)
+        workers: Number of concurrent Tidal searches
+        journal: Optional TransferJournal; a playlist it already started is
+            continued where it stopped instead of being created again
+        chunk_size: Number of track IDs sent per playlist write
+        resolved: Optional results of resolve_unique_tracks to use instead of searching
         
     Returns:
         bool: True if successful, False otherwise
@@ -134,31 +250,354 @@ def transfer_playlist(spotify_playlist: Dict, spotify_tracks: List[Dict]) -> boo
     print(f"\nTransferring playlist: {spotify_playlist['name']}")
     print("-" * 60)
     
-    # Create the playlist on Tidal
-    tidal_playlist = create_playlist(
-        name=spotify_playlist['name'],
-        description=spotify_playlist.get('description', '')
-    )
+    playlist_id = spotify_playlist['id']
+    state = journal.playlist_state(playlist_id) if journal is not None else None
+    
+    if state and state.get('done'):
+        print("  ✓ Already transferred in a previous run")
+        return True
+    
+    tidal_playlist = None
+    start = 0
+    
+    # Continue a playlist created by an interrupted run
+    if state and state.get('tidal_id'):
+        tidal_playlist = load_playlist(state['tidal_id'])
+        if tidal_playlist:
+            start = state.get('written', 0)
+            print(f"  Resuming existing Tidal playlist after {start} tracks")
     
     if not tidal_playlist:
-        return False
+        # Create the playlist on Tidal
+        tidal_playlist = create_playlist(
+            name=spotify_playlist['name'],
+            description=spotify_playlist.get('description', '')
+        )
+        
+        if not tidal_playlist:
+            return False
+        
+        if journal is not None:
+            journal.record_playlist(playlist_id, tidal_id=tidal_playlist.id, written=0)
+    
+    # Streamed tracks can't be counted up front, so trust Spotify's total
+    if hasattr(spotify_tracks, '__len__'):
+        expected = len(spotify_tracks)
+    else:
+        expected = spotify_playlist['total_tracks']
+    
+    if start:
+        spotify_tracks = islice(spotify_tracks, start, None)
+        expected = max(0, expected - start)
+    
+    def record_written(processed):
+        journal.record_playlist(playlist_id, written=start + processed)
     
     # Add tracks to the playlist
-    if spotify_tracks:
-        stats = add_tracks_to_playlist(tidal_playlist, spotify_tracks)
-        
+    if expected > 0:
+        try:
+            stats = add_tracks_to_playlist(
+                tidal_playlist, spotify_tracks, workers, total=expected,
+                on_written=record_written if journal is not None else None,
+                chunk_size=chunk_size, resolved=resolved
+            )
+        except Exception as e:
+            # Written chunks are in the journal, so --resume continues from here
+            print(f"\n  ✗ Error adding tracks to '{spotify_playlist['name']}': {e}")
+            return False
+
         # Print summary for this playlist
-        print(f"\n  Playlist transfer summary:")
+        print("\n  Playlist transfer summary:")
         print(f"    Total tracks: {stats['total']}")
         print(f"    Successfully added: {stats['added']}")
         print(f"    Not found: {stats['not_found']}")
         if stats['failed'] > 0:
             print(f"    Failed to add: {stats['failed']}")
+        if resolved is None:
+            print(f"    Match cache: {stats['cache_hits']} hits, {stats['cache_misses']} misses")
+            print(f"    Average searches per found track: {stats['queries_per_track']:.2f}")
         
-        return stats['added'] > 0
+        # A streamed playlist may turn out to hold only episodes or deleted tracks,
+        # and a resumed one may have had all its found tracks written already.
+        # Failed searches leave the playlist unfinished so --resume retries them.
+        success = (stats['added'] > 0 or stats['total'] == 0 or start > 0) and not stats['search_failed']
     else:
         print("  No tracks to transfer (empty playlist)")
+        success = True
+    
+    if journal is not None and success:
+        journal.record_playlist(playlist_id, done=True)
+    
+    return success
+
+
+def get_playlist_items(playlist) -> List[object]:
+    """
+    Fetch the entries of a Tidal playlist, in playlist order
+    
+    Videos are included: they take up positions too, so indices passed to
+    remove_by_indices must be counted over tracks and videos alike.
+    
+    Args:
+        playlist: Tidal playlist object
+        
+    Returns:
+        List of tidalapi Track and Video objects
+    """
+    items = []
+    offset = 0
+    
+    while True:
+        page = tidal_request(playlist.items, limit=TIDAL_ITEM_PAGE_SIZE, offset=offset)
+        items.extend(page)
+        if len(page) < TIDAL_ITEM_PAGE_SIZE:
+            return items
+        offset += TIDAL_ITEM_PAGE_SIZE
+
+
+def _is_track(item) -> bool:
+    """Whether a playlist entry is a track (not a video)"""
+    return not isinstance(item, tidalapi.Video)
+
+
+def _remove_tracks(playlist, items: List[object], stale_ids: set, stats: Dict[str, int]) -> None:
+    """
+    Remove tracks from a Tidal playlist with a single request
+    
+    Every position holding a stale track is removed, so duplicates of a
+    stale track go too. Videos are never removed.
+    
+    Args:
+        playlist: Tidal playlist object
+        items: Entries currently in the playlist, in order (from get_playlist_items)
+        stale_ids: Track IDs to remove
+        stats: Sync statistics to update
+    """
+    indices = [index for index, item in enumerate(items) if _is_track(item) and int(item.id) in stale_ids]
+    try:
+        tidal_request(playlist.remove_by_indices, indices)
+        stats['removed'] += len(indices)
+    except Exception as e:
+        print(f"  ✗ Error removing {len(indices)} tracks: {e}")
+        stats['failed'] += len(indices)
+
+
+def _stale_track_ids(items: List[object], wanted: set, not_found: List[Dict]) -> set:
+    """
+    Work out which tracks of a Tidal playlist are no longer on the Spotify playlist
+    
+    A Spotify track that was not found may still be on the Tidal playlist
+    under a slightly different title or duration (a match that narrowly
+    missed MATCH_THRESHOLD, or one added by hand), so the closest current
+    track above NEAR_MATCH_THRESHOLD is kept for each of them.
+    
+    Args:
+        items: Entries currently in the playlist
+        wanted: Tidal track IDs the Spotify playlist resolved to
+        not_found: Spotify tracks that did not resolve
+        
+    Returns:
+        Set of Tidal track IDs to remove
+    """
+    candidates = {int(item.id): item for item in items if _is_track(item) and int(item.id) not in wanted}
+    for track_info in not_found:
+        if not candidates:
+            break
+        near = TrackKey(track_info).best_match(candidates.values(), threshold=NEAR_MATCH_THRESHOLD)
+        if near is not None:
+            del candidates[int(near.id)]
+    return set(candidates)
+
+
+def sync_playlist(playlist, tracks: Iterable[Dict], workers: int = 1, remove_stale: bool = False,
+                  chunk_size: int = PLAYLIST_CHUNK_SIZE,
+                  resolved: Optional[Dict[str, Optional[object]]] = None) -> Dict[str, int]:
+    """
+    Bring an existing Tidal playlist in line with a Spotify playlist
+    
+    The Tidal playlist's track IDs are fetched once and compared with the
+    resolved Spotify tracks; only the missing tracks are added (in Spotify
+    order, appended at the end), and tracks no longer on the Spotify
+    playlist are removed if requested. Removal is skipped if any search
+    failed, and tracks that nearly match a not-found Spotify track are
+    kept. With a warm match cache, tracks that were synced before cost no
+    searches.
+    
+    Args:
+        playlist: Existing Tidal playlist object
+        tracks: Track information from Spotify (list or iterator)
+        workers: Number of concurrent Tidal searches
+        remove_stale: Also remove tracks that are not on the Spotify playlist
+        chunk_size: Number of track IDs sent per playlist write
+        resolved: Optional results of resolve_unique_tracks to use instead of searching
+        
+    Returns:
+        Dict containing statistics about the sync
+    """
+    session = get_tidal_session()
+    cache = get_match_cache()
+    cache_before = cache.stats()
+    match_before = match_stats.snapshot()
+    
+    stats = {
+        'total': 0,
+        'found': 0,
+        'not_found': 0,
+        'present': 0,
+        'added': 0,
+        'removed': 0,
+        'failed': 0,
+        'search_failed': 0
+    }
+    
+    items = get_playlist_items(playlist)
+    current = {int(item.id) for item in items if _is_track(item)}
+    wanted = set()
+    missing = []
+    not_found = []
+    rejected_tracks = []
+    
+    print(f"  Existing Tidal playlist has {len(items)} items")
+    
+    for track_info, tidal_track in resolve_tracks(session, tracks, workers, cache, resolved):
+        stats['total'] += 1
+        if isinstance(tidal_track, SearchFailed):
+            stats['failed'] += 1
+            stats['search_failed'] += 1
+            log_track(playlist.name, track_info, 'failed')
+            continue
+        if not tidal_track:
+            stats['not_found'] += 1
+            log_track(playlist.name, track_info, 'not_found')
+            if remove_stale:
+                not_found.append(track_info)
+            continue
+        
+        stats['found'] += 1
+        track_id = int(tidal_track.id)
+        if track_id in current or track_id in wanted:
+            stats['present'] += 1
+            log_track(playlist.name, track_info, 'present', track_id)
+        else:
+            missing.append((track_id, track_info))
+        wanted.add(track_id)
+    
+    for start in range(0, len(missing), chunk_size):
+        _write_tracks(playlist, missing[start:start + chunk_size], stats, rejected_tracks)
+    
+    if remove_stale and stats['search_failed']:
+        # Without every search result, a track still on Spotify could look stale
+        print(f"  ✗ Not removing stale tracks: searches failed for {stats['search_failed']} tracks")
+    elif remove_stale:
+        stale = _stale_track_ids(items, wanted, not_found)
+        if stale:
+            _remove_tracks(playlist, items, stale, stats)
+    
+    cache_after = cache.stats()
+    stats['cache_hits'] = cache_after['hits'] - cache_before['hits']
+    stats['cache_misses'] = cache_after['misses'] - cache_before['misses']
+    stats['queries_per_track'] = queries_per_track(match_before, match_stats.snapshot())
+    
+    if rejected_tracks:
+        print(f"\n  Tracks rejected by Tidal ({len(rejected_tracks)}):")
+        for track in rejected_tracks:
+            print(f"    - {track}")
+    
+    return stats
+
+
+def sync_existing_playlist(spotify_playlist: Dict, spotify_tracks: Iterable[Dict], workers: int = 1,
+                           journal=None, chunk_size: int = PLAYLIST_CHUNK_SIZE,
+                           remove_stale: bool = False,
+                           resolved: Optional[Dict[str, Optional[object]]] = None) -> bool:
+    """
+    Sync a Spotify playlist into the Tidal playlist of the same name
+    
+    Falls back to a normal transfer when no such Tidal playlist exists.
+    
+    Args:
+        spotify_playlist: Playlist information from Spotify
+        spotify_tracks: Tracks in the playlist (list or iterator)
+        workers: Number of concurrent Tidal searches
+        journal: Optional TransferJournal
+        chunk_size: Number of track IDs sent per playlist write
+        remove_stale: Also remove tracks that are not on the Spotify playlist
+        resolved: Optional results of resolve_unique_tracks to use instead of searching
+        
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    tidal_playlist = find_playlist(spotify_playlist['name'])
+    if not tidal_playlist:
+        return transfer_playlist(spotify_playlist, spotify_tracks, workers, journal, chunk_size, resolved)
+    
+    print(f"\nSyncing playlist: {spotify_playlist['name']}")
+    print("-" * 60)
+    
+    if journal is not None and (journal.playlist_state(spotify_playlist['id']) or {}).get('done'):
+        print("  ✓ Already synced in a previous run")
         return True
+    
+    # The index holds playlists parsed from a listing; load the editable playlist
+    tidal_playlist = load_playlist(tidal_playlist.id)
+    if not tidal_playlist:
+        return False
+    
+    try:
+        stats = sync_playlist(tidal_playlist, spotify_tracks, workers, remove_stale, chunk_size, resolved)
+    except Exception as e:
+        print(f"  ✗ Error syncing playlist '{spotify_playlist['name']}': {e}")
+        return False
+    
+    # Print summary for this playlist
+    print("\n  Playlist sync summary:")
+    print(f"    Total tracks: {stats['total']}")
+    print(f"    Already on Tidal: {stats['present']}")
+    print(f"    Newly added: {stats['added']}")
+    if remove_stale:
+        print(f"    Removed: {stats['removed']}")
+    print(f"    Not found: {stats['not_found']}")
+    if stats['failed'] > 0:
+        print(f"    Failed: {stats['failed']}")
+    if resolved is None:
+        print(f"    Match cache: {stats['cache_hits']} hits, {stats['cache_misses']} misses")
+        print(f"    Average searches per found track: {stats['queries_per_track']:.2f}")
+    
+    # Failed searches leave the playlist unfinished so --resume syncs it again
+    if stats['search_failed']:
+        return False
+    
+    if journal is not None:
+        journal.record_playlist(spotify_playlist['id'], tidal_id=tidal_playlist.id, done=True)
+    
+    return True
+
+
+def _fetch_all_playlists(session) -> List[object]:
+    """
+    Fetch every playlist of the Tidal user, one page at a time
+    
+    user.playlists() takes no paging arguments, so the endpoint is paged
+    explicitly with limit/offset.
+    
+    Args:
+        session: Authenticated Tidal session
+        
+    Returns:
+        List of Tidal playlist objects
+    """
+    playlists = []
+    offset = 0
+    url = f"users/{session.user.id}/playlists"
+    
+    while True:
+        page = tidal_request(session.request.map_request, url,
+                             params={'limit': TIDAL_PLAYLIST_PAGE_SIZE, 'offset': offset},
+                             parse=session.parse_playlist)
+        playlists.extend(page)
+        if len(page) < TIDAL_PLAYLIST_PAGE_SIZE:
+            return playlists
+        offset += TIDAL_PLAYLIST_PAGE_SIZE
 
 
 def get_user_playlists_tidal():
@@ -171,14 +610,67 @@ def get_user_playlists_tidal():
     session = get_tidal_session()
     
     try:
-        user = session.user
-        playlists = user.playlists()
-        return playlists
+        return _fetch_all_playlists(session)
     except Exception as e:
         print(f"Error fetching Tidal playlists: {e}")
         return []
 
 
+def _index_key(playlist_name: str) -> str:
+    """Normalize a playlist name for case-insensitive lookups"""
+    return playlist_name.casefold()
+
+
+def get_playlist_index() -> Dict[str, List[object]]:
+    """
+    Return the user's Tidal playlists indexed by case-folded name
+    
+    The index is built from a single paginated fetch the first time it is
+    needed and then kept up to date by create_playlist, so duplicate checks
+    for many playlists cost no further requests.
+    
+    Returns:
+        Dict mapping case-folded names to the playlists with that name
+    """
+    global _playlist_index
+    with _playlist_index_lock:
+        if _playlist_index is None:
+            session = get_tidal_session()
+            try:
+                playlists = _fetch_all_playlists(session)
+            except Exception as e:
+                # Not cached, so the next lookup tries again
+                print(f"Error fetching Tidal playlists: {e}")
+                return {}
+            
+            index = {}
+            for playlist in playlists:
+                index.setdefault(_index_key(playlist.name), []).append(playlist)
+            _playlist_index = index
+        return _playlist_index
+
+
+def _add_to_index(playlist) -> None:
+    """Record a newly created playlist in the index, if it has been built"""
+    with _playlist_index_lock:
+        if _playlist_index is not None:
+            _playlist_index.setdefault(_index_key(playlist.name), []).append(playlist)
+
+
+def find_playlist(playlist_name: str) -> Optional[object]:
+    """
+    Find an existing Tidal playlist by name (case-insensitive)
+    
+    Args:
+        playlist_name: Name of the playlist to look up
+        
+    Returns:
+        The first Tidal playlist with that name, or None
+    """
+    matches = get_playlist_index().get(_index_key(playlist_name))
+    return matches[0] if matches else None
+
+
 def playlist_exists(playlist_name: str) -> bool:
     """
     Check if a playlist with the given name already exists on Tidal
@@ -189,13 +681,7 @@ def playlist_exists(playlist_name: str) -> bool:
     Returns:
         bool: True if playlist exists, False otherwise
     """
-    playlists = get_user_playlists_tidal()
-    
-    for playlist in playlists:
-        if playlist.name.lower() == playlist_name.lower():
-            return True
-    
-    return False
+    return find_playlist(playlist_name) is not None
 
 
 if __name__ == "__main__":
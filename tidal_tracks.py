@@ -3,152 +3,371 @@ Tidal Tracks Module
 Handles searching for and adding tracks to Tidal
 """
 
-from tidal_auth import get_tidal_session
-from typing import Dict, List, Optional
-import time
+from tidal_auth import get_tidal_session, tidal_request
+from match_cache import get_match_cache
+from metrics import metrics
+from parallel import ordered_map
+from progress import ProgressRenderer, log_track
+from rate_limiter import is_client_error
+from track_matcher import TrackKey, match_stats, queries_per_track
+from track_record import track_label
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 import tidalapi
 
+NOT_FOUND_SHOWN = 20        # Not-found tracks listed by name in the summary
+FAVORITES_BATCH_SIZE = 50   # Track IDs sent per favorites write
+ISRC_SEARCH_LIMIT = 5       # Results requested for an ISRC search
+TEXT_SEARCH_LIMIT = 10      # Results requested for each text search
 
-def search_track_on_tidal(session, track_info: Dict) -> Optional[object]:
+
+class SearchFailed:
+    """
+    Result for a track whose Tidal search raised an error
+
+    It is falsy like a not-found result, so the track is not written, but
+    callers must count and journal it as failed rather than not found: the
+    track was never really looked for, and --resume has to search it again.
+    """
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+    def __bool__(self) -> bool:
+        return False
+
+
+def _search_tracks(session, query: str, limit: int, strategy: str) -> List[object]:
+    """Run one Tidal track search, returning the track results (errors are raised)"""
+    search = metrics.instrument(f"tidal.search.{strategy}", session.search)
+    # Search for tracks only - pass the Track class, not a string
+    results = tidal_request(search, query, models=[tidalapi.Track], limit=limit)
+
+    # Check if we have tracks in the results
+    if not results or 'tracks' not in results or not results['tracks']:
+        return []
+    return results['tracks']
+
+
+def search_track_on_tidal(session, track_info: Dict, cache=None) -> Optional[object]:
     """
     Search for a track on Tidal
 
+    Tries progressively broader queries - ISRC, then normalized title with
+    the primary artist, then with the other artists, then the title alone -
+    and stops at the first one that yields a candidate scoring above
+    MATCH_THRESHOLD on title, artist, duration and album. Matches are read
+    from and written to the persistent match cache so later runs skip the
+    search.
+
     Args:
         session: Authenticated Tidal session
         track_info: Dictionary containing track information from Spotify
+        cache: Optional MatchCache, defaults to the shared on-disk cache
 
     Returns:
         Tidal track object if found, None otherwise
+
+    Raises:
+        Exception: A search request that failed, even after the rate limiter's retries
     """
+    if cache is None:
+        cache = get_match_cache()
+
+    # Check the cache before hitting the API
+    cached = cache.get(track_info)
+    if cached:
+        match_stats.record(0, True)
+        return cached
+
+    key = TrackKey(track_info)
+    queries = 0
+    match = None
+
     # Try searching with ISRC first (most accurate)
-    if track_info.get('isrc'):
+    isrc = track_info.get('isrc')
+    if isrc:
+        queries += 1
+        candidates = _search_tracks(session, f"isrc:{isrc}", ISRC_SEARCH_LIMIT, "isrc")
+        # Results carrying the same ISRC are the same recording; otherwise score them like any search
+        same_recording = [c for c in candidates if (getattr(c, 'isrc', None) or "").upper() == isrc.upper()]
+        if same_recording:
+            match = key.best_match(same_recording, threshold=0)
+        else:
+            match = key.best_match(candidates)
+
+    # Fall back to text searches, cheapest first
+    if match is None:
+        for query in key.queries():
+            queries += 1
+            match = key.best_match(_search_tracks(session, query, TEXT_SEARCH_LIMIT, "text"))
+            if match is not None:
+                break
+
+    match_stats.record(queries, match is not None)
+    if match is not None:
+        cache.put(track_info, match)
+    return match
+
+
+def resolve_tracks(session, tracks: Iterable[Dict], workers: int = 1, cache=None,
+                   resolved: Optional[Dict[str, Optional[object]]] = None
+                   ) -> Iterator[Tuple[Dict, Optional[object]]]:
+    """
+    Search for tracks on Tidal using a bounded pool of worker threads
+
+    Results are yielded in the same order as the input tracks, so callers can
+    write favorites and playlist entries in the original Spotify order. At most
+    a few searches per worker are in flight ahead of the consumer.
+
+    Args:
+        session: Authenticated Tidal session
+        tracks: Track information dictionaries from Spotify
+        workers: Number of concurrent searches (1 searches sequentially)
+        cache: Optional MatchCache, defaults to the shared on-disk cache
+        resolved: Optional results of resolve_unique_tracks; tracks found in
+            it are not searched again
+
+    Yields:
+        Tuple of (track_info, Tidal track object, None if not found or
+        SearchFailed if the search raised an error)
+    """
+    if cache is None:
+        cache = get_match_cache()
+
+    def search(track_info):
+        if resolved is not None and track_info.get('spotify_id') in resolved:
+            return resolved[track_info['spotify_id']]
         try:
-            # Search using ISRC - specify Track model class
-            results = session.search(f"isrc:{track_info['isrc']}", models=[tidalapi.Track])
-            
-            # Check if we have tracks in the results
-            if results and 'tracks' in results and results['tracks']:
-                return results['tracks'][0]
+            return search_track_on_tidal(session, track_info, cache)
         except Exception as e:
-            # ISRC search failed, continue to other methods
-            pass
-
-    # Try searching with track name and artist
-    query = f"{track_info['name']} {track_info['artists'][0]}"
-
-    try:
-        # Search for tracks only - pass the Track class, not a string
-        results = session.search(query, models=[tidalapi.Track], limit=10)
-        
-        # Check if we have tracks in the results
-        if not results or 'tracks' not in results or not results['tracks']:
-            return None
-
-        tracks = results['tracks']
-        
-        # Try to find the best match
-        for result in tracks[:5]:  # Check top 5 results
-            # Check if artist matches
-            result_artists = [artist.name.lower() for artist in result.artists]
-            spotify_artists = [artist.lower() for artist in track_info['artists']]
-
-            # Check if track name matches (case-insensitive, allowing for slight variations)
-            track_name_match = result.name.lower().strip() == track_info['name'].lower().strip()
-
-            # Check if at least one artist matches
-            artist_match = any(
-                spotify_artist in result_artist or result_artist in spotify_artist
-                for spotify_artist in spotify_artists
-                for result_artist in result_artists
-            )
-
-            if track_name_match and artist_match:
-                return result
-
-        # If no exact match, return the first result
-        return tracks[0] if tracks else None
-
-    except Exception as e:
-        print(f"Error searching for track: {e}")
-        return None
-
-
-def add_track_to_favorites(session, track) -> bool:
+            print(f"Error searching for {track_label(track_info)}: {e}")
+            return SearchFailed(e)
+
+    return ordered_map(search, tracks, workers)
+
+
+def resolve_unique_tracks(sources: Iterable[Iterable[Dict]], workers: int = 1) -> Dict[str, Optional[object]]:
     """
-    Add a track to Tidal favorites
+    Resolve every distinct Spotify track across several sources exactly once
+
+    Liked songs and playlists often share tracks; collecting the union of
+    Spotify IDs first means a track that appears in a dozen playlists is
+    searched once rather than a dozen times (not-found tracks are never
+    cached, so without this they would be searched again for every source).
 
     Args:
-        session: Authenticated Tidal session
-        track: Tidal track object
+        sources: Track lists from Spotify (liked songs, each playlist)
+        workers: Number of concurrent Tidal searches
 
     Returns:
-        bool: True if successful, False otherwise
+        Dict mapping Spotify track ID to Tidal track object, None if not
+        found or SearchFailed if the search raised an error
+    """
+    session = get_tidal_session()
+    cache = get_match_cache()
+    cache_before = cache.stats()
+    match_before = match_stats.snapshot()
+
+    unique = {}
+    occurrences = 0
+    for tracks in sources:
+        for track_info in tracks:
+            spotify_id = track_info.get('spotify_id')
+            if spotify_id:  # Local files have no ID and are searched where they appear
+                occurrences += 1
+                unique.setdefault(spotify_id, track_info)
+
+    print(f"\nResolving {len(unique)} unique tracks on Tidal "
+          f"({occurrences - len(unique)} duplicates across sources skipped)...")
+
+    results = {}
+    progress = ProgressRenderer(len(unique), prefix="  Resolved ")
+    for track_info, tidal_track in resolve_tracks(session, unique.values(), workers, cache):
+        results[track_info['spotify_id']] = tidal_track
+        progress.update(bool(tidal_track))
+    progress.close()
+
+    found = sum(1 for tidal_track in results.values() if tidal_track)
+    errors = sum(1 for tidal_track in results.values() if isinstance(tidal_track, SearchFailed))
+    cache_after = cache.stats()
+    average = queries_per_track(match_before, match_stats.snapshot())
+    print(f"  Found {found}/{len(unique)} unique tracks on Tidal")
+    if errors:
+        print(f"  ✗ Searches failed for {errors} tracks; they are reported as failed")
+    print(f"  Match cache: {cache_after['hits'] - cache_before['hits']} hits, "
+          f"{cache_after['misses'] - cache_before['misses']} misses")
+    print(f"  Average searches per found track: {average:.2f}")
+
+    return results
+
+
+class FavoritesWriter:
+    """
+    Accumulates resolved tracks and adds them to Tidal favorites in batches
+
+    Each batch is sent as one request with comma-separated track IDs. If
+    Tidal rejects a batch (HTTP 4xx), its tracks are retried one at a time so
+    a single bad ID does not lose the rest. Transient failures (throttling
+    that outlasted the retries, server and connection errors) are raised
+    instead: retrying them per track would multiply the traffic and report
+    every track as failed. Every track's outcome is reported through
+    `on_result(track_info, tidal_track, success)`.
     """
-    try:
-        # Get user favorites and add the track
-        user = session.user
-        user.favorites.add_track(track.id)
-        return True
-    except Exception as e:
-        print(f"Error adding track to favorites: {e}")
-        return False
 
+    def __init__(self, session, on_result: Callable[[Dict, object, bool], None],
+                 batch_size: int = FAVORITES_BATCH_SIZE):
+        self.favorites = session.user.favorites
+        self._add_batch = metrics.instrument("tidal.favorites.add_batch", self.favorites.add_track)
+        self._add_one = metrics.instrument("tidal.favorites.add", self.favorites.add_track)
+        self.on_result = on_result
+        self.batch_size = batch_size
+        self.batches = 0
+        self.batch_failures = 0
+        self._pending = []
+
+    def add(self, track_info: Dict, tidal_track) -> None:
+        """Queue a track, writing the batch once it is full"""
+        self._pending.append((track_info, tidal_track))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Write all queued tracks
+
+        Raises:
+            Exception: A failure that was not a rejection of the tracks; the
+                tracks not reported yet are left unrecorded for --resume
+        """
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, []
+        self.batches += 1
 
-def transfer_tracks(spotify_tracks: List[Dict]) -> Dict[str, int]:
+        try:
+            track_ids = ",".join(str(tidal_track.id) for _, tidal_track in batch)
+            tidal_request(self._add_batch, track_ids)
+        except Exception as e:
+            if not is_client_error(e):
+                print(f"  ✗ Error adding {len(batch)} tracks to favorites: {e}")
+                raise
+            self.batch_failures += 1
+            print(f"  ✗ Tidal rejected {len(batch)} tracks, retrying individually: {e}")
+            for track_info, tidal_track in batch:
+                try:
+                    tidal_request(self._add_one, tidal_track.id)
+                    self.on_result(track_info, tidal_track, True)
+                except Exception as track_error:
+                    if not is_client_error(track_error):
+                        raise
+                    print(f"  ✗ Failed to add {track_info['name']} to favorites: {track_error}")
+                    self.on_result(track_info, tidal_track, False)
+            return
+
+        for track_info, tidal_track in batch:
+            self.on_result(track_info, tidal_track, True)
+
+
+def _skip_completed(tracks: Iterable[Dict], journal, stats: Dict[str, int]) -> Iterator[Dict]:
+    """Yield only the tracks the journal has not completed, counting the rest"""
+    for track_info in tracks:
+        if journal.track_done(track_info['spotify_id']):
+            stats['skipped'] += 1
+        else:
+            yield track_info
+
+
+def transfer_tracks(spotify_tracks: Iterable[Dict], workers: int = 1,
+                    total: Optional[int] = None, journal=None,
+                    resolved: Optional[Dict[str, Optional[object]]] = None) -> Dict[str, int]:
     """
     Transfer Spotify tracks to Tidal favorites
 
+    `spotify_tracks` may be a generator: tracks are searched and written to
+    favorites as they arrive, so memory use does not grow with library size.
+
     Args:
-        spotify_tracks: List of track information from Spotify
+        spotify_tracks: Track information from Spotify (list or iterator)
+        workers: Number of concurrent Tidal searches
+        total: Expected number of tracks, for progress output when spotify_tracks is an iterator
+        journal: Optional TransferJournal; tracks it already completed are
+            skipped and every result is recorded in it
+        resolved: Optional results of resolve_unique_tracks to use instead of searching
 
     Returns:
         Dict containing statistics about the transfer
     """
     session = get_tidal_session()
+    cache = get_match_cache()
+    cache_before = cache.stats()
+    match_before = match_stats.snapshot()
+
+    if total is None and hasattr(spotify_tracks, '__len__'):
+        total = len(spotify_tracks)
 
     stats = {
-        'total': len(spotify_tracks),
+        'total': 0,
         'found': 0,
         'added': 0,
         'not_found': 0,
-        'failed': 0
+        'failed': 0,
+        'search_failed': 0,
+        'skipped': 0
     }
 
     not_found_tracks = []
 
-    print(f"\nStarting transfer of {stats['total']} tracks to Tidal...")
-    print("=" * 60)
+    if journal is not None:
+        spotify_tracks = _skip_completed(spotify_tracks, journal, stats)
+
+    def on_result(track_info, tidal_track, success):
+        stats['added' if success else 'failed'] += 1
+        log_track('favorites', track_info, 'added' if success else 'failed', tidal_track.id)
+        if journal is not None:
+            journal.record_track(track_info['spotify_id'], 'added' if success else 'failed', tidal_track.id)
 
-    for i, track_info in enumerate(spotify_tracks, 1):
-        track_name = track_info['name']
-        artists = ", ".join(track_info['artists'])
+    writer = FavoritesWriter(session, on_result)
 
-        print(f"\n[{i}/{stats['total']}] {track_name} by {artists}")
+    print(f"\nStarting transfer of {total if total is not None else '?'} tracks to Tidal...")
+    print("=" * 60)
+
+    # Searches run concurrently, results arrive in Spotify order
+    results = resolve_tracks(session, spotify_tracks, workers, cache, resolved)
+    progress = ProgressRenderer(total)
 
-        # Search for track on Tidal
-        tidal_track = search_track_on_tidal(session, track_info)
+    for i, (track_info, tidal_track) in enumerate(results, 1):
+        stats['total'] = i
+        progress.update(bool(tidal_track))
 
         if tidal_track:
             stats['found'] += 1
-            # Get the main artist name
-            artist_name = tidal_track.artist.name if hasattr(tidal_track, 'artist') else tidal_track.artists[0].name
-            print(f"  ✓ Found on Tidal: {tidal_track.name} by {artist_name}")
-
-            # Add to favorites
-            if add_track_to_favorites(session, tidal_track):
-                stats['added'] += 1
-                print(f"  ✓ Added to favorites")
-            else:
-                stats['failed'] += 1
-                print(f"  ✗ Failed to add to favorites")
+            # Queue for the next batched favorites write
+            writer.add(track_info, tidal_track)
+        elif isinstance(tidal_track, SearchFailed):
+            # Not journaled as done, so --resume searches it again
+            stats['failed'] += 1
+            stats['search_failed'] += 1
+            log_track('favorites', track_info, 'failed')
+            if journal is not None:
+                journal.record_track(track_info['spotify_id'], 'failed')
         else:
             stats['not_found'] += 1
-            not_found_tracks.append(f"{track_name} by {artists}")
-            print(f"  ✗ Not found on Tidal")
-
-        # Small delay to avoid rate limiting
-        if i % 10 == 0:
-            time.sleep(1)
+            log_track('favorites', track_info, 'not_found')
+            if journal is not None:
+                journal.record_track(track_info['spotify_id'], 'not_found')
+            if len(not_found_tracks) < NOT_FOUND_SHOWN:
+                not_found_tracks.append(track_info)
+
+    writer.flush()
+    progress.close()
+    stats['favorite_batches'] = writer.batches
+    stats['favorite_batch_failures'] = writer.batch_failures
+
+    cache_after = cache.stats()
+    stats['cache_hits'] = cache_after['hits'] - cache_before['hits']
+    stats['cache_misses'] = cache_after['misses'] - cache_before['misses']
+    stats['queries_per_track'] = queries_per_track(match_before, match_stats.snapshot())
 
     # Print summary
     print("\n" + "=" * 60)
@@ -159,13 +378,23 @@ def transfer_tracks(spotify_tracks: List[Dict]) -> Dict[str, int]:
     print(f"Successfully added: {stats['added']}")
     print(f"Not found: {stats['not_found']}")
     print(f"Failed to add: {stats['failed']}")
+    if stats['search_failed']:
+        print(f"  of which the Tidal search failed: {stats['search_failed']}")
+    if stats['skipped']:
+        print(f"Already done in a previous run: {stats['skipped']}")
+    print(f"Favorites writes: {stats['favorite_batches']} batch(es), "
+          f"{stats['favorite_batch_failures']} retried individually")
+    # With a planned resolution the searches were already summarized by resolve_unique_tracks
+    if resolved is None:
+        print(f"Match cache: {stats['cache_hits']} hits, {stats['cache_misses']} misses")
+        print(f"Average searches per found track: {stats['queries_per_track']:.2f}")
 
     if not_found_tracks:
-        print(f"\nTracks not found on Tidal ({len(not_found_tracks)}):")
-        for track in not_found_tracks[:20]:  # Show first 20
-            print(f"  - {track}")
-        if len(not_found_tracks) > 20:
-            print(f"  ... and {len(not_found_tracks) - 20} more")
+        print(f"\nTracks not found on Tidal ({stats['not_found']}):")
+        for track in not_found_tracks:  # Only the first NOT_FOUND_SHOWN are kept
+            print(f"  - {track_label(track)}")
+        if stats['not_found'] > len(not_found_tracks):
+            print(f"  ... and {stats['not_found'] - len(not_found_tracks)} more")
 
     return stats
 
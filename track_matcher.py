@@ -0,0 +1,191 @@
+"""
+Track Matcher Module
+Normalizes track metadata and scores Tidal search results against Spotify tracks
+"""
+
+import re
+import threading
+import unicodedata
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional
+
+# Candidates scoring below this are not accepted as a match
+MATCH_THRESHOLD = 0.75
+
+# Weights of the individual similarity components (sum to 1)
+TITLE_WEIGHT = 0.45
+ARTIST_WEIGHT = 0.30
+DURATION_WEIGHT = 0.15
+ALBUM_WEIGHT = 0.10
+
+_BRACKETS = re.compile(r"\s*[\(\[\{][^\)\]\}]*[\)\]\}]")
+_FEATURING = re.compile(r"\s+(?:feat\.?|ft\.|featuring)\s+.*$")
+_DASH_SUFFIX = re.compile(
+    r"\s+-\s+.*\b(?:remaster(?:ed)?|version|edit|mono|stereo|deluxe|bonus track|anniversary)\b.*$"
+)
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize(text: Optional[str]) -> str:
+    """
+    Reduce a title, artist or album name to a comparable key
+
+    Folds case and accents, drops bracketed suffixes, "feat." credits and
+    " - Remastered 2011" style suffixes, and strips punctuation.
+
+    Args:
+        text: Raw name from Spotify or Tidal
+
+    Returns:
+        str: Normalized key (may be empty)
+    """
+    if not text:
+        return ""
+    text = unicodedata.normalize('NFKD', text)
+    text = "".join(c for c in text if not unicodedata.combining(c)).casefold()
+    text = text.replace("&", " and ")
+    text = _BRACKETS.sub("", text)
+    text = _DASH_SUFFIX.sub("", text)
+    text = _FEATURING.sub("", text)
+    text = _PUNCTUATION.sub(" ", text)
+    return _SPACES.sub(" ", text).strip()
+
+
+def _similarity(a: str, b: str) -> float:
+    """Return a 0-1 similarity ratio of two normalized strings"""
+    if not a or not b:
+        return 0.0
+    if a == b:
+        return 1.0
+    return SequenceMatcher(None, a, b).ratio()
+
+
+def _artist_similarity(a: str, b: str) -> float:
+    """Artist similarity; one name containing the other as whole words counts as a match"""
+    if f" {a} " in f" {b} " or f" {b} " in f" {a} ":
+        return 1.0
+    return _similarity(a, b)
+
+
+class TrackKey:
+    """Normalized matching keys of a Spotify track, computed once per track"""
+
+    __slots__ = ('title', 'artists', 'album', 'duration')
+
+    def __init__(self, track_info: Dict):
+        self.title = normalize(track_info['name'])
+        self.artists = [normalize(artist) for artist in track_info['artists']]
+        self.album = normalize(track_info.get('album'))
+        duration_ms = track_info.get('duration_ms')
+        self.duration = duration_ms / 1000 if duration_ms else None
+
+    def queries(self) -> List[str]:
+        """
+        Return text search queries from cheapest/most specific to broadest
+
+        Returns:
+            List of distinct query strings
+        """
+        ladder = []
+        if self.artists:
+            ladder.append(f"{self.title} {self.artists[0]}")
+        if len(self.artists) > 1:
+            ladder.append(f"{self.title} {' '.join(self.artists[1:3])}")
+        ladder.append(self.title)
+
+        queries = []
+        for query in ladder:
+            if query and query not in queries:
+                queries.append(query)
+        return queries
+
+    def score(self, candidate) -> float:
+        """
+        Score a Tidal track against this Spotify track
+
+        Args:
+            candidate: tidalapi.Track search result
+
+        Returns:
+            float: Weighted similarity between 0 and 1
+        """
+        title = _similarity(self.title, normalize(candidate.name))
+
+        candidate_artists = [normalize(artist.name) for artist in getattr(candidate, 'artists', None) or []]
+        artist = max(
+            (_artist_similarity(ours, theirs)
+             for ours in self.artists for theirs in candidate_artists if ours and theirs),
+            default=0.0
+        )
+
+        candidate_duration = getattr(candidate, 'duration', None)
+        if self.duration and candidate_duration:
+            difference = abs(self.duration - candidate_duration)
+            duration = 1.0 if difference <= 2 else 0.7 if difference <= 5 else 0.3 if difference <= 10 else 0.0
+        else:
+            duration = 0.5  # Unknown, neither reward nor punish
+
+        candidate_album = getattr(getattr(candidate, 'album', None), 'name', None)
+        album = _similarity(self.album, normalize(candidate_album)) if candidate_album else 0.5
+
+        return (TITLE_WEIGHT * title + ARTIST_WEIGHT * artist
+                + DURATION_WEIGHT * duration + ALBUM_WEIGHT * album)
+
+    def best_match(self, candidates, threshold: float = MATCH_THRESHOLD) -> Optional[object]:
+        """
+        Pick the highest-scoring candidate, if any reaches the threshold
+
+        Args:
+            candidates: tidalapi.Track search results
+            threshold: Minimum score to accept
+
+        Returns:
+            The best candidate, or None
+        """
+        best, best_score = None, threshold
+        for candidate in candidates:
+            score = self.score(candidate)
+            if score >= best_score:
+                best, best_score = candidate, score
+        return best
+
+
+class MatchStats:
+    """Thread-safe counters of search queries issued per resolved track"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.queries = 0
+        self.resolved = 0
+
+    def record(self, queries: int, resolved: bool) -> None:
+        """Record the queries one track took and whether it was resolved"""
+        with self._lock:
+            self.queries += queries
+            self.resolved += 1 if resolved else 0
+
+    def snapshot(self) -> Dict[str, int]:
+        """Return the current counters"""
+        with self._lock:
+            return {'queries': self.queries, 'resolved': self.resolved}
+
+
+match_stats = MatchStats()
+
+
+def queries_per_track(before: Dict[str, int], after: Dict[str, int]) -> float:
+    """
+    Average number of search queries per resolved track between two snapshots
+
+    Args:
+        before: Snapshot taken before the transfer
+        after: Snapshot taken after the transfer
+
+    Returns:
+        float: Queries per resolved track (0 if nothing was resolved)
+    """
+    resolved = after['resolved'] - before['resolved']
+    if not resolved:
+        return 0.0
+    return (after['queries'] - before['queries']) / resolved
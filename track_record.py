@@ -0,0 +1,102 @@
+"""
+Track Record Module
+Compact in-memory representation of a Spotify track
+"""
+
+import sys
+from typing import Dict, List, Optional
+
+
+class TrackRecord:
+    """
+    Slotted record of the Spotify track fields the transfer uses
+
+    Replaces the per-track dict: with __slots__ there is no instance
+    dictionary, artists are stored as a tuple, and artist and album names
+    are interned so the thousands of tracks sharing an artist or album share
+    one string. Item access (`track['name']`, `track.get('isrc')`) is kept
+    so records can be used wherever a track dict was expected.
+    """
+
+    __slots__ = ('name', 'artists', 'album', 'isrc', 'duration_ms',
+                 'spotify_id', 'spotify_uri', 'added_at')
+
+    def __init__(self, name: str, artists, album: Optional[str], isrc: Optional[str] = None,
+                 duration_ms: Optional[int] = None, spotify_id: Optional[str] = None,
+                 spotify_uri: Optional[str] = None, added_at: Optional[str] = None):
+        self.name = name
+        self.artists = tuple(sys.intern(artist) for artist in artists)
+        self.album = sys.intern(album) if album else album
+        self.isrc = isrc
+        self.duration_ms = duration_ms
+        self.spotify_id = spotify_id
+        self.spotify_uri = spotify_uri
+        self.added_at = added_at
+
+    @classmethod
+    def from_spotify(cls, track: Dict, added_at: Optional[str] = None) -> 'TrackRecord':
+        """
+        Build a record from a Spotify API track object
+
+        Args:
+            track: Track object from a Spotify response
+            added_at: When the track was saved (liked songs only)
+
+        Returns:
+            TrackRecord: Compact record of the track
+        """
+        return cls(
+            name=track['name'],
+            artists=[artist['name'] for artist in track['artists']],
+            album=track['album']['name'],
+            isrc=(track.get('external_ids') or {}).get('isrc'),  # International Standard Recording Code
+            duration_ms=track['duration_ms'],
+            spotify_id=(track.get('linked_from') or track)['id'],  # Original ID if relinked for the market
+            spotify_uri=track['uri'],
+            added_at=added_at
+        )
+
+    def to_row(self) -> List:
+        """Return the record's fields as a JSON-serializable list"""
+        return [getattr(self, field) for field in self.__slots__]
+
+    @classmethod
+    def from_row(cls, row) -> 'TrackRecord':
+        """
+        Rebuild a record from to_row() output (or a legacy track dict)
+
+        Args:
+            row: List of field values, or a dictionary keyed by field name
+
+        Returns:
+            TrackRecord: The rebuilt record
+        """
+        if isinstance(row, dict):
+            return cls(**{field: row.get(field) for field in cls.__slots__ if field in row})
+        return cls(*row)
+
+    def __getitem__(self, key: str):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default=None):
+        """Return a field by name, like dict.get"""
+        return getattr(self, key) if key in self.__slots__ else default
+
+    def __repr__(self) -> str:
+        return f"TrackRecord({track_label(self)!r}, spotify_id={self.spotify_id!r})"
+
+
+def track_label(track) -> str:
+    """
+    Return "name by artists" for a TrackRecord or a track dict
+
+    Args:
+        track: TrackRecord or dictionary with 'name' and 'artists'
+
+    Returns:
+        str: Display label
+    """
+    return f"{track['name']} by {', '.join(track['artists'])}"
+
@@ -0,0 +1,143 @@
+"""
+Transfer Journal Module
+Append-only checkpoint log that lets an interrupted transfer resume
+"""
+
+import json
+import os
+import threading
+from typing import Dict, Optional
+
+JOURNAL_FILE = "transfer_journal.jsonl"
+FSYNC_EVERY = 100  # Records between forced flushes to disk
+
+# Track statuses that mean no further work is needed on resume
+COMPLETED_STATUSES = ('added', 'not_found')
+
+
+class TransferJournal:
+    """
+    Append-only JSON Lines journal of transfer progress
+
+    Each line records either a liked-song result ("track") or playlist write
+    progress ("playlist"); when the journal is replayed the last record for a
+    key wins. Lines are flushed as they are written, so a crash or Ctrl-C
+    loses at most the record being written, and a truncated last line is
+    dropped on load.
+    """
+
+    def __init__(self, path: str = JOURNAL_FILE, resume: bool = False):
+        """
+        Open the journal
+
+        Args:
+            path: Location of the journal file
+            resume: Replay an existing journal instead of starting a new one
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._tracks: Dict[str, Dict] = {}
+        self._playlists: Dict[str, Dict] = {}
+        self._unsynced = 0
+
+        if resume and os.path.exists(path):
+            self._load()
+
+        self._file = open(path, 'a' if resume else 'w', encoding='utf-8')
+
+    def _load(self) -> None:
+        """Replay the records of an existing journal, cutting off a partially written last line"""
+        complete = 0  # Bytes up to the end of the last full line
+        with open(self.path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # Partially written last line from a crash
+                complete += len(line)
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if record.get('kind') == 'track':
+                    self._tracks[record['id']] = record
+                elif record.get('kind') == 'playlist':
+                    self._playlists.setdefault(record['id'], {}).update(record)
+
+        # Otherwise the next record would be appended to the partial line and lost with it
+        if complete < os.path.getsize(self.path):
+            with open(self.path, 'r+b') as f:
+                f.truncate(complete)
+
+    def _append(self, record: Dict) -> None:
+        """Write one record (lock must be held)"""
+        self._file.write(json.dumps(record, separators=(',', ':')) + "\n")
+        self._file.flush()
+        self._unsynced += 1
+        if self._unsynced >= FSYNC_EVERY:
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+
+    def record_track(self, spotify_id: str, status: str, tidal_id: Optional[int] = None) -> None:
+        """
+        Record the outcome of transferring a liked song
+
+        Args:
+            spotify_id: Spotify track ID
+            status: 'added', 'not_found' or 'failed'
+            tidal_id: Tidal track ID the song resolved to, if any
+        """
+        record = {'kind': 'track', 'id': spotify_id, 'status': status, 'tidal_id': tidal_id}
+        with self._lock:
+            self._tracks[spotify_id] = record
+            self._append(record)
+
+    def track_done(self, spotify_id: str) -> bool:
+        """
+        Check whether a liked song was already transferred or found missing
+
+        Args:
+            spotify_id: Spotify track ID
+
+        Returns:
+            bool: True if the track needs no further work
+        """
+        with self._lock:
+            record = self._tracks.get(spotify_id)
+        return record is not None and record['status'] in COMPLETED_STATUSES
+
+    def record_playlist(self, spotify_id: str, **progress) -> None:
+        """
+        Record playlist progress
+
+        Args:
+            spotify_id: Spotify playlist ID
+            **progress: Fields to update: tidal_id (created playlist),
+                written (Spotify tracks processed and committed) and done
+        """
+        record = {'kind': 'playlist', 'id': spotify_id}
+        record.update(progress)
+        with self._lock:
+            self._playlists.setdefault(spotify_id, {}).update(record)
+            self._append(record)
+
+    def playlist_state(self, spotify_id: str) -> Optional[Dict]:
+        """
+        Return the recorded progress of a playlist
+
+        Args:
+            spotify_id: Spotify playlist ID
+
+        Returns:
+            Dict with any of 'tidal_id', 'written' and 'done', or None
+        """
+        with self._lock:
+            state = self._playlists.get(spotify_id)
+            return dict(state) if state else None
+
+    def close(self) -> None:
+        """Flush the journal to disk and close it"""
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
@@ -0,0 +1,424 @@
+"""
+Work Queue Module
+SQLite-backed queue that spreads Tidal track resolution over several worker processes
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import sys
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from match_cache import CachedTrack, get_match_cache
+from metrics import metrics
+from progress import ProgressRenderer
+from rate_limiter import DEFAULT_BURST, DEFAULT_RATE, configure_rate_limiter
+from tidal_auth import get_tidal_session
+from tidal_tracks import SearchFailed, resolve_tracks
+from track_record import TrackRecord
+
+QUEUE_FILE = "work_queue.db"
+LEASE_SECONDS = 120   # Time a worker owns leased tracks before others may take them over
+LEASE_BATCH = 25      # Minimum tracks leased per round trip to the queue
+MAX_ATTEMPTS = 3      # Leases of one track before it is given up as failed
+POLL_INTERVAL = 1.0   # Seconds between checks while other workers hold the remaining tracks
+
+
+def worker_id() -> str:
+    """Return an ID for this process that is unique across machines sharing a queue"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class WorkQueue:
+    """
+    Durable queue of Spotify tracks waiting to be resolved on Tidal
+
+    Every distinct Spotify track is one item. Workers lease a batch of
+    pending items, search them and store the Tidal match; a lease that is
+    not completed within LEASE_SECONDS (the worker crashed or was killed)
+    expires and the items are handed to another worker. Items that fail
+    MAX_ATTEMPTS times are marked failed.
+
+    The database runs in WAL mode and every lease is taken in an immediate
+    transaction, so any number of processes - on this machine or on others
+    sharing the file - can drain the same queue.
+    """
+
+    def __init__(self, path: str = QUEUE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=60, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS items (
+                spotify_id TEXT PRIMARY KEY,
+                track TEXT NOT NULL,
+                state TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                owner TEXT,
+                expires REAL,
+                tidal_id INTEGER,
+                name TEXT,
+                artist TEXT,
+                error TEXT
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS items_state ON items (state)")
+
+    def enqueue(self, tracks: Iterable) -> int:
+        """
+        Add tracks to the queue; tracks already queued (or local files without an ID) are skipped
+
+        Args:
+            tracks: TrackRecords or track dictionaries from Spotify
+
+        Returns:
+            int: Number of items added
+        """
+        rows = []
+        for track in tracks:
+            spotify_id = track.get('spotify_id')
+            if spotify_id:
+                row = track.to_row() if isinstance(track, TrackRecord) else dict(track)
+                rows.append((spotify_id, json.dumps(row, separators=(',', ':'))))
+
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.executemany("INSERT OR IGNORE INTO items (spotify_id, track) VALUES (?, ?)", rows)
+            self._conn.execute("COMMIT")
+            return self._conn.total_changes - before
+
+    def lease(self, owner: str, limit: int = LEASE_BATCH,
+              lease_seconds: float = LEASE_SECONDS) -> List[TrackRecord]:
+        """
+        Take up to `limit` pending items (or items whose lease expired)
+
+        Args:
+            owner: ID of the leasing worker
+            limit: Maximum number of items
+            lease_seconds: How long the items belong to this worker
+
+        Returns:
+            List of TrackRecords to resolve (empty when nothing is available)
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Items whose workers kept dying on them are not handed out again
+                self._conn.execute(
+                    "UPDATE items SET state = 'failed', owner = NULL, error = 'lease expired' "
+                    "WHERE state = 'leased' AND expires < ? AND attempts >= ?",
+                    (now, MAX_ATTEMPTS)
+                )
+                rows = self._conn.execute(
+                    "SELECT spotify_id, track FROM items "
+                    "WHERE state = 'pending' OR (state = 'leased' AND expires < ?) LIMIT ?",
+                    (now, limit)
+                ).fetchall()
+                self._conn.executemany(
+                    "UPDATE items SET state = 'leased', owner = ?, expires = ?, attempts = attempts + 1 "
+                    "WHERE spotify_id = ?",
+                    [(owner, now + lease_seconds, spotify_id) for spotify_id, _ in rows]
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return [TrackRecord.from_row(json.loads(track)) for _, track in rows]
+
+    def complete(self, owner: str, results: Iterable[Tuple[Dict, Optional[object]]]) -> int:
+        """
+        Store the outcome of leased items
+
+        Results for items whose lease has passed to another worker are dropped.
+
+        Args:
+            owner: ID of the worker that leased the items
+            results: (track, Tidal track or None) pairs
+
+        Returns:
+            int: Number of items completed
+        """
+        rows = []
+        for track, tidal_track in results:
+            if tidal_track is None:
+                rows.append((None, None, None, track['spotify_id'], owner))
+            else:
+                artist = getattr(tidal_track, 'artist', None) or tidal_track.artists[0]
+                rows.append((int(tidal_track.id), tidal_track.name, artist.name, track['spotify_id'], owner))
+
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.executemany(
+                "UPDATE items SET state = 'done', tidal_id = ?, name = ?, artist = ?, owner = NULL, error = NULL "
+                "WHERE spotify_id = ? AND owner = ? AND state = 'leased'",
+                rows
+            )
+            self._conn.execute("COMMIT")
+            return self._conn.total_changes - before
+
+    def release(self, owner: str, spotify_ids: Iterable[str], error: str) -> None:
+        """
+        Give leased items back after an error, or mark them failed after MAX_ATTEMPTS
+
+        Args:
+            owner: ID of the worker that leased the items
+            spotify_ids: Items to release
+            error: Description of the error
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.executemany(
+                "UPDATE items SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                "owner = NULL, error = ? WHERE spotify_id = ? AND owner = ? AND state = 'leased'",
+                [(MAX_ATTEMPTS, error, spotify_id, owner) for spotify_id in spotify_ids]
+            )
+            self._conn.execute("COMMIT")
+
+    def expire_leases(self, owners: Iterable[str]) -> None:
+        """Make the leases of workers known to have exited available immediately"""
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE items SET expires = 0 WHERE state = 'leased' AND owner = ?",
+                [(owner,) for owner in owners]
+            )
+
+    def counts(self) -> Dict[str, int]:
+        """
+        Return the number of items in each state
+
+        Returns:
+            Dict with 'pending', 'leased', 'done', 'found' and 'failed' counts
+        """
+        with self._lock:
+            counts = dict.fromkeys(('pending', 'leased', 'done', 'failed'), 0)
+            counts.update(self._conn.execute("SELECT state, COUNT(*) FROM items GROUP BY state").fetchall())
+            counts['found'] = self._conn.execute(
+                "SELECT COUNT(*) FROM items WHERE state = 'done' AND tidal_id IS NOT NULL"
+            ).fetchone()[0]
+        return counts
+
+    def results(self) -> Dict[str, Optional[CachedTrack]]:
+        """
+        Return the outcome of every completed item
+
+        Failed items are left out, so the writers search them once more themselves.
+
+        Returns:
+            Dict mapping Spotify track ID to a CachedTrack, or None if not on Tidal
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT spotify_id, tidal_id, name, artist FROM items WHERE state = 'done'"
+            ).fetchall()
+        return {
+            spotify_id: CachedTrack(tidal_id, name, artist) if tidal_id is not None else None
+            for spotify_id, tidal_id, name, artist in rows
+        }
+
+    def clear(self) -> None:
+        """Remove every item (results of an earlier run included)"""
+        with self._lock:
+            self._conn.execute("DELETE FROM items")
+
+    def close(self) -> None:
+        """Close the underlying database connection"""
+        with self._lock:
+            self._conn.close()
+
+
+def run_worker(path: str = QUEUE_FILE, workers: int = 1, owner: Optional[str] = None) -> Dict[str, int]:
+    """
+    Resolve queued tracks until the queue is drained
+
+    Leased tracks are searched `workers` at a time with the usual match
+    cache and rate limiter. Tracks whose search failed are released so they
+    are retried, up to MAX_ATTEMPTS. While other workers still hold leases
+    the worker keeps polling, so it can take over their tracks if they die.
+
+    Args:
+        path: Queue file
+        workers: Concurrent Tidal searches in this process
+        owner: Worker ID, defaults to worker_id()
+
+    Returns:
+        Dict with the 'resolved', 'found' and 'released' counts of this worker
+    """
+    owner = owner or worker_id()
+    queue = WorkQueue(path)
+    session = get_tidal_session()
+    cache = get_match_cache()
+    stats = {'resolved': 0, 'found': 0, 'released': 0}
+
+    try:
+        while True:
+            batch = queue.lease(owner, max(LEASE_BATCH, workers * 4))
+            if not batch:
+                if not queue.counts()['leased']:
+                    break
+                time.sleep(POLL_INTERVAL)
+                continue
+
+            try:
+                results = list(resolve_tracks(session, batch, workers, cache))
+            except Exception as e:
+                print(f"  ✗ Worker {owner}: error resolving {len(batch)} tracks, releasing them: {e}")
+                queue.release(owner, [track['spotify_id'] for track in batch], str(e))
+                continue
+
+            # resolve_tracks reports a failed search as a result instead of raising
+            failed = [(track, result) for track, result in results if isinstance(result, SearchFailed)]
+            if failed:
+                error = failed[0][1].error
+                print(f"  ✗ Worker {owner}: search failed for {len(failed)} tracks, releasing them: {error}")
+                queue.release(owner, [track['spotify_id'] for track, _ in failed], str(error))
+                stats['released'] += len(failed)
+                results = [(track, result) for track, result in results if not isinstance(result, SearchFailed)]
+
+            queue.complete(owner, results)
+            stats['resolved'] += len(results)
+            stats['found'] += sum(1 for _, tidal_track in results if tidal_track)
+    finally:
+        queue.close()
+
+    return stats
+
+
+def _worker_process(path: str, workers: int, rate: float, burst: int, reports) -> None:
+    """
+    Entry point of a worker process started by resolve_with_queue
+
+    The worker's API metrics are sent back through `reports` so the parent's
+    --metrics-out/--metrics-port output covers the searches done here.
+    """
+    configure_rate_limiter(rate, burst)
+    try:
+        run_worker(path, workers)
+    finally:
+        reports.put(metrics.snapshot()['endpoints'])
+
+
+def resolve_with_queue(sources: Iterable[Iterable[Dict]], processes: int, workers: int = 1,
+                       path: str = QUEUE_FILE, rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST,
+                       resume: bool = False) -> Dict[str, Optional[object]]:
+    """
+    Resolve every distinct track of the sources with a pool of worker processes
+
+    A drop-in replacement for resolve_unique_tracks: the tracks are written
+    to the queue, `processes` local workers drain it (workers started on
+    other machines with `python work_queue.py --queue FILE` join in), and
+    the results are returned for the caller to write in Spotify order.
+
+    Args:
+        sources: Track lists from Spotify (liked songs, each playlist)
+        processes: Number of local worker processes
+        workers: Concurrent Tidal searches per worker process
+        path: Queue file
+        rate: Tidal requests per second for all local workers together
+        burst: Tidal request burst per worker
+        resume: Keep results from an earlier run in the queue instead of starting over
+
+    Returns:
+        Dict mapping Spotify track ID to Tidal track object, or None if not found
+    """
+    queue = WorkQueue(path)
+    try:
+        if not resume:
+            queue.clear()
+
+        occurrences = 0
+        unique = {}
+        for tracks in sources:
+            for track in tracks:
+                if track.get('spotify_id'):
+                    occurrences += 1
+                    unique.setdefault(track['spotify_id'], track)
+        queue.enqueue(unique.values())
+        counts = queue.counts()
+        total = sum(counts[state] for state in ('pending', 'leased', 'done', 'failed'))
+
+        print(f"\nResolving {len(unique)} unique tracks on Tidal with {processes} worker process(es) "
+              f"({occurrences - len(unique)} duplicates across sources skipped, "
+              f"{counts['done']} already resolved)...")
+
+        # Log in (or refresh the token) once, before the workers read the saved session
+        get_tidal_session()
+
+        context = multiprocessing.get_context("spawn")
+        reports = context.SimpleQueue()
+        worker_rate = rate / processes  # The workers share one account's rate limit
+        children = [
+            context.Process(target=_worker_process, args=(path, workers, worker_rate, burst, reports),
+                            daemon=True)
+            for _ in range(processes)
+        ]
+        for child in children:
+            child.start()
+
+        progress = ProgressRenderer(total, prefix="  Resolved ")
+        progress.advance(counts['done'], counts['found'])
+        while any(child.is_alive() for child in children):
+            time.sleep(POLL_INTERVAL)
+            # Read reports as they arrive so a worker never blocks on a full pipe
+            while not reports.empty():
+                metrics.merge(reports.get())
+            counts = queue.counts()
+            progress.advance(counts['done'] - progress.done, counts['found'] - progress.found)
+        for child in children:
+            child.join()
+        while not reports.empty():
+            metrics.merge(reports.get())
+
+        # Finish here whatever crashed workers left behind
+        queue.expire_leases(f"{socket.gethostname()}:{child.pid}" for child in children)
+        counts = queue.counts()
+        if counts['pending'] or counts['leased']:
+            print(f"\n  {counts['pending'] + counts['leased']} tracks left by the workers, resolving them here...")
+            run_worker(path, workers)
+            counts = queue.counts()
+        progress.advance(counts['done'] - progress.done, counts['found'] - progress.found)
+        progress.close()
+
+        print(f"  Found {counts['found']}/{total} unique tracks on Tidal")
+        if counts['failed']:
+            print(f"  ✗ {counts['failed']} tracks failed {MAX_ATTEMPTS} times and will be searched while writing")
+
+        return queue.results()
+    finally:
+        queue.close()
+
+
+if __name__ == "__main__":
+    # Join a transfer from another machine (or extra processes on this one)
+    parser = argparse.ArgumentParser(description='Resolve tracks from a shared work queue')
+    parser.add_argument('--queue', default=QUEUE_FILE, metavar='FILE',
+                        help=f'Queue file to drain (default: {QUEUE_FILE})')
+    parser.add_argument('--workers', type=int, default=4, metavar='N',
+                        help='Concurrent Tidal searches (default: 4)')
+    parser.add_argument('--rate', type=float, default=DEFAULT_RATE, metavar='N',
+                        help=f'Maximum Tidal requests per second (default: {DEFAULT_RATE:g})')
+    parser.add_argument('--burst', type=int, default=DEFAULT_BURST, metavar='N',
+                        help=f'Maximum Tidal requests sent back-to-back (default: {DEFAULT_BURST})')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.queue):
+        parser.error(f"Queue {args.queue} not found")
+
+    configure_rate_limiter(args.rate, args.burst)
+    print(f"Worker {worker_id()} draining {args.queue}...")
+    stats = run_worker(args.queue, args.workers)
+    print(f"✓ Resolved {stats['resolved']} tracks, {stats['found']} found on Tidal")
+    if stats['released']:
+        print(f"✗ Released {stats['released']} tracks after failed searches")
+    sys.exit(0)